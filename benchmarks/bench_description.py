@@ -0,0 +1,68 @@
+"""
+Compare the two ways of reading a detail page description.
+
+'dom' parses the whole page into a tree; 'stream' feeds the page to
+DescriptionStreamParser in chunks and stops at the end of the description.
+Both must return exactly the same text, which is checked before timing.
+
+    python -m benchmarks.bench_description [--books 400] [--repeat 3] [--chunk-size 4096]
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import corpus
+from src.book_scraper.parser import DescriptionStreamParser, STREAM_CHUNK_SIZE, parse_description
+
+
+def chunked(html, chunk_size):
+    return [html[i:i + chunk_size] for i in range(0, len(html), chunk_size)]
+
+
+def stream_extract(chunks):
+    stream_parser = DescriptionStreamParser()
+    for chunk in chunks:
+        stream_parser.feed(chunk)
+        if stream_parser.done:
+            break
+    return stream_parser.result(), stream_parser.chars_fed
+
+
+def timed(func, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        for page in pages:
+            func(page)
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    _, details, _ = corpus(args.books)
+    pages = [chunked(html, args.chunk_size) for html in details]
+
+    chars_total = sum(len(html) for html in details)
+    chars_streamed = 0
+    for html, chunks in zip(details, pages):
+        description, chars_fed = stream_extract(chunks)
+        if description != parse_description(html):
+            raise SystemExit("Streaming extractor returned a different description")
+        chars_streamed += chars_fed
+
+    dom = timed(parse_description, details, args.repeat)
+    stream = timed(stream_extract, pages, args.repeat)
+
+    print(f"{len(details)} detail pages, {args.chunk_size}-char chunks, best of {args.repeat} (CPU time)")
+    print(f"{'mode':<8} {'ms/page':>8} {'chars read':>12} {'speedup':>8}")
+    print(f"{'dom':<8} {dom / len(details) * 1000:>8.3f} {chars_total:>12} {1.0:>7.2f}x")
+    print(f"{'stream':<8} {stream / len(details) * 1000:>8.3f} {chars_streamed:>12} {dom / stream:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+save_all_data before and after the single-pass CatalogExporter, for one large catalogue.
+
+The previous implementation is reproduced here: save_books converted every book with
+to_dict() for books.json and books.csv, then save_categories converted each one again
+for the nested categories.json and once more for category_books.csv. Both write the
+same files (checked byte for byte); time and peak memory are reported.
+
+    python -m benchmarks.bench_export [--books 100000] [--categories 50]
+"""
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_frame import records
+from src.book_scraper.Processing import Processing
+from src.book_scraper.models.book import Book
+from src.book_scraper.models.category import Category
+
+FORMATS = ["json", "csv"]
+FILES = ["books.json", "books.csv", "categories.json", "category_books.csv", "categories.csv"]
+
+
+def legacy_save_all_data(books, categories, directory):
+    book_dicts = [book.to_dict() for book in books]
+    Processing.save_json(book_dicts, "books", directory)
+    Processing.save_csv(book_dicts, "books", directory)
+
+    category_dicts = [category.to_dict() for category in categories]
+    Processing.save_json(category_dicts, "categories", directory)
+    all_books = []
+    for category in categories:
+        for book in category.books:
+            book_dict = book.to_dict()
+            book_dict["category_name"] = category.name
+            all_books.append(book_dict)
+    Processing.save_csv(all_books, "category_books", directory)
+    Processing.save_csv([{k: v for k, v in cat.items() if k != "books"} for cat in category_dicts],
+                        "categories", directory)
+
+
+def catalogue(count, category_count):
+    books = [Book.from_dict(dict(record, category=f"Category {i % category_count}", availability="In stock (19 available)",
+                                 url=f"http://books.toscrape.com/catalogue/book_{i}/index.html",
+                                 image_url=f"http://books.toscrape.com/media/cache/{i}.jpg",
+                                 description=f"Description of book {i}. " * 10))
+             for i, record in enumerate(records(count))]
+    categories = {}
+    for book in books:
+        category = categories.setdefault(book.category, Category(book.category, None))
+        category.books.append(book)
+        category.book_count += 1
+    return books, list(categories.values())
+
+
+def measure(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        func(*args)
+        seconds = time.perf_counter() - started
+        # Peak memory from a second, traced run: tracemalloc slows the run down too much to time it
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=50)
+    args = parser.parse_args()
+
+    books, categories = catalogue(args.books, args.categories)
+    with tempfile.TemporaryDirectory() as directory:
+        before, after = os.path.join(directory, "before"), os.path.join(directory, "after")
+        os.makedirs(before)
+        old_seconds, old_peak = measure(legacy_save_all_data, books, categories, before)
+        new_seconds, new_peak = measure(Processing.save_all_data, books, categories, after, FORMATS)
+
+        _, mismatch, errors = filecmp.cmpfiles(before, after, FILES, shallow=False)
+        if mismatch or errors:
+            raise SystemExit(f"Exports differ: {mismatch + errors}")
+
+        print(f"\n{args.books} books in {args.categories} categories, formats {FORMATS}")
+        print(f"{'previous save_all_data':<24} {old_seconds:6.2f} s  peak {old_peak / 2 ** 20:7.1f} MiB")
+        print(f"{'CatalogExporter':<24} {new_seconds:6.2f} s  peak {new_peak / 2 ** 20:7.1f} MiB  "
+              f"({old_seconds / new_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time the compiled listing schema against the hand-coded per-article extraction it replaced,
+and print the schema's per-field cost.
+
+    python -m benchmarks.bench_extraction [--books 2000] [--repeat 3] [--backend html.parser]
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import BASE_URL, corpus
+from src.book_scraper.extraction_schema import listing_schema
+from src.book_scraper.parser import DEFAULT_PARSER_BACKEND, PARSER_BACKENDS, parse_html, select_with_css, \
+    select_with_tag_and_attr
+from src.Utils.utils import absolute_url
+
+
+def handcoded_listing(soup, base_url):
+    # The extraction loop extract_listing_products used before the schema
+    products = []
+    for article in soup.select('article.product_pod'):
+        title_tag = article.select_one('h3 a')
+        title = title_tag['title'] if title_tag and 'title' in title_tag.attrs else "Title not found"
+        relative_link = title_tag.get("href", "")
+        if 'catalogue/' not in relative_link:
+            relative_link = 'catalogue/' + relative_link
+        full_link = absolute_url(base_url, relative_link) if relative_link else "Link not found"
+        price = select_with_css(article, '.price_color')
+        image = article.find('img')
+        image_url = absolute_url(base_url, image['src']) if image and 'src' in image.attrs else "Image not found"
+        availability_list = select_with_tag_and_attr(article, 'p', 'class', 'instock availability')
+        availability_text = availability_list[0] if availability_list else "Availability not found"
+        rating_tag = article.select_one('p.star-rating')
+        rating_map = {'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5}
+        rating = 0
+        if rating_tag:
+            for cls in rating_tag.get('class', []):
+                if cls in rating_map:
+                    rating = rating_map[cls]
+                    break
+        products.append({
+            'title': title,
+            'price': price[0].replace("Â", "") if price else "Price not found",
+            'link': full_link,
+            'image_url': image_url,
+            'availability': availability_text,
+            'description': None,
+            'rating': rating,
+        })
+    return products
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=list(PARSER_BACKENDS), default=DEFAULT_PARSER_BACKEND)
+    args = parser.parse_args()
+
+    listings, _, _ = corpus(args.books)
+    soups = [parse_html(html, args.backend) for html in listings]
+    schema = listing_schema()
+
+    expected = [handcoded_listing(soup, BASE_URL) for soup in soups]
+    # cover_url was added to the schema after the hand-coded loop was retired
+    extracted = [[{name: value for name, value in product.items() if name != 'cover_url'} for product in products]
+                 for products in schema.extract_many(soups, BASE_URL)]
+    if extracted != expected:
+        raise SystemExit("Schema extracts different listing data than the hand-coded extractor")
+
+    handcoded = best_of(args.repeat, lambda: [handcoded_listing(soup, BASE_URL) for soup in soups])
+    schema.reset_stats()
+    compiled = best_of(args.repeat, lambda: schema.extract_many(soups, BASE_URL))
+
+    records = sum(len(products) for products in expected)
+    print(f"{len(soups)} listing pages, {records} products, backend {args.backend}, best of {args.repeat}")
+    print(f"hand-coded: {handcoded / records * 1e6:8.2f} us/product")
+    print(f"schema:     {compiled / records * 1e6:8.2f} us/product ({handcoded / compiled:.2f}x)")
+    print(schema.report())
+
+
+if __name__ == "__main__":
+    main()
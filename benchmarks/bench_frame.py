@@ -0,0 +1,67 @@
+"""
+Processing analytics over a plain list of book records vs the same records in a BookFrame.
+
+Every query is checked to return the same records in the same order before it is timed.
+
+    python -m benchmarks.bench_frame [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.fixtures import CATEGORY_NAMES
+from src.book_scraper.Processing import Processing
+from src.book_scraper.book_frame import BookFrame
+
+QUERIES = [
+    ("sort_books_by_rating", ()),
+    ("filter_books_by_min_rating", (4,)),
+    ("get_top_n_books_by_rating", (5,)),
+    ("in_price_range", (10, 30)),
+    ("top_expensive", (5,)),
+    ("top_cheap", (5,)),
+    ("average_rating", ()),
+    ("books_per_category", ()),
+    ("group_books_by_category", ()),
+]
+
+
+def records(rows, seed=0):
+    rng = random.Random(seed)
+    prices = [f"{pounds}.{pence:02d}" for pounds in range(10, 60) for pence in range(100)]
+    return [{"title": f"Book {i}", "price": rng.choice(prices), "rating": rng.randint(1, 5),
+             "category": rng.choice(CATEGORY_NAMES)} for i in range(rows)]
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    books = records(args.rows)
+    started = time.perf_counter()
+    frame = BookFrame.from_records(books)
+    print(f"{args.rows} rows, BookFrame built in {time.perf_counter() - started:.2f} s, best of {args.repeat}")
+
+    print(f"{'query':<28} {'list ms':>9} {'frame ms':>9} {'speedup':>8}")
+    for name, query_args in QUERIES:
+        query = getattr(Processing, name)
+        if query(books, *query_args) != query(frame, *query_args):
+            raise SystemExit(f"{name} returns different results on the BookFrame")
+        on_list = best_of(args.repeat, query, books, *query_args)
+        on_frame = best_of(args.repeat, query, frame, *query_args)
+        print(f"{name:<28} {on_list * 1000:>9.1f} {on_frame * 1000:>9.1f} {on_list / on_frame:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Dashboard-style queries (the ones Main runs back to back) over a plain list of records
+vs a BookIndex built once, plus the cost of building and growing the index.
+
+    python -m benchmarks.bench_index [--rows 200000] [--rounds 5]
+"""
+import argparse
+import time
+
+from benchmarks.bench_frame import records
+from src.book_scraper.Processing import Processing
+from src.book_scraper.book_index import BookIndex
+
+QUERIES = [
+    ("get_top_n_books_by_rating", (5,)),
+    ("filter_books_by_min_rating", (4.5,)),
+    ("in_price_range", (10, 30)),
+    ("in_price_range", (42, 42.5)),
+    ("top_expensive", (5,)),
+    ("top_cheap", (5,)),
+    ("average_rating", ()),
+    ("books_per_category", ()),
+]
+
+
+def run_queries(books):
+    answers = [getattr(Processing, name)(books, *args) for name, args in QUERIES]
+    # BookIndex answers price ranges cheapest first; put the list's answers in that order to compare
+    return [sorted(answer, key=Processing._price_pence) if name == "in_price_range" and not isinstance(books, BookIndex)
+            else answer for (name, _), answer in zip(QUERIES, answers)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    books = records(args.rows)
+    started = time.perf_counter()
+    index = BookIndex(books)
+    build_seconds = time.perf_counter() - started
+    if run_queries(books) != run_queries(index):
+        raise SystemExit("BookIndex answers differ from the list-based helpers")
+
+    print(f"{args.rows} rows; index built in {build_seconds:.2f} s; {args.rounds} rounds of {len(QUERIES)} queries")
+    print(f"{'query':<28} {'args':<12} {'list ms':>9} {'index ms':>9} {'speedup':>8}")
+    total_list = total_index = 0.0
+    for name, query_args in QUERIES:
+        query = getattr(Processing, name)
+        timings = []
+        for books_or_index in (books, index):
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                query(books_or_index, *query_args)
+            timings.append((time.perf_counter() - started) / args.rounds)
+        total_list += timings[0]
+        total_index += timings[1]
+        print(f"{name:<28} {str(query_args):<12} {timings[0] * 1000:>9.2f} {timings[1] * 1000:>9.3f} "
+              f"{timings[0] / timings[1]:>7.0f}x")
+    print(f"one round: list {total_list * 1000:.1f} ms, index {total_index * 1000:.1f} ms; "
+          f"index pays for itself after {build_seconds / max(total_list - total_index, 1e-9):.1f} rounds")
+
+    extra = records(1000, seed=1)
+    started = time.perf_counter()
+    for book in extra:
+        index.add(book)
+    print(f"incremental add: {(time.perf_counter() - started) / len(extra) * 1e6:.1f} us/book")
+
+
+if __name__ == "__main__":
+    main()
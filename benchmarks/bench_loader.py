@@ -0,0 +1,70 @@
+"""
+Folder loading: the previous walk-and-json.load-everything loader vs load_books
+(book exports only, parallel decode, dedupe by URL) with different executors.
+
+The export folder mirrors what scrape_categories writes: books.json, categories.json
+(the same books nested under their category) and CSV copies in every directory.
+
+    python -m benchmarks.bench_loader [--books 200000] [--files 50] [--workers 4]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_frame import records
+from src.book_scraper.book_loader import load_books, orjson
+from src.book_scraper.Processing import Processing
+
+
+def write_export(directory, books, files):
+    per_file = -(-len(books) // files)
+    for i in range(files):
+        folder = os.path.join(directory, f"category_{i}")
+        os.makedirs(folder)
+        chunk = [dict(book, url=f"http://books.toscrape.com/catalogue/book_{n}/index.html")
+                 for n, book in enumerate(books[i * per_file:(i + 1) * per_file], start=i * per_file)]
+        Processing.save_json(chunk, "books", folder)
+        Processing.save_json([{"name": f"category_{i}", "url": None, "book_count": len(chunk), "books": chunk}],
+                             "categories", folder)
+        Processing.save_csv(chunk, "books", folder)
+
+
+def legacy_load(base_path):
+    # load_all_books_from_folder before: every *.json, serially, categories included
+    books = []
+    for root, _, files in os.walk(base_path):
+        for file in files:
+            if file.endswith('.json'):
+                with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                    books.extend(json.load(f))
+    return books
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(directory, records(args.books), args.files)
+        print(f"\n{args.books} books in {args.files} directories, orjson {'on' if orjson else 'off'}")
+
+        started = time.perf_counter()
+        legacy = legacy_load(directory)
+        print(f"{'previous loader':<22} {time.perf_counter() - started:6.2f} s  {len(legacy)} records "
+              f"({len(legacy) - args.books} of them category objects)")
+
+        for label, workers, use_processes in (("serial", 1, True), ("threads", args.workers, False),
+                                              ("processes", args.workers, True)):
+            books, stats = load_books(directory, workers=workers, use_processes=use_processes)
+            if len(books) != args.books:
+                raise SystemExit(f"{label}: expected {args.books} books, got {len(books)}")
+            print(f"{label:<22} {stats.seconds:6.2f} s  {stats.report()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Memory and serialization cost of the Book model.
+
+Builds the same books as the previous dict-backed Book (string price, free-text
+availability) and as the slotted, typed Book, measuring the memory held with
+tracemalloc and the to_dict / from_dict throughput.
+
+    python -m benchmarks.bench_models [--books 100000]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.fixtures import make_books
+from src.book_scraper.models.book import Book
+
+
+class DictBackedBook:
+    # The model as it was before: one instance __dict__ per book, price kept as text
+    def __init__(self, title, price, rating, availability, category, url=None, image_url=None, description=None):
+        self.title = title
+        self.price = price
+        self.rating = rating
+        self.availability = availability
+        self.category = category
+        self.url = url
+        self.image_url = image_url
+        self.description = description
+
+    def to_dict(self):
+        return {"title": self.title, "price": self.price, "rating": self.rating, "availability": self.availability,
+                "category": self.category, "url": self.url, "image_url": self.image_url,
+                "description": self.description}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(title=data.get("title"), price=data.get("price"), rating=data.get("rating"),
+                   availability=data.get("availability"), category=data.get("category"), url=data.get("url"),
+                   image_url=data.get("image_url"), description=data.get("description"))
+
+
+def records(count):
+    # Book records as books.json stores them
+    rating_numbers = {"One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
+    return [{
+        "title": book["title"],
+        "price": book["price"],
+        "rating": rating_numbers[book["rating"]],
+        "availability": f"In stock ({book['stock']} available)",
+        "category": book["category"],
+        "url": f"http://books.toscrape.com/catalogue/{book['slug']}/index.html",
+        "image_url": f"http://books.toscrape.com/media/cache/2c/da/{book['slug']}.jpg",
+        "description": None,
+    } for book in make_books(count)]
+
+
+def measure(model, payload):
+    gc.collect()
+    tracemalloc.start()
+    # Load the way load_all_books_from_folder does, then keep only the books
+    data = json.loads(payload)
+    started = time.perf_counter()
+    books = [model.from_dict(record) for record in data]
+    from_dict_seconds = time.perf_counter() - started
+    del data
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for book in books:
+        book.to_dict()
+    to_dict_seconds = time.perf_counter() - started
+    return books, held, from_dict_seconds, to_dict_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=100_000)
+    args = parser.parse_args()
+
+    data = records(args.books)
+    payload = json.dumps(data)
+    print(f"{args.books} books loaded from JSON (memory held by the books once the records are dropped)")
+    print(f"{'model':<12} {'bytes/book':>10} {'total MiB':>10} {'from_dict us':>13} {'to_dict us':>11}")
+    baseline = None
+    for name, model in (("dict-backed", DictBackedBook), ("slotted", Book)):
+        books, held, from_dict_seconds, to_dict_seconds = measure(model, payload)
+        baseline = baseline or held
+        print(f"{name:<12} {held / len(books):>10.0f} {held / 2 ** 20:>10.1f} "
+              f"{from_dict_seconds / len(books) * 1e6:>13.2f} {to_dict_seconds / len(books) * 1e6:>11.2f}"
+              f"  ({held / baseline:.0%} of dict-backed)")
+        del books
+
+    if [Book.from_dict(record).to_dict() for record in data] != data:
+        raise SystemExit("Slotted Book does not round-trip its records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Reloading an export folder for analytics: books.json through load_books vs books.parquet,
+read whole and with column projection plus a pushed-down filter.
+
+Every directory holds one category's books, as scrape_categories writes them. Besides
+the time, the bytes each read has to touch are reported: the whole JSON files, and for
+Parquet the compressed column chunks of the projected columns in the row groups whose
+statistics do not rule the filter out.
+
+    python -m benchmarks.bench_parquet [--books 200000] [--files 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pyarrow.parquet as pq
+
+from benchmarks.bench_frame import records
+from src.book_scraper.Processing import Processing
+from src.book_scraper.book_loader import load_books
+from src.book_scraper.columnar import parquet_files
+from src.book_scraper.models.book import BOOK_FIELDS
+
+COLUMNS = ["price", "rating"]
+FILTERS = [("rating", ">=", 4)]
+
+
+def write_export(directory, books, files):
+    per_file = -(-len(books) // files)
+    for i in range(files):
+        folder = os.path.join(directory, f"category_{i}")
+        chunk = [dict(book, availability="In stock (19 available)", description=f"Description of book {n}. " * 10,
+                      url=f"http://books.toscrape.com/catalogue/book_{n}/index.html")
+                 for n, book in enumerate(books[i * per_file:(i + 1) * per_file], start=i * per_file)]
+        Processing.save_json(chunk, "books", folder)
+        Processing.save_parquet(chunk, "books", folder)
+
+
+def projected_bytes(paths, columns, min_rating):
+    total = 0
+    for path in paths:
+        metadata = pq.ParquetFile(path).metadata
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            chunks = {row_group.column(i).path_in_schema: row_group.column(i) for i in range(row_group.num_columns)}
+            statistics = chunks["rating"].statistics
+            if statistics is not None and statistics.has_min_max and statistics.max < min_rating:
+                continue
+            total += sum(chunks[name].total_compressed_size for name in columns)
+    return total
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--files", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(directory, records(args.books), args.files)
+        json_paths = [os.path.join(root, "books.json") for root, _, files in os.walk(directory) if "books.json" in files]
+        paths = parquet_files(directory)
+        json_bytes = sum(os.path.getsize(path) for path in json_paths)
+        parquet_bytes = sum(os.path.getsize(path) for path in paths)
+        print(f"\n{args.books} books in {args.files} directories: "
+              f"books.json {json_bytes / 2 ** 20:.1f} MiB, books.parquet {parquet_bytes / 2 ** 20:.1f} MiB")
+
+        # load_books prefers books.parquet when it is there; time the JSON files on their own
+        for path in paths:
+            os.rename(path, path + ".off")
+        (books, _), seconds = timed(load_books, directory)
+        print(f"{'json, all columns':<32} {seconds:6.2f} s  {len(books):>8} rows  {json_bytes / 2 ** 20:7.1f} MiB")
+        for path in paths:
+            os.rename(path + ".off", path)
+
+        full, seconds = timed(Processing.load_parquet_books, directory)
+        # Parquet rows carry every column of the schema, missing ones as None
+        if full != [{name: book.get(name) for name in BOOK_FIELDS} for book in books]:
+            raise SystemExit("Parquet round trip differs from the JSON export")
+        print(f"{'parquet, all columns':<32} {seconds:6.2f} s  {len(full):>8} rows  {parquet_bytes / 2 ** 20:7.1f} MiB")
+
+        selected, seconds = timed(Processing.load_parquet_books, directory, columns=COLUMNS, filters=FILTERS)
+        expected = [{name: book[name] for name in COLUMNS} for book in books if book["rating"] >= 4]
+        if selected != expected:
+            raise SystemExit("Projected, filtered read differs from filtering the JSON export")
+        read_bytes = projected_bytes(paths, COLUMNS, 4)
+        print(f"{'parquet, price/rating >= 4':<32} {seconds:6.2f} s  {len(selected):>8} rows  "
+              f"{read_bytes / 2 ** 20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the parse_html backends on listing and detail pages.
+
+Every backend must extract exactly what the default 'html.parser' backend does;
+the benchmark checks that before timing anything.
+
+    python -m benchmarks.bench_parser [--books 400] [--repeat 3]
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import BASE_URL, corpus
+from src.book_scraper.parser import (PARSER_BACKENDS, LXML_AVAILABLE, parse_html, extract_listing_products,
+                                     extract_categories, get_next_page_url, plan_page_urls, parse_description,
+                                     set_parser_backend, DEFAULT_PARSER_BACKEND)
+
+
+def extract_listing(html, backend):
+    soup = parse_html(html, backend)
+    return (extract_listing_products(soup, BASE_URL), get_next_page_url(soup, BASE_URL),
+            plan_page_urls(soup, BASE_URL, 50), extract_categories(soup, BASE_URL))
+
+
+def extract_details(html, backend):
+    # parse_description parses with the globally selected backend
+    set_parser_backend(backend)
+    return parse_description(html)
+
+
+def timed(func, pages, backend, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in pages:
+            func(html, backend)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    listings, details, _ = corpus(args.books)
+    backends = [name for name, (features, _) in PARSER_BACKENDS.items() if features != "lxml" or LXML_AVAILABLE]
+
+    expected_listing = [extract_listing(html, DEFAULT_PARSER_BACKEND) for html in listings]
+    expected_details = [extract_details(html, DEFAULT_PARSER_BACKEND) for html in details]
+    for backend in backends:
+        if [extract_listing(html, backend) for html in listings] != expected_listing:
+            raise SystemExit(f"Backend '{backend}' extracts different listing data")
+        if [extract_details(html, backend) for html in details] != expected_details:
+            raise SystemExit(f"Backend '{backend}' extracts different descriptions")
+
+    print(f"{len(listings)} listing pages, {len(details)} detail pages, best of {args.repeat}")
+    print(f"{'backend':<12} {'listing ms/page':>16} {'detail ms/page':>15} {'speedup':>8}")
+    baseline = None
+    for backend in backends:
+        listing_time = timed(extract_listing, listings, backend, args.repeat)
+        detail_time = timed(extract_details, details, backend, args.repeat)
+        total = listing_time + detail_time
+        baseline = baseline or total
+        print(f"{backend:<12} {listing_time / len(listings) * 1000:>16.2f} "
+              f"{detail_time / len(details) * 1000:>15.2f} {baseline / total:>7.2f}x")
+    set_parser_backend(DEFAULT_PARSER_BACKEND)
+
+
+if __name__ == "__main__":
+    main()
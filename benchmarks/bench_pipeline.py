@@ -0,0 +1,101 @@
+"""
+scrape_and_save with the threaded crawl vs the staged fetch/parse pipeline.
+
+The fixture catalogue is served by a local HTTP server, in a process of its own, that
+holds every response for --latency seconds, so fetching is I/O-bound while parsing
+stays CPU-bound. Both crawls must produce the same books.json, which is checked before
+the times are printed. Each pipeline crawl is timed with every given number of parse
+workers, including starting and shutting down its pool; parsing only scales with the
+process pool on several cores.
+
+    python -m benchmarks.bench_pipeline [--books 400] [--latency 0.02] [--parse-workers 0 1 2 4]
+"""
+import argparse
+import contextlib
+import filecmp
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import corpus
+from src.book_scraper.Processing import Processing
+
+
+def serve(book_count, latency, ready):
+    """Server process: serve the fixture catalogue and report the port on ready."""
+    listings, details, books = corpus(book_count)
+    pages = {"/": listings[0]}
+    pages.update({f"/catalogue/page-{number}.html": page for number, page in enumerate(listings, start=1)})
+    pages.update({f"/catalogue/{book['slug']}/index.html": page for book, page in zip(books, details)})
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = pages.get(self.path)
+            self.send_response(200 if body is not None else 404)
+            body = (body or "").encode("utf-8")
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def crawl(base_url, directory, max_pages, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        Processing.scrape_and_save(base_url, None, max_pages, directory, ["json"], checkpoint=False, **kwargs)
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--parse-workers", type=int, nargs="+",
+                        default=sorted({0, 1, 2, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    listing_count = -(-args.books // 20)
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    server = context.Process(target=serve, args=(args.books, args.latency, ready), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{ready.get()}/"
+    Processing.categories_map = {"Books": {"name": "Books", "url": base_url}}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            threaded_dir = os.path.join(directory, "threads")
+            threaded = crawl(base_url, threaded_dir, listing_count)
+            staged = {}
+            for workers in args.parse_workers:
+                pipeline_dir = os.path.join(directory, f"pipeline-{workers}")
+                staged[workers] = crawl(base_url, pipeline_dir, listing_count, pipeline=True, parse_workers=workers)
+                if not filecmp.cmp(os.path.join(threaded_dir, "books.json"),
+                                   os.path.join(pipeline_dir, "books.json"), shallow=False):
+                    raise SystemExit(f"The pipeline with {workers} parse workers produced different books")
+    finally:
+        server.terminate()
+
+    print(f"\n{args.books} books, {listing_count} listing pages, {args.latency * 1000:.0f} ms per response, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'threaded crawl':<28} {threaded:6.2f} s")
+    for workers, seconds in staged.items():
+        label = f"pipeline, {workers} parse workers" if workers else "pipeline, parse thread"
+        print(f"{label:<28} {seconds:6.2f} s  ({threaded / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+SQLite BookStore: cost of saving (first insert, then a re-scrape that upserts every row)
+and the Processing helpers pushed down into SQL vs reloading a JSON export and running
+them on the list.
+
+Each query is checked to return the same records, in the same order, on both.
+
+    python -m benchmarks.bench_store [--rows 200000] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_frame import best_of, records
+from src.book_scraper.Processing import Processing
+from src.book_scraper.book_store import BookStore
+
+QUERIES = [
+    ("in_price_range", (10, 11)),
+    ("top_expensive", (5,)),
+    ("top_cheap", (5,)),
+    ("get_top_n_books_by_rating", (5,)),
+    ("average_rating", ()),
+    ("books_per_category", ()),
+    ("search_by_title", ("book 1999",)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    books = [dict(book, availability="In stock", url=f"http://books.toscrape.com/catalogue/book_{i}/index.html",
+                  image_url=None, description=None)
+             for i, book in enumerate(records(args.rows))]
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = Processing.save_json(books, "books", directory)
+        with BookStore(os.path.join(directory, "books.db")) as store:
+            for label in ("insert", "upsert again"):
+                started = time.perf_counter()
+                store.upsert_books(books)
+                print(f"{label:<14} {args.rows} rows in {time.perf_counter() - started:.2f} s")
+
+            print(f"\n{'query':<28} {'json+list ms':>13} {'sqlite ms':>10} {'speedup':>8}")
+            for name, query_args in QUERIES:
+                query = getattr(Processing, name)
+
+                def from_json():
+                    return query(Processing.load_json_data(json_path), *query_args)
+
+                if from_json() != query(store, *query_args):
+                    raise SystemExit(f"{name} returns different results from SQLite")
+                on_list = best_of(args.repeat, from_json)
+                on_store = best_of(args.repeat, query, store, *query_args)
+                print(f"{name:<28} {on_list * 1000:>13.1f} {on_store * 1000:>10.1f} {on_list / on_store:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Analytics over an export folder: load everything and query (load_all_books_from_folder)
+vs one streaming pass (Processing.stream_analytics). Reports time and peak memory.
+
+    python -m benchmarks.bench_streaming [--books 200000] [--files 50]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_frame import records
+from src.book_scraper.Processing import Processing
+
+
+def write_export(directory, books, files):
+    per_file = -(-len(books) // files)
+    for i in range(files):
+        folder = os.path.join(directory, f"category_{i}")
+        os.makedirs(folder)
+        with open(os.path.join(folder, "books.json"), 'w', encoding='utf-8') as f:
+            json.dump(books[i * per_file:(i + 1) * per_file], f, indent=4, ensure_ascii=False)
+
+
+def load_and_query(directory):
+    books = Processing.load_all_books_from_folder(directory)
+    return {
+        "average_rating": Processing.average_rating(books),
+        "books_per_category": Processing.books_per_category(books),
+        "in_range": len(Processing.in_price_range(books, 10, 30)),
+        "top_rated": Processing.get_top_n_books_by_rating(books, 5),
+        "top_expensive": Processing.top_expensive(books, 5),
+        "top_cheap": Processing.top_cheap(books, 5),
+    }
+
+
+def stream(directory):
+    result = Processing.stream_analytics(directory, 5, [(10, 30)])
+    return {
+        "average_rating": result["average_rating"],
+        "books_per_category": result["books_per_category"],
+        "in_range": result["price_range_counts"]["10-30"],
+        "top_rated": result["top_rated"],
+        "top_expensive": result["top_expensive"],
+        "top_cheap": result["top_cheap"],
+    }
+
+
+def measure(func, directory):
+    started = time.perf_counter()
+    result = func(directory)
+    seconds = time.perf_counter() - started
+    # Peak memory from a second, traced run: tracemalloc slows the run down too much to time it
+    tracemalloc.start()
+    func(directory)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--files", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(directory, records(args.books), args.files)
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+        print(f"{args.books} books in {args.files} files ({size / 2 ** 20:.1f} MiB)")
+
+        expected, load_seconds, load_peak = measure(load_and_query, directory)
+        streamed, stream_seconds, stream_peak = measure(stream, directory)
+        if streamed != expected:
+            raise SystemExit("Streaming analytics differ from the load-everything results")
+
+        print(f"{'mode':<16} {'seconds':>8} {'peak MiB':>9}")
+        print(f"{'load + query':<16} {load_seconds:>8.2f} {load_peak / 2 ** 20:>9.1f}")
+        print(f"{'streaming':<16} {stream_seconds:>8.2f} {stream_peak / 2 ** 20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Synthetic pages with the same markup as books.toscrape.com, for benchmarks that
+must run offline. The layout (header, side menu, product pods, pager, detail page
+description and product table) follows the real site closely enough that every
+extractor in src.book_scraper.parser finds what it looks for.
+"""
+import random
+
+BASE_URL = "http://books.toscrape.com/"
+
+CATEGORY_NAMES = [
+    "Travel", "Mystery", "Historical Fiction", "Sequential Art", "Classics", "Philosophy", "Romance",
+    "Womens Fiction", "Fiction", "Childrens", "Religion", "Nonfiction", "Music", "Default", "Science Fiction",
+    "Sports and Games", "Add a comment", "Fantasy", "New Adult", "Young Adult", "Science", "Poetry",
+    "Paranormal", "Art", "Psychology", "Autobiography", "Parenting", "Adult Fiction", "Humor", "Horror",
+    "History", "Food and Drink", "Christian Fiction", "Business", "Biography", "Thriller", "Contemporary",
+    "Spirituality", "Academic", "Self Help", "Historical", "Christian", "Suspense", "Short Stories", "Novels",
+    "Health", "Politics", "Cultural", "Erotica", "Crime",
+]
+RATING_WORDS = ["One", "Two", "Three", "Four", "Five"]
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+         "et dolore magna aliqua the book story reader life world love journey secret night city").split()
+
+
+def category_slug(name, index):
+    return f"{name.lower().replace(' ', '-')}_{index + 2}"
+
+
+def make_books(count, seed=0):
+    """Deterministic list of book records used to render the fixture pages."""
+    rng = random.Random(seed)
+    books = []
+    for i in range(count):
+        title_words = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(2, 7)))
+        books.append({
+            "title": f"{title_words} #{i}",
+            "slug": f"{title_words.lower().replace(' ', '-')}_{1000 - i}",
+            "price": f"{rng.randint(10, 59)}.{rng.randint(0, 99):02d}",
+            "rating": rng.choice(RATING_WORDS),
+            "stock": rng.randint(1, 22),
+            "category": rng.choice(CATEGORY_NAMES),
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(80, 250))).capitalize() + ". ...more",
+        })
+    return books
+
+
+def _header():
+    return ('<!DOCTYPE html><html lang="en-us" class="no-js"><head><title>All products | Books to Scrape - Sandbox'
+            '</title><meta http-equiv="content-type" content="text/html; charset=UTF-8" />'
+            '<link rel="stylesheet" type="text/css" href="static/oscar/css/styles.css" />'
+            '<script src="static/oscar/js/bootstrap3/bootstrap.min.js"></script></head>'
+            '<body id="default" class="default"><header class="header container-fluid"><div class="page_inner">'
+            '<div class="row"><div class="col-sm-8 h1"><a href="index.html">Books to Scrape</a>'
+            '<small> We love being scraped!</small></div></div></div></header>'
+            '<div class="container-fluid page"><div class="page_inner"><ul class="breadcrumb">'
+            '<li><a href="index.html">Home</a></li><li class="active">All products</li></ul>')
+
+
+def _side_menu():
+    items = "".join(
+        f'<li><a href="catalogue/category/books/{category_slug(name, i)}/index.html">\n'
+        f'                            \n                                {name}\n'
+        f'                            \n                        </a></li>'
+        for i, name in enumerate(CATEGORY_NAMES)
+    )
+    return ('<aside class="sidebar col-sm-4 col-md-3"><div id="promotions_left"></div>'
+            '<div class="side_categories"><ul class="nav nav-list"><li>'
+            '<a href="catalogue/category/books_1/index.html">Books</a>'
+            f'<ul>{items}</ul></li></ul></div></aside>')
+
+
+def _product_pod(book):
+    return (f'<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">'
+            f'<div class="image_container"><a href="catalogue/{book["slug"]}/index.html">'
+            f'<img src="media/cache/2c/da/{book["slug"]}.jpg" alt="{book["title"]}" class="thumbnail"></a></div>'
+            f'<p class="star-rating {book["rating"]}"><i class="icon-star"></i><i class="icon-star"></i>'
+            f'<i class="icon-star"></i><i class="icon-star"></i><i class="icon-star"></i></p>'
+            f'<h3><a href="catalogue/{book["slug"]}/index.html" title="{book["title"]}">{book["title"][:20]}...</a></h3>'
+            f'<div class="product_price"><p class="price_color">£{book["price"]}</p>'
+            f'<p class="instock availability">\n    <i class="icon-ok"></i>\n    \n        In stock\n    \n</p>'
+            f'<form><button type="submit" class="btn btn-primary btn-block" data-loading-text="Adding...">'
+            f'Add to basket</button></form></div></article></li>')
+
+
+def listing_page(books, page=1, page_size=20):
+    """Listing page `page` of all `books`, with pager and result count."""
+    pages = max(1, -(-len(books) // page_size))
+    chunk = books[(page - 1) * page_size:page * page_size]
+    pager = ""
+    if pages > 1:
+        pager = f'<ul class="pager"><li class="current">\n    Page {page} of {pages}\n    </li>'
+        if page < pages:
+            pager += f'<li class="next"><a href="catalogue/page-{page + 1}.html">next</a></li>'
+        pager += "</ul>"
+    return (_header() + '<div class="row">' + _side_menu() +
+            '<div class="col-sm-8 col-md-9"><div class="page-header action"><h1>All products</h1></div>'
+            f'<form method="get" class="form-horizontal"><div style="display:none"></div>'
+            f'<strong>{len(books)}</strong> results - showing <strong>{(page - 1) * page_size + 1}</strong> '
+            f'to <strong>{(page - 1) * page_size + len(chunk)}</strong>.</form>'
+            '<section><div class="alert alert-warning" role="alert"><strong>Warning!</strong> '
+            'This is a demo website for web scraping purposes.</div><div><ol class="row">' +
+            "".join(_product_pod(book) for book in chunk) +
+            f'</ol><div>{pager}</div></div></section></div></div></div></div>'
+            '<footer class="footer container-fluid"></footer></body></html>')
+
+
+def detail_page(book):
+    """Product page of `book`, with the description paragraph after div#product_description."""
+    rows = "".join(f'<tr><th>{name}</th><td>{value}</td></tr>' for name, value in [
+        ("UPC", "a897fe39b1053632"), ("Product Type", "Books"), ("Price (excl. tax)", f'£{book["price"]}'),
+        ("Price (incl. tax)", f'£{book["price"]}'), ("Tax", "£0.00"),
+        ("Availability", f'In stock ({book["stock"]} available)'), ("Number of reviews", "0"),
+    ])
+    return (_header() + '<div class="row"><div class="col-sm-12"><div id="messages"></div>'
+            '<div class="content"><div id="promotions"></div><div id="content_inner">'
+            '<article class="product_page"><div class="row"><div class="col-sm-6">'
+            f'<div id="product_gallery" class="carousel"><div class="thumbnail"><div class="carousel-inner">'
+            f'<div class="item active"><img src="../../media/cache/fe/72/{book["slug"]}.jpg" alt="{book["title"]}" />'
+            '</div></div></div></div></div><div class="col-sm-6 product_main">'
+            f'<h1>{book["title"]}</h1><p class="price_color">£{book["price"]}</p>'
+            f'<p class="instock availability">\n    <i class="icon-ok"></i>\n    \n        '
+            f'In stock ({book["stock"]} available)\n    \n</p>'
+            f'<p class="star-rating {book["rating"]}"><i class="icon-star"></i></p><hr/></div></div>'
+            '<div id="product_description" class="sub-header"><h2>Product Description</h2></div>'
+            f'<p>{book["description"]}</p>'
+            f'<div class="sub-header"><h2>Product Information</h2></div><table class="table table-striped">{rows}'
+            '</table><div id="reviews" class="reviews"></div></article></div></div></div></div></div>'
+            '<footer class="footer container-fluid"></footer>'
+            '<script src="static/oscar/js/oscar/ui.js"></script></body></html>')
+
+
+def corpus(book_count=200, seed=0):
+    """(listing_pages, detail_pages, books) for a catalogue of book_count books."""
+    books = make_books(book_count, seed)
+    pages = max(1, -(-book_count // 20))
+    listings = [listing_page(books, page) for page in range(1, pages + 1)]
+    details = [detail_page(book) for book in books]
+    return listings, details, books
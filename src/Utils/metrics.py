@@ -0,0 +1,261 @@
+﻿import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Tuple
+
+# Upper bounds in seconds; requests, parses and saves all fall somewhere in this range
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "book_scraper_"
+# cProfile on sys.monitoring (3.12+) sees every thread and refuses a second profiler
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)
+
+# Metric name -> help text, for the Prometheus export
+DESCRIPTIONS = {
+    "requests_total": "HTTP responses received, by status code",
+    "request_errors_total": "Requests that failed without a response, by error kind",
+    "request_retries_total": "Requests sent again after a throttling or server error status",
+    "response_bytes_total": "Bytes of response bodies downloaded",
+    "request_seconds": "Time from sending a request to having its response",
+    "parse_seconds": "Time to parse one page into a tree",
+    "extract_seconds": "Time to extract one book from a listing page",
+    "save_seconds": "Time to write one output file, by format",
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout, plus count and sum."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram") -> None:
+        for position, count in enumerate(other.counts):
+            self.counts[position] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _prometheus_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms of a crawl, keyed by name and labels.
+
+    The request layer, the parser, the extraction schema and the exporters record into
+    the shared REGISTRY; report() and to_prometheus() export what was recorded, as a
+    JSON run report or in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self.started = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        self.observe_many(name, (value,), **labels)
+
+    def observe_many(self, name: str, values: Iterable[float], **labels) -> None:
+        """Record several observations under one lock, for loops that time many items."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            for value in values:
+                histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the time the block takes, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def drain(self) -> Tuple[Dict, Dict]:
+        """Take out everything recorded so far, for a worker process to hand to the parent's merge()."""
+        with self._lock:
+            drained = (self._counters, self._histograms)
+            self._counters, self._histograms = {}, {}
+        return drained
+
+    def merge(self, drained: Tuple[Dict, Dict]) -> None:
+        counters, histograms = drained
+        with self._lock:
+            for key, value in counters.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, histogram in histograms.items():
+                if key in self._histograms:
+                    self._histograms[key].merge(histogram)
+                else:
+                    self._histograms[key] = histogram
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def report(self) -> Dict[str, Any]:
+        """Everything recorded so far, as a JSON-serializable run report."""
+        with self._lock:
+            counters, histograms = dict(self._counters), {key: h.to_dict() for key, h in self._histograms.items()}
+        report = {"started": self.started, "finished": time.time(), "counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters.items()):
+            report["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), histogram in sorted(histograms.items()):
+            report["histograms"].setdefault(name, []).append(dict(histogram, labels=dict(labels)))
+        return report
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, h.to_dict()) for key, h in self._histograms.items())
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{METRIC_PREFIX}{name}{_prometheus_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            header(name, "histogram")
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{_prometheus_labels(labels, (('le', bound),))} {count}")
+            lines.append(f"{METRIC_PREFIX}{name}_sum{_prometheus_labels(labels)} {histogram['sum']}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{_prometheus_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def write_prometheus(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        return path
+
+
+REGISTRY = MetricsRegistry()
+
+
+@contextmanager
+def profiled(directory: str, top: int = 20):
+    """
+    Profile the block with cProfile and tracemalloc and dump both into directory:
+    crawl.prof (load it with pstats or snakeviz) and crawl.tracemalloc (a tracemalloc
+    Snapshot). The slowest functions and the largest allocation sites are printed.
+
+    Before Python 3.12 cProfile only sees the thread it is enabled in, so every thread
+    started inside the block (detail pages, planned listing pages, covers) gets a profiler
+    of its own and crawl.prof is the merge of all of them; threads started before the
+    block are not profiled. From 3.12 on cProfile runs on sys.monitoring, which sees every
+    thread but allows a single profiler, so the one process-level profiler is used alone.
+    The pipeline's parse worker processes are never profiled.
+    """
+    os.makedirs(directory, exist_ok=True)
+    thread_profilers = []
+    thread_profilers_lock = threading.Lock()
+
+    def profile_new_thread(frame, event, arg):
+        # Installed by threading.setprofile, so the first event in each new thread lands here
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler owns this thread; leave it alone rather than kill the thread
+            sys.setprofile(None)
+            return
+        with thread_profilers_lock:
+            thread_profilers.append(profiler)
+
+    profiler = cProfile.Profile()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start(25)
+    if PER_THREAD_PROFILERS:
+        threading.setprofile(profile_new_thread)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        if PER_THREAD_PROFILERS:
+            threading.setprofile(None)
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+
+        stats = pstats.Stats(profiler)
+        with thread_profilers_lock:
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)
+        profile_path = os.path.join(directory, "crawl.prof")
+        snapshot_path = os.path.join(directory, "crawl.tracemalloc")
+        stats.dump_stats(profile_path)
+        snapshot.dump(snapshot_path)
+
+        output = io.StringIO()
+        stats.stream = output
+        stats.sort_stats("tottime").print_stats(top)
+        scope = (f"the main thread and {len(thread_profilers)} worker threads" if PER_THREAD_PROFILERS
+                 else "every thread")
+        print(f"Profile of {scope} (parse worker processes not included):")
+        print(output.getvalue())
+        print(f"Peak traced memory: {peak / 2 ** 20:.1f} MiB; largest allocation sites:")
+        for statistic in snapshot.statistics("lineno")[:top]:
+            print(f"  {statistic}")
+        print(f"Profile saved to {profile_path}, memory snapshot to {snapshot_path}")
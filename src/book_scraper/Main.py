@@ -1,10 +1,96 @@
-﻿from src.book_scraper.Processing import Processing
-
-
-def main():
+﻿import argparse
+import os
+from contextlib import nullcontext
+
+from src.book_scraper.Processing import Processing, DEFAULT_MAX_IN_FLIGHT
+from src.book_scraper.book_index import BookIndex
+from src.book_scraper.category_catalog import CATEGORY_CACHE_FILE, DEFAULT_CATEGORY_TTL
+from src.book_scraper.seen_urls import SeenUrls, DEFAULT_FRESHNESS
+from src.book_scraper.pipeline import DEFAULT_PARSE_WORKERS
+from src.book_scraper.parser import (PARSER_BACKENDS, DEFAULT_PARSER_BACKEND, DESCRIPTION_MODES,
+                                     set_parser_backend, set_description_mode)
+from src.requests_module.rate_limiter import RateLimiter
+from src.requests_module.response_cache import ResponseCache
+from src.requests_module.session_manager import SessionManager
+from src.Utils.metrics import REGISTRY, profiled
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape books from books.toscrape.com")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Cache HTTP responses (and the category list) in this directory "
+                             "and revalidate them on later runs")
+    parser.add_argument("--cache-ttl", type=int, default=3600,
+                        help="Seconds a cached response is served without revalidation (default: 3600)")
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="Maximum requests per second per host; 0 disables rate limiting (default: 10)")
+    parser.add_argument("--category-ttl", type=int, default=DEFAULT_CATEGORY_TTL,
+                        help="Seconds the on-disk category list is reused before it is fetched again; "
+                             "0 always fetches it (default: 86400)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write books to books.jsonl/books.csv as they are scraped instead of at the end")
+    parser.add_argument("--images", action="store_true",
+                        help="Also download book covers into <output directory>/images")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Fetch pages on threads and parse them in a process pool, as separate stages")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="Parser processes in --pipeline mode; 0 parses on a thread (default: CPU count)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted crawl from its journal instead of starting over")
+    parser.add_argument("--seen-db", default=None,
+                        help="Remember fetched detail pages in this SQLite file and skip them on later runs")
+    parser.add_argument("--freshness", type=float, default=DEFAULT_FRESHNESS,
+                        help="Seconds a detail page fetched by an earlier run counts as seen (default: 86400)")
+    parser.add_argument("--parser", choices=list(PARSER_BACKENDS), default=DEFAULT_PARSER_BACKEND,
+                        help="HTML parser backend (default: html.parser)")
+    parser.add_argument("--descriptions", choices=list(DESCRIPTION_MODES), default="dom",
+                        help="Parse whole detail pages (dom) or stop reading at the description (stream)")
+    parser.add_argument("--metrics-json", default=None,
+                        help="Write a JSON run report of request, parse, extraction and save metrics to this file")
+    parser.add_argument("--metrics-prom", default=None,
+                        help="Write the same metrics in the Prometheus text format to this file")
+    parser.add_argument("--profile", default=None, metavar="DIR",
+                        help="Profile the run with cProfile and tracemalloc and save both snapshots in DIR")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_parser_backend(args.parser)
+    set_description_mode(args.descriptions)
+    Processing.category_cache_ttl = args.category_ttl
+    if args.cache_dir:
+        Processing.category_cache_path = os.path.join(args.cache_dir, CATEGORY_CACHE_FILE)
+    cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl) if args.cache_dir else None
+    rate_limiter = RateLimiter(rate=args.rate, max_concurrency=DEFAULT_MAX_IN_FLIGHT) if args.rate > 0 else None
+
+    seen_urls = SeenUrls(args.seen_db, freshness=args.freshness) if args.seen_db else None
+
+    REGISTRY.reset()
+    # One connection pool (and optional response cache) for the whole run
+    try:
+        with profiled(args.profile) if args.profile else nullcontext(), \
+                SessionManager(pool_maxsize=DEFAULT_MAX_IN_FLIGHT, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                               cache=cache, rate_limiter=rate_limiter) as session_manager:
+            run(session_manager, resume=args.resume, stream=args.stream, seen_urls=seen_urls, images=args.images,
+                pipeline=args.pipeline, parse_workers=args.parse_workers)
+            if cache is not None:
+                print(f"\nResponse cache: {cache.stats()}")
+    finally:
+        if seen_urls is not None:
+            seen_urls.close()
+        if args.metrics_json:
+            print(f"Run report saved to {REGISTRY.write_report(args.metrics_json)}")
+        if args.metrics_prom:
+            print(f"Prometheus metrics saved to {REGISTRY.write_prometheus(args.metrics_prom)}")
+
+
+def run(session_manager, resume=False, stream=False, seen_urls=None, images=False, pipeline=False,
+        parse_workers=DEFAULT_PARSE_WORKERS):
     base_url = "http://books.toscrape.com/"
 
-    categories = Processing.fetch_all_categories(base_url)
+    # A warm start reads the category list from disk instead of the site
+    categories = Processing.load_categories(base_url, "output_data")
 
     print("\n=== Available Categories ===")
     for name, details in categories.items():
@@ -24,7 +110,14 @@ def main():
             category_name= category[0],  # Specify the category to scrape
             max_pages=2,
             directory="output_data",
-            formats=["json", "csv"]
+            formats=["json", "csv"],
+            session_manager=session_manager,
+            resume=resume,
+            stream=stream,
+            seen_urls=seen_urls,
+            images=images,
+            pipeline=pipeline,
+            parse_workers=parse_workers
         )
     else:
         # Example 2: Scrape multiple categories at once
@@ -33,7 +126,14 @@ def main():
             base_url=base_url,
             max_pages_per_category=1,
             directory="output_by_category",
-            formats=["json"]
+            formats=["json"],
+            session_manager=session_manager,
+            resume=resume,
+            stream=stream,
+            seen_urls=seen_urls,
+            images=images,
+            pipeline=pipeline,
+            parse_workers=parse_workers
         )
     if len(category) == 1:
         print("\n=== Scraping Results ===")
@@ -51,7 +151,8 @@ def main():
                 for format_type, path in paths.items():
                     print(f"      - {format_type}: {path}")
 
-    all_books = Processing.load_all_books_from_folder("output_data")
+    # Indexed once; every query below is then a lookup instead of a scan of all books
+    all_books = BookIndex(Processing.load_all_books_from_folder("output_data"))
 
     print("Top 5 rated books:")
     Top5Books = Processing.get_top_n_books_by_rating(all_books, 5)
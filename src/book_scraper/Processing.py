@@ -1,21 +1,58 @@
-﻿import json
+﻿import asyncio
+import json
 import csv
 import os
-from typing import List, Dict, Any, Union, Optional
-from src.book_scraper.models.book import Book
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Union, Optional, Tuple
+from src.book_scraper.models.book import BOOK_FIELDS, Book, parse_price_pence
 from src.book_scraper.models.category import Category
+from src.book_scraper.book_frame import BookFrame
+from src.book_scraper.book_index import BookIndex
+from src.book_scraper.book_store import BookStore, SQLITE_FILENAME
+from src.book_scraper.streaming_analytics import aggregate_folder, iter_json_lines
+from src.book_scraper.book_loader import load_books
+from src.book_scraper.sinks import BookStreamWriter, JsonLinesSink, save_timer
+from src.book_scraper.columnar import write_books_parquet, read_books_parquet
+from src.book_scraper.exporter import CatalogExporter
+from src.book_scraper.crawl_journal import CrawlJournal
+from src.book_scraper.category_catalog import (CategoryCatalog, DEFAULT_CATEGORY_TTL, default_category_cache_path,
+                                               load_cached_categories, save_cached_categories)
+from src.book_scraper.seen_urls import SeenUrls, seen_scope, active_seen_urls
+from src.book_scraper.cover_images import CoverDownloader, IMAGE_DIRECTORY, DEFAULT_IMAGE_WORKERS
+from src.book_scraper.pipeline import CrawlPipeline, DEFAULT_PARSE_WORKERS
 from src.requests_module.requests_manager import get_request
+from src.requests_module.session_manager import SessionManager, session_scope, active_session_manager
+from src.requests_module.async_requests_manager import (AsyncSessionManager, async_session_scope, async_get_request,
+                                                        DEFAULT_ASYNC_CONCURRENCY)
 from bs4 import BeautifulSoup, Tag
-from src.book_scraper.parser import parse_html, extract_product_details, get_next_page_url
+from src.book_scraper.parser import (parse_html, extract_product_details, extract_listing_products, get_next_page_url,
+                                    plan_page_urls, extract_categories, aextract_description, DEFAULT_DETAIL_WORKERS, DEFAULT_PAGE_WORKERS)
+
+# Categories crawled at the same time by scrape_categories
+DEFAULT_CATEGORY_WORKERS = 4
+# Global cap on concurrent requests across all categories of one scrape_categories run
+DEFAULT_MAX_IN_FLIGHT = 16
+# Prebuilt views of a dataset (or a database) that the query helpers hand their work to
+QUERY_VIEWS = (BookFrame, BookIndex, BookStore)
+
 
 class Processing:
     """
     Class for processing and storing scraped book and category data to files.
-    Provides methods to save data in CSV and JSON formats with category support.
+    Provides methods to save data in CSV, JSON and Parquet formats with category support,
+    and to upsert it into a SQLite database.
     """
 
     # Class variable to store all available categories
     categories_map = {}
+    # On-disk copy of categories_map per site, reused by later runs until it is older than the TTL;
+    # kept under the output directory (see default_category_cache_path) unless a path is set here
+    category_cache_path = None
+    category_cache_ttl = DEFAULT_CATEGORY_TTL
+    # Lookups built over categories_map, rebuilt whenever categories_map is replaced
+    _category_catalog = None
 
     @staticmethod
     def ensure_directory_exists(directory_path: str) -> None:
@@ -40,7 +77,7 @@ class Processing:
         full_path = os.path.join(directory, f"{filename}.json")
 
         try:
-            with open(full_path, 'w', encoding='utf-8') as f:
+            with save_timer(full_path), open(full_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4, ensure_ascii=False)
             print(f"Data successfully saved to {full_path}")
             return full_path
@@ -48,6 +85,32 @@ class Processing:
             print(f"Error saving JSON data to {full_path}: {e}")
             return ""
 
+    @staticmethod
+    def save_jsonl(data: List[Dict], filename: str, directory: str = "data") -> str:
+        """
+        Save data to a JSON Lines file, one record per line.
+
+        Args:
+            data: List of dictionaries
+            filename: Name of the file without extension
+            directory: Directory to save the file in
+
+        Returns:
+            Path to the saved file
+        """
+        Processing.ensure_directory_exists(directory)
+        full_path = os.path.join(directory, f"{filename}.jsonl")
+
+        try:
+            with save_timer(full_path), JsonLinesSink(full_path, append=False) as sink:
+                for record in data:
+                    sink.write(record)
+            print(f"Data successfully saved to {full_path}")
+            return full_path
+        except Exception as e:
+            print(f"Error saving JSON Lines data to {full_path}: {e}")
+            return ""
+
     @staticmethod
     def save_csv(data: List[Dict], filename: str, directory: str = "data") -> str:
         """
@@ -72,7 +135,7 @@ class Processing:
             # Get fieldnames from the first item
             fieldnames = list(data[0].keys())
 
-            with open(full_path, 'w', newline='', encoding='utf-8') as f:
+            with save_timer(full_path), open(full_path, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
                 writer.writerows(data)
@@ -83,6 +146,31 @@ class Processing:
             print(f"Error saving CSV data to {full_path}: {e}")
             return ""
 
+    @staticmethod
+    def save_parquet(data: List[Union[Dict, Book]], filename: str, directory: str = "data") -> str:
+        """
+        Save books to a compressed Parquet file with typed columns (requires pyarrow).
+
+        Args:
+            data: List of book dictionaries or Book objects
+            filename: Name of the file without extension
+            directory: Directory to save the file in
+
+        Returns:
+            Path to the saved file
+        """
+        Processing.ensure_directory_exists(directory)
+        full_path = os.path.join(directory, f"{filename}.parquet")
+
+        try:
+            with save_timer(full_path):
+                write_books_parquet(data, full_path)
+            print(f"Data successfully saved to {full_path}")
+            return full_path
+        except Exception as e:
+            print(f"Error saving Parquet data to {full_path}: {e}")
+            return ""
+
     @classmethod
     def save_books(cls, books: List[Book], directory: str = "data", formats: List[str] = ["json", "csv"]) -> Dict[
         str, str]:
@@ -92,29 +180,12 @@ class Processing:
         Args:
             books: List of Book objects
             directory: Directory to save the files in
-            formats: List of formats to save the data in ("json", "csv")
+            formats: List of formats to save the data in ("json", "jsonl", "csv", "parquet")
 
         Returns:
             Dictionary with the paths to the saved files
         """
-        if not books:
-            print("No books to save")
-            return {}
-
-        book_dicts = [book.to_dict() for book in books]
-        result_paths = {}
-
-        if "json" in formats:
-            json_path = cls.save_json(book_dicts, "books", directory)
-            if json_path:
-                result_paths["json"] = json_path
-
-        if "csv" in formats:
-            csv_path = cls.save_csv(book_dicts, "books", directory)
-            if csv_path:
-                result_paths["csv"] = csv_path
-
-        return result_paths
+        return CatalogExporter(directory, formats).write_books(books)
 
     @classmethod
     def save_categories(cls, categories: List[Category], directory: str = "data",
@@ -131,58 +202,36 @@ class Processing:
         Returns:
             Dictionary with the paths to the saved files
         """
-        if not categories:
-            print("No categories to save")
-            return {}
-
-        category_dicts = []
-        for category in categories:
-            cat_dict = category.to_dict()
-
-            # If not including books, remove them from the dictionary
-            if not include_books:
-                cat_dict.pop("books", None)
-
-            category_dicts.append(cat_dict)
-
-        result_paths = {}
-
-        if "json" in formats:
-            json_path = cls.save_json(category_dicts, "categories", directory)
-            if json_path:
-                result_paths["json"] = json_path
+        return CatalogExporter(directory, formats).write_categories(categories, include_books)
 
-        if "csv" in formats:
-            # For CSV, we need to flatten the data if include_books is True
-            if include_books:
-                # Creating a separate books CSV with category information
-                all_books = []
-                for category in categories:
-                    for book in category.books:
-                        book_dict = book.to_dict()
-                        book_dict["category_name"] = category.name
-                        all_books.append(book_dict)
-
-                if all_books:
-                    books_csv_path = cls.save_csv(all_books, "category_books", directory)
-                    if books_csv_path:
-                        result_paths["csv_books"] = books_csv_path
-
-            # Save the category data without books to CSV
-            simplified_categories = []
-            for cat_dict in category_dicts:
-                simple_cat = {k: v for k, v in cat_dict.items() if k != "books"}
-                simplified_categories.append(simple_cat)
+    @staticmethod
+    def save_sqlite(books: Iterable[Union[Dict, Book]] = (), categories: List[Category] = (),
+                    database: str = os.path.join("data", SQLITE_FILENAME)) -> str:
+        """
+        Upsert books (keyed by URL) and categories into a SQLite database.
 
-            csv_path = cls.save_csv(simplified_categories, "categories", directory)
-            if csv_path:
-                result_paths["csv"] = csv_path
+        Args:
+            books: Book objects or book dictionaries
+            categories: List of Category objects
+            database: Path of the database file, created if missing
 
-        return result_paths
+        Returns:
+            Path to the database
+        """
+        try:
+            with save_timer(database, "sqlite"), BookStore(database) as store:
+                book_count = store.upsert_books(books)
+                category_count = store.upsert_categories(categories)
+            print(f"Upserted {book_count} books and {category_count} categories into {database}")
+            return database
+        except Exception as e:
+            print(f"Error saving data to SQLite database {database}: {e}")
+            return ""
 
     @classmethod
     def save_all_data(cls, books: List[Book] = None, categories: List[Category] = None,
-                      directory: str = "data", formats: List[str] = ["json", "csv"]) -> Dict[str, Dict[str, str]]:
+                      directory: str = "data", formats: List[str] = ["json", "csv"],
+                      database: Optional[str] = None) -> Dict[str, Dict[str, str]]:
         """
         Save both books and categories data to files in specified formats.
 
@@ -190,36 +239,38 @@ class Processing:
             books: List of Book objects
             categories: List of Category objects
             directory: Directory to save the files in
-            formats: List of formats to save the data in ("json", "csv")
+            formats: List of formats to save the data in ("json", "csv", "sqlite";
+                "jsonl" and "parquet" apply to books only)
+            database: SQLite database for the "sqlite" format, <directory>/books.db by default
 
         Returns:
             Dictionary with paths to all saved files
         """
-        result = {}
-
-        if books:
-            result["books"] = cls.save_books(books, directory, formats)
+        # One exporter for both, so every book is converted and serialized once
+        result = CatalogExporter(directory, formats).write_all(books, categories)
 
-        if categories:
-            result["categories"] = cls.save_categories(categories, directory, formats)
+        if "sqlite" in formats and (books or categories):
+            database_path = cls.save_sqlite(books or [], categories or [],
+                                            database or os.path.join(directory, SQLITE_FILENAME))
+            if database_path:
+                result["sqlite"] = {"database": database_path}
 
         return result
 
     @classmethod
-    def fetch_all_categories(cls, base_url: str = "http://books.toscrape.com/") -> Dict[str, Dict]:
+    def fetch_all_categories(cls, base_url: str = "http://books.toscrape.com/",
+                             directory: str = "data") -> Dict[str, Dict]:
         """
         Fetch all available categories from the website and store them in the class variable.
 
         Args:
             base_url: Base URL of the website
+            directory: Output directory whose category cache is refreshed (see category_cache_path)
 
         Returns:
             Dictionary mapping category names to their details
         """
         try:
-            # Import parser functions from your module
-            from src.book_scraper.parser import parse_html
-
             response = get_request(base_url)
             if not response or not hasattr(response, 'text'):
                 print(f"Failed to fetch categories from {base_url}")
@@ -229,46 +280,60 @@ class Processing:
             if not soup:
                 return {}
 
-            # Find the category navigation section
-            side_categories = soup.select('.side_categories .nav-list > li > ul > li > a')
-
-            categories_map = {}
-
-            for category_link in side_categories:
-                category_name = category_link.get_text(strip=True)
-                category_url = category_link.get('href', '')
-
-                # Build the full URL for the category
-                if category_url:
-                    category_url = base_url + category_url if not category_url.startswith('http') else category_url
-
-                # Extract category ID from URL if possible
-                category_id = None
-                if category_url and '/' in category_url:
-                    parts = category_url.rstrip('/').split('/')
-                    for i, part in enumerate(parts):
-                        if part == "category" and i + 2 < len(parts):
-                            # Format is typically /category/books/category_id/
-                            category_id = parts[i + 2].split('_')[1] if '_' in parts[i + 2] else None
-                            break
-
-                categories_map[category_name] = {
-                    'name': category_name,
-                    'url': category_url,
-                    'id': category_id,
-                    'book_count': 0
-                }
+            categories_map = extract_categories(soup, base_url)
 
             # Store in class variable for future use
             cls.categories_map = categories_map
 
             print(f"Fetched {len(categories_map)} categories from {base_url}")
-            return categories_map
-
         except Exception as e:
             print(f"Error fetching categories: {e}")
             return {}
 
+        if categories_map:
+            cache_path = cls._category_cache_file(directory)
+            try:
+                save_cached_categories(base_url, categories_map, cache_path)
+            except Exception as e:
+                print(f"Error caching categories to {cache_path}: {e}")
+        return categories_map
+
+    @classmethod
+    def _category_cache_file(cls, directory: str) -> str:
+        return cls.category_cache_path or default_category_cache_path(directory)
+
+    @classmethod
+    def load_categories(cls, base_url: str = "http://books.toscrape.com/", directory: str = "data") -> Dict[str, Dict]:
+        """
+        Return the category map, fetching it only if it is neither in memory nor in a fresh
+        on-disk cache (category_cache_path, or .cache/categories.json in the output directory,
+        trusted for category_cache_ttl seconds).
+
+        Args:
+            base_url: Base URL of the website
+            directory: Output directory whose category cache is used
+
+        Returns:
+            Dictionary mapping category names to their details
+        """
+        if cls.categories_map:
+            return cls.categories_map
+
+        cache_path = cls._category_cache_file(directory)
+        cached = load_cached_categories(base_url, cache_path, cls.category_cache_ttl)
+        if cached:
+            cls.categories_map = cached
+            print(f"Loaded {len(cached)} categories from {cache_path}")
+            return cached
+
+        return cls.fetch_all_categories(base_url, directory)
+
+    @classmethod
+    def _catalog(cls) -> CategoryCatalog:
+        if cls._category_catalog is None or cls._category_catalog.categories is not cls.categories_map:
+            cls._category_catalog = CategoryCatalog(cls.categories_map)
+        return cls._category_catalog
+
     @classmethod
     def get_category_by_name(cls, category_name: str) -> Optional[Dict]:
         """
@@ -282,45 +347,20 @@ class Processing:
         """
         # If categories haven't been fetched yet, return None
         if not cls.categories_map:
-            print("Categories have not been fetched yet. Call fetch_all_categories() first.")
+            print("Categories have not been loaded yet. Call load_categories() first.")
             return None
 
         # Case-insensitive lookup
-        for name, details in cls.categories_map.items():
-            if name.lower() == category_name.lower():
-                return details
+        details = cls._catalog().by_name(category_name)
+        if details is not None:
+            return details
 
         print(f"Category '{category_name}' not found. Available categories: {', '.join(cls.categories_map.keys())}")
         return None
 
     @classmethod
-    def scrape_and_save(cls, base_url: str = "http://books.toscrape.com/",
-                        category_name: str = None,
-                        max_pages: int = 5,
-                        directory: str = "data",
-                        formats: List[str] = ["json", "csv"]) -> Dict[str, Dict[str, str]]:
-        """
-        Scrape books from the given URL for a specified number of pages and save the data.
-        Can scrape by category if category_name is provided.
-
-        Args:
-            base_url: Base URL of the website to scrape
-            category_name: Optional category name to scrape books from a specific category
-            max_pages: Maximum number of pages to scrape
-            directory: Directory to save the files in
-            formats: List of formats to save the data in ("json", "csv")
-
-        Returns:
-            Dictionary with paths to all saved files
-        """
-        from bs4 import BeautifulSoup
-
-        # Import here to avoid circular imports
-
-        # If categories haven't been fetched yet, fetch them
-        if not cls.categories_map:
-            cls.fetch_all_categories(base_url)
-
+    def _resolve_start_url(cls, base_url: str, category_name: Optional[str]) -> str:
+        """Return the listing URL a crawl starts from: the category page, or base_url."""
         # If category_name is provided, use its URL instead of base_url
         if category_name:
             category_details = cls.get_category_by_name(category_name)
@@ -333,114 +373,374 @@ class Processing:
         else:
             start_url = base_url
 
-        all_products = []
-        next_page = start_url
-        page_count = 0
+        return start_url
 
-        while next_page and page_count < max_pages:
-            print(f"Fetching page {page_count + 1} of {max_pages}: {next_page}")
-
-            try:
-                response = get_request(next_page)
-                if not response or not hasattr(response, 'text'):
-                    print(f"Failed to fetch {next_page}")
-                    break
-
-                soup = parse_html(response.text)
-                if not soup:
-                    break
-
-                page_products = extract_product_details(soup, base_url)
-                all_products.extend(page_products)
-
-                page_count += 1
-                if page_count >= max_pages:
-                    break
-
-                next_page = get_next_page_url(soup, next_page)
+    @classmethod
+    def _product_to_book(cls, product: Dict[str, Any], category_name: Optional[str]) -> Book:
+        """Turn one raw product dictionary from the parser into a Book."""
+        # Determine the category name
+        if category_name:
+            book_category = category_name
+        else:
+            # Take the category whose URL the product URL starts with, defaulting to "General Books"
+            book_category = cls._catalog().name_for_url(product.get('link') or '') or "General Books"
+
+        # Create a Book object; price, rating and stock are typed once, here
+        return Book(
+            title=product.get('title', "Unknown"),
+            price=product.get('price', "0"),
+            rating=product.get("rating", 0),
+            availability=product.get('availability', "Unknown"),
+            category=book_category,
+            url=product.get('link', None),
+            image_url=product.get('image_url', None),
+            description=product.get('description', None),
+            image_path=product.get('image_path', None)
+        )
 
-            except Exception as e:
-                print(f"Error during scraping: {e}")
-                break
+    @classmethod
+    def _new_category(cls, name: str, start_url: str) -> Category:
+        # Get category URL from map if available
+        cat_url = cls.categories_map.get(name, {}).get('url', start_url) if cls.categories_map else start_url
+        return Category(name=name, url=cat_url, book_count=0, books=[])
 
+    @classmethod
+    def _build_books_and_categories(cls, all_products: List[Dict[str, Any]], category_name: Optional[str],
+                                    start_url: str) -> Tuple[List[Book], List[Category]]:
+        """Turn raw product dictionaries from the parser into Book and Category objects."""
         # Convert products to Book objects
         books = []
         categories_dict = {}  # To track categories
 
         for product in all_products:
             try:
-                # Extract price value (remove currency symbol)
-                price_str = product.get('price', "0")
-                if isinstance(price_str, str):
-                    price_str = price_str.replace('£', '').strip()
-
-                rating = product.get("rating", 0)
-
-                # Determine the category name
-                if category_name:
-                    book_category = category_name
-                else:
-                    # Try to extract category from product URL or defaulting to "General"
-                    book_url = product.get('link', '')
-                    book_category = "General Books"
-
-                    # Extract category from URL if possible
-                    for cat_name, cat_details in cls.categories_map.items():
-                        if cat_details['url'] and cat_details['url'] in book_url:
-                            book_category = cat_name
-                            break
-
-                # Create a Book object
-                book = Book(
-                    title=product.get('title', "Unknown"),
-                    price=price_str,
-                    rating=rating,
-                    availability=product.get('availability', "Unknown"),
-                    category=book_category,
-                    url=product.get('link', None),
-                    image_url=product.get('image_url', None),
-                    description=product.get('description', None)
-                )
-
+                book = cls._product_to_book(product, category_name)
                 books.append(book)
 
                 # Add or update the category
-                if book_category not in categories_dict:
-                    # Get category URL from map if available
-                    cat_url = cls.categories_map.get(book_category, {}).get('url',
-                                                                            start_url) if cls.categories_map else start_url
+                if book.category not in categories_dict:
+                    categories_dict[book.category] = cls._new_category(book.category, start_url)
 
-                    categories_dict[book_category] = Category(
-                        name=book_category,
-                        url=cat_url,
-                        book_count=0,
-                        books=[]
-                    )
-
-                categories_dict[book_category].books.append(book)
-                categories_dict[book_category].book_count += 1
+                categories_dict[book.category].books.append(book)
+                categories_dict[book.category].book_count += 1
 
             except Exception as e:
                 print(f"Error processing product: {e}")
                 continue
 
-        categories = list(categories_dict.values())
+        return books, list(categories_dict.values())
+
+    @classmethod
+    def _save_scraped_data(cls, books: List[Book], categories: List[Category], category_name: Optional[str],
+                           directory: str, formats: List[str]) -> Dict[str, Dict[str, str]]:
+        """Save one crawl's books and categories, in a per-category directory when scraping a category."""
+        # Every category upserts into one database at the top of the output directory
+        database = os.path.join(directory, SQLITE_FILENAME)
 
         # Create a directory named after the category if scraping by category
         if category_name and categories:
             directory = os.path.join(directory, category_name.replace(" ", "_").lower())
 
         # Save the data
-        return cls.save_all_data(books, categories, directory, formats)
+        return cls.save_all_data(books, categories, directory, formats, database=database)
+
+    @staticmethod
+    def _scrape_listing_page(page_url: str, base_url: str,
+                             detail_workers: int = DEFAULT_DETAIL_WORKERS) -> Tuple[Optional[BeautifulSoup], List[Dict[str, Any]]]:
+        """Fetch one listing page and extract its products, detail pages included."""
+        try:
+            response = get_request(page_url)
+            if not response or not hasattr(response, 'text'):
+                print(f"Failed to fetch {page_url}")
+                return None, []
+
+            soup = parse_html(response.text)
+            if not soup:
+                return None, []
+
+            return soup, extract_product_details(soup, base_url, detail_workers, page_url=page_url)
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+            return None, []
+
+    @classmethod
+    def _checkpointed_listing_page(cls, page_url: str, base_url: str, detail_workers: int,
+                                   journal: Optional[CrawlJournal],
+                                   failed: Optional[List[str]] = None) -> Tuple[bool, Optional[BeautifulSoup],
+                                                                                List[Dict[str, Any]], Optional[str]]:
+        """
+        Scrape one listing page unless the journal already has it, and journal the result.
+
+        Returns (done, soup, products, next_url); soup is None for pages replayed from the journal.
+        A page that could not be fetched or parsed is not done, and its URL is appended to failed.
+        """
+        entry = journal.completed_page(page_url) if journal else None
+        if entry is not None:
+            print(f"Already scraped, skipping: {page_url}")
+            return True, None, entry["products"], entry["next"]
+
+        soup, products = cls._scrape_listing_page(page_url, base_url, detail_workers)
+        if soup is None:
+            if failed is not None:
+                failed.append(page_url)
+            return False, None, [], None
+
+        next_url = get_next_page_url(soup, page_url)
+        if journal:
+            journal.record_page(page_url, products, next_url)
+        return True, soup, products, next_url
+
+    @classmethod
+    def _crawl_listing(cls, start_url: str, base_url: str, max_pages: int, detail_workers: int, page_workers: int,
+                       journal: Optional[CrawlJournal],
+                       failed: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Scrape up to max_pages listing pages from start_url on threads, yielding each page's products in order.
+
+        The crawl stops at the first listing page that fails, as the page-by-page walk always did,
+        so the output never has a hole in it; the failed URL is appended to failed. Pages fetched
+        in parallel after it are still journaled, for a resumed crawl to pick up.
+        """
+        failed = failed if failed is not None else []
+        done, soup, first_products, next_page = cls._checkpointed_listing_page(start_url, base_url,
+                                                                               detail_workers, journal, failed)
+        if not done:
+            return
+        yield first_products
+
+        # The first page tells us how many pages there are, so the rest can be fetched at once
+        planned_urls = journal.frontier if journal else None
+        if planned_urls is None and soup is not None:
+            planned_urls = plan_page_urls(soup, start_url, max_pages) if max_pages > 1 else []
+            if planned_urls is not None and journal:
+                journal.record_frontier(planned_urls)
+
+        if planned_urls is None:
+            print("Could not read the page count, following next-page links instead")
+            page_count = 1
+
+            while next_page and page_count < max_pages:
+                print(f"Fetching page {page_count + 1} of {max_pages}: {next_page}")
+                done, _, page_products, next_page = cls._checkpointed_listing_page(next_page, base_url,
+                                                                                   detail_workers, journal, failed)
+                if not done:
+                    break
+                yield page_products
+                page_count += 1
+        elif planned_urls:
+            print(f"Fetching pages 2-{len(planned_urls) + 1} of {max_pages} in parallel")
+            with ThreadPoolExecutor(max_workers=max(1, min(page_workers, len(planned_urls)))) as executor:
+                # map() yields in submission order, so products keep the listing order
+                for done, _, page_products, _ in executor.map(
+                    lambda page_url: cls._checkpointed_listing_page(page_url, base_url,
+                                                                    detail_workers, journal, failed),
+                    planned_urls
+                ):
+                    if not done:
+                        break
+                    yield page_products
+
+    @staticmethod
+    def _journal_path(directory: str, category_name: Optional[str]) -> str:
+        name = category_name.replace(" ", "_").lower() if category_name else "all_books"
+        return os.path.join(directory, ".journal", f"{name}.jsonl")
+
+    @classmethod
+    def scrape_and_save(cls, base_url: str = "http://books.toscrape.com/",
+                        category_name: str = None,
+                        max_pages: int = 5,
+                        directory: str = "data",
+                        formats: List[str] = ["json", "csv"],
+                        session_manager: Optional[SessionManager] = None,
+                        detail_workers: int = DEFAULT_DETAIL_WORKERS,
+                        page_workers: int = DEFAULT_PAGE_WORKERS,
+                        resume: bool = False,
+                        checkpoint: bool = True,
+                        stream: bool = False,
+                        finalize: bool = True,
+                        seen_urls: Optional[SeenUrls] = None,
+                        images: bool = False,
+                        image_workers: int = DEFAULT_IMAGE_WORKERS,
+                        pipeline: bool = False,
+                        parse_workers: int = DEFAULT_PARSE_WORKERS) -> Dict[str, Dict[str, str]]:
+        """
+        Scrape books from the given URL for a specified number of pages and save the data.
+        Can scrape by category if category_name is provided.
+
+        Args:
+            base_url: Base URL of the website to scrape
+            category_name: Optional category name to scrape books from a specific category
+            max_pages: Maximum number of pages to scrape
+            directory: Directory to save the files in
+            formats: List of formats to save the data in ("json", "csv")
+            session_manager: Optional shared connection pool; a new one is used for this crawl if omitted
+            detail_workers: Maximum number of detail pages fetched concurrently per listing page
+            page_workers: Maximum number of listing pages fetched concurrently once the page count is known
+            resume: Continue from the crawl journal left by an interrupted run instead of starting over
+            checkpoint: Journal finished pages to disk while crawling so that the crawl can be resumed
+            stream: Write books to books.jsonl (and books.csv) as each page is scraped instead of
+                    keeping the whole crawl in memory until the end
+            finalize: In stream mode, also write books.json and the category files at the end
+            seen_urls: Optional seen-set of detail pages already fetched (possibly by earlier runs);
+                       the one of the enclosing crawl, or a new temporary one, is used if omitted
+            images: Also download every cover into <directory>/images and record it as the book's image_path
+            image_workers: Maximum number of covers downloaded at the same time
+            pipeline: Run the crawl as a staged pipeline (see CrawlPipeline): detail_workers threads
+                      fetch pages while a process pool parses them
+            parse_workers: Processes parsing pages in pipeline mode (0 parses on a thread)
+
+        Returns:
+            Dictionary with paths to all saved files, plus an "incomplete" entry with the listing
+            pages that failed (and the journal kept for resuming) when the crawl did not finish
+        """
+        from bs4 import BeautifulSoup
+
+        # Import here to avoid circular imports
+
+        # From memory, the on-disk cache, or the site if neither has them
+        cls.load_categories(base_url, directory)
+
+        start_url = cls._resolve_start_url(base_url, category_name)
+
+        journal = None
+        if checkpoint:
+            journal = CrawlJournal(cls._journal_path(directory, category_name))
+            if not (resume and journal.load(start_url, max_pages)):
+                journal.reset()
+            journal.record_start(start_url, max_pages)
+        crawl_started = time.perf_counter()
+
+        # A crawl started on its own reports its seen-set; inside scrape_categories the caller does
+        report_seen = seen_urls is not None or active_seen_urls() is None
+        seen = seen_urls or active_seen_urls()
+        owns_seen = seen is None
+        seen = seen or SeenUrls()
+
+        page_results = []
+        # Listing pages that could not be fetched or parsed
+        failed_pages = []
+        writer = None
+        stream_categories = {}
+        downloader = CoverDownloader(os.path.join(directory, IMAGE_DIRECTORY), image_workers) if images else None
+        if stream:
+            output_directory = directory
+            if category_name:
+                output_directory = os.path.join(directory, category_name.replace(" ", "_").lower())
+            # A book whose cover failed has no image_path, so the CSV header cannot come from the first row
+            writer = BookStreamWriter(output_directory, formats,
+                                      csv_fieldnames=BOOK_FIELDS + ("image_path",) if images else None)
+
+        def consume(page_products: List[Dict[str, Any]]) -> None:
+            if downloader is not None:
+                downloader.fill_image_paths(page_products)
+            if writer is None:
+                page_results.append(page_products)
+                return
+            # Stream mode: persist the page's books now and only keep per-category counts
+            for product in page_products:
+                try:
+                    book = cls._product_to_book(product, category_name)
+                except Exception as e:
+                    print(f"Error processing product: {e}")
+                    continue
+                writer.write(book.to_dict())
+                if book.category not in stream_categories:
+                    stream_categories[book.category] = cls._new_category(book.category, start_url)
+                stream_categories[book.category].book_count += 1
+
+        # Listing and detail pages share one keep-alive pool for the whole crawl
+        try:
+            with session_scope(session_manager) as manager, seen_scope(seen):
+                print(f"Fetching page 1 of {max_pages}: {start_url}")
+                if pipeline:
+                    crawl = CrawlPipeline(base_url, fetch_workers=detail_workers, parse_workers=parse_workers)
+                    pages = crawl.run(start_url, max_pages, journal, failed_pages)
+                else:
+                    crawl = None
+                    pages = cls._crawl_listing(start_url, base_url, max_pages, detail_workers, page_workers, journal,
+                                               failed_pages)
+                for page_products in pages:
+                    consume(page_products)
+                if crawl is not None:
+                    print(crawl.report())
+                if failed_pages:
+                    print(f"Crawl stopped at a listing page that failed; pages after it were not saved. "
+                          f"Failed pages: {', '.join(failed_pages)}")
+
+                pool_stats = manager.stats()
+                print(f"Connection pool: {pool_stats['requests']} requests, "
+                      f"{pool_stats['connections_opened']} connections opened, "
+                      f"{pool_stats['connections_reused']} reused")
+                if report_seen:
+                    print(seen.report())
+                if downloader is not None:
+                    print(downloader.report())
+        except BaseException:
+            if writer is not None:
+                # Whatever was scraped is on disk; the buffered tail must not be lost
+                writer.close()
+            raise
+        finally:
+            if owns_seen:
+                seen.close()
+            if downloader is not None:
+                downloader.close()
+
+        if writer is None:
+            all_products = [product for page_products in page_results for product in page_products]
+            books, categories = cls._build_books_and_categories(all_products, category_name, start_url)
+            result = cls._save_scraped_data(books, categories, category_name, directory, formats)
+        else:
+            result = {"books": writer.finalize(write_exports=finalize)}
+            print(f"Streamed {writer.records_written} books to {writer.jsonl.path}")
+            if finalize and stream_categories:
+                # Nested book lists are read back from books.jsonl in a single pass and grouped by category,
+                # as save_categories would have written them from memory
+                result["categories"] = CatalogExporter(writer.directory, formats).write_categories(
+                    list(stream_categories.values()), rows=iter_json_lines(writer.jsonl.path), image_paths=images)
+            if finalize and "sqlite" in formats:
+                database_path = cls.save_sqlite(iter_json_lines(writer.jsonl.path), list(stream_categories.values()),
+                                                os.path.join(directory, SQLITE_FILENAME))
+                if database_path:
+                    result["sqlite"] = {"database": database_path}
+
+        if journal:
+            print(journal.report(time.perf_counter() - crawl_started))
+        incomplete = list(dict.fromkeys(failed_pages + (journal.missing_pages() if journal else [])))
+        if incomplete:
+            # Keep the journal: a resumed crawl replays the finished pages and fetches only these
+            result["incomplete"] = {"pages": incomplete}
+            message = f"Crawl incomplete, listing pages missing: {', '.join(incomplete)}"
+            if journal:
+                journal.close()
+                result["incomplete"]["journal"] = journal.path
+                message += f"\nRun again with resume=True to fetch only them (journal: {journal.path})"
+            print(message)
+        elif journal:
+            journal.complete()
+        return result
 
     @classmethod
     def scrape_categories(cls, category_names: List[str],
                           base_url: str = "http://books.toscrape.com/",
                           max_pages_per_category: int = 3,
                           directory: str = "data",
-                          formats: List[str] = ["json", "csv"]) -> Dict[str, Dict[str, Dict[str, str]]]:
+                          formats: List[str] = ["json", "csv"],
+                          session_manager: Optional[SessionManager] = None,
+                          max_workers: int = DEFAULT_CATEGORY_WORKERS,
+                          max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                          resume: bool = False,
+                          stream: bool = False,
+                          seen_urls: Optional[SeenUrls] = None,
+                          images: bool = False,
+                          image_workers: int = DEFAULT_IMAGE_WORKERS,
+                          pipeline: bool = False,
+                          parse_workers: int = DEFAULT_PARSE_WORKERS) -> Dict[str, Dict[str, Dict[str, str]]]:
         """
-        Scrape multiple categories and save them separately.
+        Scrape multiple categories concurrently and save them separately.
+
+        Each category is crawled on its own worker thread; a failure in one category is
+        reported and leaves an empty result for it without affecting the others.
 
         Args:
             category_names: List of category names to scrape
@@ -448,30 +748,245 @@ class Processing:
             max_pages_per_category: Maximum number of pages to scrape for each category
             directory: Base directory to save the files in
             formats: List of formats to save the data in ("json", "csv")
+            session_manager: Optional shared connection pool; a new one is used for all categories if omitted
+            max_workers: Maximum number of categories crawled at the same time
+            max_in_flight: Global cap on concurrent requests when a new connection pool is created
+            resume: Continue each category from the journal of an interrupted run
+            stream: Write each category's books to disk as they are scraped (see scrape_and_save)
+            seen_urls: Optional seen-set shared by every category, so a book listed in several
+                       categories has its detail page fetched once; a new temporary one if omitted
+            images: Also download the covers, into one store shared by the categories (see scrape_and_save)
+            image_workers: Maximum number of covers downloaded at the same time per category
+            pipeline: Crawl each category as a staged fetch/parse pipeline (see scrape_and_save)
+            parse_workers: Processes parsing pages per category in pipeline mode
 
         Returns:
             Dictionary mapping category names to their saved file paths
         """
         # Make sure categories are fetched
-        if not cls.categories_map:
-            cls.fetch_all_categories(base_url)
+        cls.load_categories(base_url, directory)
 
-        results = {}
+        session_manager = session_manager or active_session_manager()
+        owns_manager = session_manager is None
+        manager = session_manager or SessionManager(pool_maxsize=max_in_flight, max_in_flight=max_in_flight)
+        owns_seen = seen_urls is None
+        seen = seen_urls or SeenUrls()
 
-        for category_name in category_names:
+        total = len(category_names)
+        completed = 0
+        progress_lock = threading.Lock()
+
+        def scrape_one(category_name):
+            nonlocal completed
             print(f"\n=== Scraping category: {category_name} ===")
-            category_result = cls.scrape_and_save(
-                base_url=base_url,
-                category_name=category_name,
-                max_pages=max_pages_per_category,
-                directory=directory,
-                formats=formats
-            )
+            try:
+                category_result = cls.scrape_and_save(
+                    base_url=base_url,
+                    category_name=category_name,
+                    max_pages=max_pages_per_category,
+                    directory=directory,
+                    formats=formats,
+                    session_manager=manager,
+                    resume=resume,
+                    stream=stream,
+                    images=images,
+                    image_workers=image_workers,
+                    pipeline=pipeline,
+                    parse_workers=parse_workers
+                )
+                status = "incomplete" if "incomplete" in category_result else "done"
+            except Exception as e:
+                # Isolate failures: the remaining categories keep going
+                print(f"Error scraping category '{category_name}': {e}")
+                category_result = {}
+                status = "failed"
 
-            results[category_name] = category_result
+            with progress_lock:
+                completed += 1
+                print(f"[{completed}/{total}] Category '{category_name}' {status}")
+            return category_result
 
-        return results
+        # One pool for every category so connections are shared between crawls
+        try:
+            with session_scope(manager), seen_scope(seen):
+                with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total or 1))) as executor:
+                    category_results = list(executor.map(scrape_one, category_names))
+            print(seen.report())
+        finally:
+            if owns_manager:
+                manager.close()
+            if owns_seen:
+                seen.close()
+
+        # Keep the results in the order the categories were requested
+        return dict(zip(category_names, category_results))
+
+    @classmethod
+    async def ascrape_and_save(cls, base_url: str = "http://books.toscrape.com/",
+                               category_name: str = None,
+                               max_pages: int = 5,
+                               directory: str = "data",
+                               formats: List[str] = ["json", "csv"],
+                               session_manager: Optional[AsyncSessionManager] = None,
+                               max_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+                               seen_urls: Optional[SeenUrls] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Asyncio version of scrape_and_save producing the same books, categories and files.
 
+        Detail pages of a listing page are fetched as soon as that page is parsed, while the
+        next listing page is already being requested, all under one global concurrency limit.
+
+        Args:
+            base_url: Base URL of the website to scrape
+            category_name: Optional category name to scrape books from a specific category
+            max_pages: Maximum number of pages to scrape
+            directory: Directory to save the files in
+            formats: List of formats to save the data in ("json", "csv")
+            session_manager: Optional shared async client; a new one is used for this crawl if omitted
+            max_concurrency: Maximum number of requests in flight when a new client is created
+            seen_urls: Optional seen-set of detail pages already fetched (see scrape_and_save)
+
+        Returns:
+            Dictionary with paths to all saved files
+        """
+        if not cls.categories_map:
+            await asyncio.to_thread(cls.load_categories, base_url, directory)
+
+        start_url = cls._resolve_start_url(base_url, category_name)
+
+        report_seen = seen_urls is not None or active_seen_urls() is None
+        seen = seen_urls or active_seen_urls()
+        owns_seen = seen is None
+        seen = seen or SeenUrls()
+
+        try:
+            with seen_scope(seen):
+                async with async_session_scope(session_manager, max_concurrency) as manager:
+                    print(f"Fetching page 1 of {max_pages}: {start_url}")
+                    soup, first_products = await cls._afetch_listing_page(start_url, base_url, manager)
+                    # Start each page's detail fetches without waiting for them
+                    page_tasks = [asyncio.create_task(cls._afill_descriptions(first_products, manager))]
+
+                    planned_urls = plan_page_urls(soup, start_url, max_pages) if soup and max_pages > 1 else []
+                    if planned_urls is None:
+                        print("Could not read the page count, following next-page links instead")
+                        next_page = get_next_page_url(soup, start_url)
+                        page_count = 1
+
+                        while next_page and page_count < max_pages:
+                            print(f"Fetching page {page_count + 1} of {max_pages}: {next_page}")
+                            soup, page_products = await cls._afetch_listing_page(next_page, base_url, manager)
+                            if not soup:
+                                break
+                            page_tasks.append(asyncio.create_task(cls._afill_descriptions(page_products, manager)))
+                            page_count += 1
+                            next_page = get_next_page_url(soup, next_page)
+                    elif planned_urls:
+                        print(f"Fetching pages 2-{len(planned_urls) + 1} of {max_pages} concurrently")
+                        page_tasks.extend(
+                            asyncio.create_task(cls._ascrape_listing_page(page_url, base_url, manager))
+                            for page_url in planned_urls
+                        )
+
+                    pages = await asyncio.gather(*page_tasks)
+                    if None in pages:
+                        # Stop at the first failed page, like the threaded crawl, instead of leaving a hole
+                        failed_at = pages.index(None)
+                        print(f"Crawl stopped at a listing page that failed: {planned_urls[failed_at - 1]}")
+                        pages = pages[:failed_at]
+                    if report_seen:
+                        print(seen.report())
+        finally:
+            if owns_seen:
+                seen.close()
+
+        all_products = [product for page_products in pages for product in page_products]
+        books, categories = cls._build_books_and_categories(all_products, category_name, start_url)
+        return await asyncio.to_thread(cls._save_scraped_data, books, categories, category_name, directory, formats)
+
+    @staticmethod
+    async def _afetch_listing_page(page_url: str, base_url: str,
+                                   session_manager: AsyncSessionManager) -> Tuple[Optional[BeautifulSoup], List[Dict[str, Any]]]:
+        """Fetch and parse one listing page; descriptions are not filled in yet."""
+        try:
+            html_content = await async_get_request(page_url, session_manager=session_manager)
+            soup = parse_html(html_content)
+            if not soup:
+                return None, []
+            return soup, extract_listing_products(soup, base_url, page_url=page_url)
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+            return None, []
+
+    @classmethod
+    async def _ascrape_listing_page(cls, page_url: str, base_url: str,
+                                    session_manager: AsyncSessionManager) -> Optional[List[Dict[str, Any]]]:
+        """Fetch one listing page and all of its detail pages; None if the page failed."""
+        soup, page_products = await cls._afetch_listing_page(page_url, base_url, session_manager)
+        if not soup:
+            return None
+        return await cls._afill_descriptions(page_products, session_manager)
+
+    @staticmethod
+    async def _afill_descriptions(products: List[Dict[str, Any]],
+                                  session_manager: AsyncSessionManager) -> List[Dict[str, Any]]:
+        """Fetch the detail page of every product concurrently and store its description."""
+        descriptions = await asyncio.gather(
+            *(aextract_description(product['link'], session_manager) for product in products)
+        )
+        for product, description in zip(products, descriptions):
+            product['description'] = description
+        return products
+
+    @classmethod
+    async def ascrape_categories(cls, category_names: List[str],
+                                 base_url: str = "http://books.toscrape.com/",
+                                 max_pages_per_category: int = 3,
+                                 directory: str = "data",
+                                 formats: List[str] = ["json", "csv"],
+                                 max_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+                                 seen_urls: Optional[SeenUrls] = None) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """
+        Asyncio version of scrape_categories: all categories are crawled on one event loop
+        sharing a single client and its global concurrency limit.
+
+        Args:
+            category_names: List of category names to scrape
+            base_url: Base URL of the website
+            max_pages_per_category: Maximum number of pages to scrape for each category
+            directory: Base directory to save the files in
+            formats: List of formats to save the data in ("json", "csv")
+            max_concurrency: Maximum number of requests in flight across all categories
+            seen_urls: Optional seen-set shared by every category (see scrape_categories)
+
+        Returns:
+            Dictionary mapping category names to their saved file paths
+        """
+        if not cls.categories_map:
+            await asyncio.to_thread(cls.load_categories, base_url, directory)
+
+        owns_seen = seen_urls is None
+        seen = seen_urls or SeenUrls()
+        try:
+            with seen_scope(seen):
+                async with async_session_scope(max_concurrency=max_concurrency) as manager:
+                    category_results = await asyncio.gather(*(
+                        cls.ascrape_and_save(
+                            base_url=base_url,
+                            category_name=category_name,
+                            max_pages=max_pages_per_category,
+                            directory=directory,
+                            formats=formats,
+                            session_manager=manager
+                        )
+                        for category_name in category_names
+                    ))
+            print(seen.report())
+        finally:
+            if owns_seen:
+                seen.close()
+
+        return dict(zip(category_names, category_results))
 
     @staticmethod
     def load_json_data(filepath: str) -> Optional[List[Dict[str, Any]]]:
@@ -489,21 +1004,29 @@ class Processing:
     @staticmethod
     def sort_books_by_rating(books: List[Dict[str, Any]], descending: bool = True) -> List[Dict[str, Any]]:
         """Sort books by rating."""
+        if isinstance(books, QUERY_VIEWS):
+            return books.sort_by_rating(descending)
         return sorted(books, key=lambda x: x.get('rating', 0), reverse=descending)
 
     @staticmethod
     def filter_books_by_min_rating(books: List[Dict[str, Any]], min_rating: float) -> List[Dict[str, Any]]:
         """Filter books that have a rating greater than or equal to min_rating."""
+        if isinstance(books, QUERY_VIEWS):
+            return books.filter_min_rating(min_rating)
         return [book for book in books if book.get('rating', 0) >= min_rating]
 
     @staticmethod
     def get_top_n_books_by_rating(books: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
         """Get top N books based on rating."""
+        if isinstance(books, QUERY_VIEWS):
+            return books.top_rated(n)
         return Processing.sort_books_by_rating(books)[:n]
 
     @staticmethod
     def group_books_by_category(books: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         """Group books by their category."""
+        if isinstance(books, QUERY_VIEWS):
+            return books.group_by_category()
         grouped = {}
         for book in books:
             category = book.get('category', 'Unknown')
@@ -513,12 +1036,16 @@ class Processing:
     @staticmethod
     def average_rating(books: List[Dict[str, Any]]) -> float:
         """Return the average rating across all books that have one."""
+        if isinstance(books, QUERY_VIEWS):
+            return books.average_rating()
         ratings = [b['rating'] for b in books if 'rating' in b]
         return sum(ratings) / len(ratings) if ratings else 0.0
 
     @staticmethod
     def books_per_category(books: List[Dict[str, Any]]) -> Dict[str, int]:
         """Count how many books are in each category."""
+        if isinstance(books, QUERY_VIEWS):
+            return books.books_per_category()
         result = {}
         for book in books:
             cat = book.get('category', 'Unknown')
@@ -528,23 +1055,41 @@ class Processing:
     @staticmethod
     def search_by_title(books: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
         """Find books where the title includes the given text (case-insensitive)."""
+        if isinstance(books, BookStore):
+            return books.search_title(text)
         text = text.lower()
         return [b for b in books if text in b.get('title', '').lower()]
 
+    @staticmethod
+    def _price_pence(book: Union[Dict[str, Any], Book]) -> int:
+        """Price of a Book or a loaded book record in pence; Books are already typed."""
+        if isinstance(book, Book):
+            pence = book.price_pence
+        else:
+            pence = parse_price_pence(book.get('price', 0))
+        return pence if pence is not None else 0
+
     @staticmethod
     def in_price_range(books: List[Dict[str, Any]], low: float, high: float) -> List[Dict[str, Any]]:
-        """Return all books priced between 'low' and 'high'."""
-        return [b for b in books if low <= float(b.get('price', 0)) <= high]
+        """Return all books priced between 'low' and 'high' (cheapest first when books is a BookIndex)."""
+        if isinstance(books, QUERY_VIEWS):
+            return books.in_price_range(low, high)
+        low_pence, high_pence = low * 100, high * 100
+        return [b for b in books if low_pence <= Processing._price_pence(b) <= high_pence]
 
     @staticmethod
     def top_expensive(books: List[Dict[str, Any]], count: int = 5) -> List[Dict[str, Any]]:
         """Return the 'count' most expensive books."""
-        return sorted(books, key=lambda b: float(b.get('price', 0)), reverse=True)[:count]
+        if isinstance(books, QUERY_VIEWS):
+            return books.top_expensive(count)
+        return sorted(books, key=Processing._price_pence, reverse=True)[:count]
 
     @staticmethod
     def top_cheap(books: List[Dict[str, Any]], count: int = 5) -> List[Dict[str, Any]]:
         """Return the 'count' cheapest books."""
-        return sorted(books, key=lambda b: float(b.get('price', 0)))[:count]
+        if isinstance(books, QUERY_VIEWS):
+            return books.top_cheap(count)
+        return sorted(books, key=Processing._price_pence)[:count]
 
     @staticmethod
     def missing_info(books: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -553,14 +1098,52 @@ class Processing:
         return [b for b in books if not needed.issubset(b.keys())]
 
     @staticmethod
-    def load_all_books_from_folder(base_path: str) -> List[Dict[str, Any]]:
-        books = []
-        for root, _, files in os.walk(base_path):
-            for file in files:
-                if file.endswith('.json'):
-                    path = os.path.join(root, file)
-                    data = Processing.load_json_data(path)
-                    if data:
-                        books.extend(data)
+    def stream_analytics(base_path: str, top_n: int = 5,
+                         price_ranges: List[Tuple[float, float]] = ((10, 30),)) -> Dict[str, Any]:
+        """
+        Average rating, books per category, price-range counts and top-N rated / most
+        expensive / cheapest books of every export under base_path, in one streaming pass.
+
+        Records are read lazily, one export per directory, so memory does not grow with
+        the size of the folder.
+        """
+        return aggregate_folder(base_path, top_n, price_ranges)
+
+    @staticmethod
+    def load_all_books_from_folder(base_path: str, as_books: bool = False, workers: Optional[int] = None,
+                                   dedupe: bool = True) -> List[Dict[str, Any]]:
+        """
+        Load every book saved under base_path.
+
+        Only the book exports are read (not categories.json / category_books.csv, which
+        repeat the same books), decoded in parallel, and deduplicated by URL.
+        With as_books=True the records are turned into typed Book objects once, so the
+        analytics above don't have to parse prices again on every call.
+        """
+        books, stats = load_books(base_path, workers=workers, dedupe=dedupe)
+        print(stats.report())
+        if as_books:
+            return [Book.from_dict(book) for book in books]
         return books
 
+    @staticmethod
+    def load_parquet_books(base_path: str, columns: Optional[List[str]] = None,
+                           filters: Optional[List] = None) -> List[Dict[str, Any]]:
+        """
+        Load the books.parquet exports under base_path, reading only what a query needs.
+
+        Args:
+            base_path: Folder searched for books.parquet files (or a single Parquet file)
+            columns: Columns to read, e.g. ["price", "rating"]; None reads them all
+            filters: Predicates pushed down to the files, e.g. [("rating", ">=", 4)];
+                row groups that cannot match are skipped. Prices are in pounds.
+
+        Returns:
+            List of book dictionaries with the requested columns
+        """
+        try:
+            return read_books_parquet(base_path, columns=columns, filters=filters)
+        except Exception as e:
+            print(f"Error loading Parquet data from {base_path}: {e}")
+            return []
+
@@ -0,0 +1,136 @@
+from typing import Any, Dict, Iterable, List, Union
+
+try:
+    import numpy as np
+except ImportError:  # Only the columnar analytics need numpy
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+from src.book_scraper.models.book import Book, parse_price_pence, parse_rating
+
+
+class BookFrame:
+    """
+    Columnar, read-only view of a list of books for the Processing analytics.
+
+    Prices (pence), ratings and category codes are pulled out of the records once into
+    NumPy arrays; every query then runs vectorized and returns the original records,
+    in the same order the list-based helpers in Processing return them. Top-k queries
+    use argpartition instead of a full sort, and group-bys work on integer category
+    codes. Iterating the frame yields the records, so helpers without a vectorized
+    version still accept it.
+    """
+
+    def __init__(self, records: List[Union[Dict[str, Any], Book]], prices, ratings, has_rating,
+                 category_codes, categories: List[Any]):
+        self.records = records
+        # Object array of the records so selections are gathered by NumPy fancy indexing
+        self._objects = np.empty(len(records), dtype=object)
+        for row, record in enumerate(records):
+            self._objects[row] = record
+        self.prices = prices
+        self.ratings = ratings
+        self.has_rating = has_rating
+        self.category_codes = category_codes
+        self.categories = categories
+
+    @classmethod
+    def from_records(cls, books: Iterable[Union[Dict[str, Any], Book]]) -> "BookFrame":
+        """Build the columns from Book objects or book dictionaries (as loaded from JSON)."""
+        if np is None:
+            raise ImportError("numpy is required for BookFrame: pip install numpy")
+        records = list(books)
+        count = len(records)
+        prices = np.zeros(count, dtype=np.int64)
+        ratings = np.zeros(count, dtype=np.int16)
+        has_rating = np.zeros(count, dtype=bool)
+        category_codes = np.empty(count, dtype=np.int32)
+        # Codes in first-appearance order, so group-bys come out in the same order as a Python pass
+        codes = {}
+
+        for row, book in enumerate(records):
+            if isinstance(book, Book):
+                pence, rating = book.price_pence, book.rating
+            else:
+                pence, rating = parse_price_pence(book.get('price', 0)), parse_rating(book.get('rating'))
+            if pence is not None:
+                prices[row] = pence
+            if rating is not None:
+                ratings[row] = rating
+                has_rating[row] = True
+            category = book.get('category', 'Unknown')
+            code = codes.get(category)
+            if code is None:
+                code = codes[category] = len(codes)
+            category_codes[row] = code
+
+        return cls(records, prices, ratings, has_rating, category_codes, list(codes))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def _take(self, rows) -> List[Any]:
+        return self._objects[rows].tolist()
+
+    def _top_k(self, values, k: int, descending: bool):
+        """
+        Rows of the k largest (or smallest) values, ordered like a stable sort would
+        order them: by value, then by position for ties.
+        """
+        count = len(values)
+        if k <= 0 or count == 0:
+            return np.empty(0, dtype=np.intp)
+        keys = -values.astype(np.int64) if descending else values.astype(np.int64)
+        if k < count:
+            # Everything strictly better than the k-th key, then the first ties up to k rows
+            kth = np.partition(keys, k - 1)[k - 1]
+            better = np.flatnonzero(keys < kth)
+            ties = np.flatnonzero(keys == kth)[:k - len(better)]
+            rows = np.concatenate((better, ties))
+        else:
+            rows = np.arange(count)
+        return rows[np.lexsort((rows, keys[rows]))]
+
+    # --- Queries behind the Processing helpers ---
+    def sort_by_rating(self, descending: bool = True) -> List[Any]:
+        # int16 keys: the stable argsort is a radix sort
+        keys = -self.ratings if descending else self.ratings
+        return self._take(np.argsort(keys, kind='stable'))
+
+    def filter_min_rating(self, min_rating: float) -> List[Any]:
+        return self._take(np.flatnonzero(self.ratings >= min_rating))
+
+    def top_rated(self, n: int) -> List[Any]:
+        return self._take(self._top_k(self.ratings, n, descending=True))
+
+    def in_price_range(self, low: float, high: float) -> List[Any]:
+        prices = self.prices
+        return self._take(np.flatnonzero((prices >= low * 100) & (prices <= high * 100)))
+
+    def top_expensive(self, count: int = 5) -> List[Any]:
+        return self._take(self._top_k(self.prices, count, descending=True))
+
+    def top_cheap(self, count: int = 5) -> List[Any]:
+        return self._take(self._top_k(self.prices, count, descending=False))
+
+    def average_rating(self) -> float:
+        rated = self.ratings[self.has_rating]
+        return float(rated.mean()) if len(rated) else 0.0
+
+    def books_per_category(self) -> Dict[Any, int]:
+        counts = np.bincount(self.category_codes, minlength=len(self.categories))
+        return dict(zip(self.categories, counts.tolist()))
+
+    def group_by_category(self) -> Dict[Any, List[Any]]:
+        codes = self.category_codes
+        if len(self.categories) <= np.iinfo(np.uint16).max:
+            codes = codes.astype(np.uint16)  # Stable argsort of 16-bit keys is a radix sort
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(self.category_codes, minlength=len(self.categories)))[:-1]
+        # One gather in category order, then cut into per-category lists
+        grouped = np.split(self._objects[order], bounds)
+        return {category: group.tolist() for category, group in zip(self.categories, grouped)}
@@ -0,0 +1,171 @@
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from src.book_scraper.models.book import Book, parse_price_pence, parse_rating
+
+# Entries per block of the price index; a block is split in two once it holds twice as many
+PRICE_BLOCK_SIZE = 512
+
+
+class BookIndex:
+    """
+    Secondary indexes over a growing list of books, for repeated queries on one dataset.
+
+    - price: row ids sorted by price (pence), rows of one price in insertion order, kept
+      in blocks of up to 2 * PRICE_BLOCK_SIZE entries with each block's highest price
+      alongside, so a price range is two bisects and add() only shifts one block
+    - rating: one bucket of row ids per rating value
+    - category: category -> row ids, in first-appearance order
+
+    Queries answer in O(log n + k). The rating and category buckets keep their row ids
+    ascending, so those answers come in the same order as the list-based helpers in
+    Processing; in_price_range answers in price order instead. add() is O(log n) plus
+    the shift of one block; extend() merges a batch in at once.
+    """
+
+    def __init__(self, books: Iterable[Union[Dict[str, Any], Book]] = ()):
+        self.records = []
+        self._price_blocks = []  # blocks of the sorted prices of every row, in pence
+        self._row_blocks = []    # row id for each entry of _price_blocks
+        self._block_max = []     # highest price of each block
+        self._rating_rows = {}  # rating -> row ids
+        self._category_rows = {}
+        self._rating_sum = 0
+        self._rated = 0
+        self.extend(books)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def _index(self, book: Union[Dict[str, Any], Book]) -> int:
+        """Append book, update the rating and category indexes; return its price in pence."""
+        row = len(self.records)
+        self.records.append(book)
+
+        if isinstance(book, Book):
+            pence, rating, has_rating = book.price_pence, book.rating, True
+        else:
+            pence, rating = parse_price_pence(book.get('price', 0)), parse_rating(book.get('rating'))
+            has_rating = 'rating' in book
+        if rating is not None and has_rating:
+            self._rating_sum += rating
+            self._rated += 1
+        self._rating_rows.setdefault(rating if rating is not None else 0, []).append(row)
+        self._category_rows.setdefault(book.get('category', 'Unknown'), []).append(row)
+        return pence if pence is not None else 0
+
+    def add(self, book: Union[Dict[str, Any], Book]) -> None:
+        row = len(self.records)
+        pence = self._index(book)
+        if not self._price_blocks:
+            self._set_blocks([(pence, row)])
+            return
+        # The first block whose highest price is above pence (or the last one); bisect_right
+        # keeps rows of equal price in insertion order
+        block = min(bisect_right(self._block_max, pence), len(self._block_max) - 1)
+        prices, rows = self._price_blocks[block], self._row_blocks[block]
+        position = bisect_right(prices, pence)
+        prices.insert(position, pence)
+        rows.insert(position, row)
+        self._block_max[block] = prices[-1]
+        if len(prices) > 2 * PRICE_BLOCK_SIZE:
+            self._price_blocks[block:block + 1] = [prices[:PRICE_BLOCK_SIZE], prices[PRICE_BLOCK_SIZE:]]
+            self._row_blocks[block:block + 1] = [rows[:PRICE_BLOCK_SIZE], rows[PRICE_BLOCK_SIZE:]]
+            self._block_max[block:block + 1] = [prices[PRICE_BLOCK_SIZE - 1], prices[-1]]
+
+    def extend(self, books: Iterable[Union[Dict[str, Any], Book]]) -> None:
+        """Add many books at once: the new prices are sorted once and merged in, O((n + m) + m log m)."""
+        added = sorted((self._index(book), row) for row, book in enumerate(books, start=len(self.records)))
+        if not added:
+            return
+        self._set_blocks(list(merge(self._ascending(), added)) if self._price_blocks else added)
+
+    def _set_blocks(self, entries: List[Tuple[int, int]]) -> None:
+        """Rebuild the price index from (pence, row) entries already in order."""
+        self._price_blocks, self._row_blocks, self._block_max = [], [], []
+        for start in range(0, len(entries), PRICE_BLOCK_SIZE):
+            block = entries[start:start + PRICE_BLOCK_SIZE]
+            self._price_blocks.append([pence for pence, _ in block])
+            self._row_blocks.append([row for _, row in block])
+            self._block_max.append(block[-1][0])
+
+    def _ascending(self) -> Iterator[Tuple[int, int]]:
+        for prices, rows in zip(self._price_blocks, self._row_blocks):
+            yield from zip(prices, rows)
+
+    def _descending(self) -> Iterator[Tuple[int, int]]:
+        for block in range(len(self._price_blocks) - 1, -1, -1):
+            prices, rows = self._price_blocks[block], self._row_blocks[block]
+            for index in range(len(prices) - 1, -1, -1):
+                yield prices[index], rows[index]
+
+    def _take(self, rows: Iterable[int]) -> List[Any]:
+        records = self.records
+        return [records[row] for row in rows]
+
+    # --- Queries behind the Processing helpers ---
+    def sort_by_rating(self, descending: bool = True) -> List[Any]:
+        ratings = sorted(self._rating_rows, reverse=descending)
+        return [self.records[row] for rating in ratings for row in self._rating_rows[rating]]
+
+    def filter_min_rating(self, min_rating: float) -> List[Any]:
+        buckets = [rows for rating, rows in self._rating_rows.items() if rating >= min_rating]
+        return self._take(merge(*buckets))
+
+    def top_rated(self, n: int) -> List[Any]:
+        result = []
+        for rating in sorted(self._rating_rows, reverse=True):
+            if len(result) >= n:
+                break
+            result.extend(self._rating_rows[rating][:n - len(result)])
+        return self._take(result)
+
+    def in_price_range(self, low: float, high: float) -> List[Any]:
+        """Books priced between low and high, cheapest first (books of one price in insertion order)."""
+        low_pence, high_pence = low * 100, high * 100
+        rows = []
+        block = bisect_left(self._block_max, low_pence)
+        start = bisect_left(self._price_blocks[block], low_pence) if block < len(self._price_blocks) else 0
+        while block < len(self._price_blocks):
+            prices = self._price_blocks[block]
+            end = bisect_right(prices, high_pence, start)
+            rows.extend(self._row_blocks[block][start:end])
+            if end < len(prices):
+                break
+            block, start = block + 1, 0
+        return self._take(rows)
+
+    def top_expensive(self, count: int = 5) -> List[Any]:
+        # Walk down from the most expensive price; rows of one price stay in insertion order
+        result = []
+        run, run_price = [], None
+        for pence, row in self._descending():
+            if pence != run_price:
+                result.extend(reversed(run[-(count - len(result)):]) if run else ())
+                if len(result) >= count:
+                    return self._take(result)
+                run, run_price = [], pence
+            run.append(row)
+        result.extend(reversed(run[-(count - len(result)):]) if run and count > len(result) else ())
+        return self._take(result)
+
+    def top_cheap(self, count: int = 5) -> List[Any]:
+        rows = []
+        for _, row in self._ascending():
+            if len(rows) >= count:
+                break
+            rows.append(row)
+        return self._take(rows)
+
+    def average_rating(self) -> float:
+        return self._rating_sum / self._rated if self._rated else 0.0
+
+    def books_per_category(self) -> Dict[Any, int]:
+        return {category: len(rows) for category, rows in self._category_rows.items()}
+
+    def group_by_category(self) -> Dict[Any, List[Any]]:
+        return {category: self._take(rows) for category, rows in self._category_rows.items()}
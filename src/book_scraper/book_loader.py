@@ -0,0 +1,109 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library decoder
+    orjson = None
+
+from src.book_scraper.columnar import read_books_parquet
+from src.book_scraper.streaming_analytics import book_files, iter_csv
+
+# Below this much data, starting worker processes costs more than decoding serially
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def decode_book_file(path: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Decode one book export; returns (records, error message or None)."""
+    try:
+        if path.endswith('.csv'):
+            return list(iter_csv(path)), None
+        if path.endswith('.parquet'):
+            return read_books_parquet(path), None
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith('.jsonl'):
+            return [_loads(line) for line in data.splitlines() if line.strip()], None
+        records = _loads(data)
+        if not isinstance(records, list):
+            return [], f"{path} does not contain a list of books"
+        return records, None
+    except Exception as e:
+        return [], f"Error loading {path}: {e}"
+
+
+class FolderLoadStats:
+    def __init__(self, files: int = 0, bytes_read: int = 0, records: int = 0, duplicates: int = 0,
+                 errors: int = 0, seconds: float = 0.0, workers: int = 1):
+        self.files = files
+        self.bytes_read = bytes_read
+        self.records = records
+        self.duplicates = duplicates
+        self.errors = errors
+        self.seconds = seconds
+        self.workers = workers
+
+    def report(self) -> str:
+        seconds = self.seconds or 1e-9
+        return (f"Loaded {self.records} books from {self.files} files ({self.bytes_read / 2 ** 20:.1f} MiB) "
+                f"in {self.seconds:.2f} s with {self.workers} worker(s): {self.files / seconds:.0f} files/s, "
+                f"{self.bytes_read / 2 ** 20 / seconds:.1f} MiB/s, {self.records / seconds:.0f} records/s; "
+                f"{self.duplicates} duplicates dropped, {self.errors} unreadable files")
+
+
+def load_books(base_path: str, workers: Optional[int] = None, use_processes: Optional[bool] = None,
+               dedupe: bool = True) -> Tuple[List[Dict[str, Any]], FolderLoadStats]:
+    """
+    Load the book records of every export under base_path.
+
+    Only book exports are read (one per directory, see book_files), never categories.json
+    or category_books.csv, whose records repeat the same books. Files are decoded in
+    parallel, with orjson when it is installed. The standard json decoder is slow enough
+    to be worth worker processes; orjson decodes about as fast as the results could be
+    pickled back, so with it threads are used (use_processes overrides the choice).
+    Records are returned in folder order; with dedupe, a book seen under the same URL
+    again is dropped.
+    """
+    started = time.perf_counter()
+    paths = book_files(base_path)
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(paths)) or 1
+    if workers > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+        if use_processes is None:
+            use_processes = orjson is None
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            decoded = list(executor.map(decode_book_file, paths))
+    else:
+        workers = 1
+        decoded = [decode_book_file(path) for path in paths]
+
+    books = []
+    seen_urls = set()
+    stats = FolderLoadStats(files=len(paths), bytes_read=total_bytes, workers=workers)
+    for records, error in decoded:
+        if error:
+            print(error)
+            stats.errors += 1
+            continue
+        for record in records:
+            url = record.get('url') if dedupe and isinstance(record, dict) else None
+            if url:
+                if url in seen_urls:
+                    stats.duplicates += 1
+                    continue
+                seen_urls.add(url)
+            books.append(record)
+
+    stats.records = len(books)
+    stats.seconds = time.perf_counter() - started
+    return books, stats
@@ -0,0 +1,235 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.book_scraper.models.book import Book, format_pence
+from src.book_scraper.models.category import Category
+
+SQLITE_FILENAME = "books.db"
+UPSERT_BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    price_pence INTEGER,
+    rating INTEGER,
+    availability TEXT,
+    stock INTEGER,
+    category TEXT,
+    image_url TEXT,
+    description TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_category ON books (category);
+CREATE INDEX IF NOT EXISTS books_price ON books (price_pence);
+CREATE INDEX IF NOT EXISTS books_rating ON books (rating);
+
+CREATE TABLE IF NOT EXISTS categories (
+    name TEXT PRIMARY KEY,
+    url TEXT,
+    book_count INTEGER,
+    updated_at REAL NOT NULL
+);
+
+-- One row per book whenever its price or availability is first seen or changes
+CREATE TABLE IF NOT EXISTS book_history (
+    url TEXT NOT NULL,
+    price_pence INTEGER,
+    availability TEXT,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS book_history_url ON book_history (url, seen_at);
+
+CREATE TRIGGER IF NOT EXISTS books_history_insert AFTER INSERT ON books
+BEGIN
+    INSERT INTO book_history VALUES (new.url, new.price_pence, new.availability, new.last_seen);
+END;
+CREATE TRIGGER IF NOT EXISTS books_history_update AFTER UPDATE ON books
+WHEN old.price_pence IS NOT new.price_pence OR old.availability IS NOT new.availability
+BEGIN
+    INSERT INTO book_history VALUES (new.url, new.price_pence, new.availability, new.last_seen);
+END;
+"""
+
+# A book scraped again replaces the stored one; a missing description or image is kept from before
+_UPSERT_BOOK = """
+INSERT INTO books (url, title, price_pence, rating, availability, stock, category, image_url, description,
+                   first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    title = excluded.title,
+    price_pence = excluded.price_pence,
+    rating = excluded.rating,
+    availability = excluded.availability,
+    stock = excluded.stock,
+    category = excluded.category,
+    image_url = COALESCE(excluded.image_url, books.image_url),
+    description = COALESCE(excluded.description, books.description),
+    last_seen = excluded.last_seen
+"""
+
+_UPSERT_CATEGORY = """
+INSERT INTO categories (name, url, book_count, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET
+    url = COALESCE(excluded.url, categories.url),
+    book_count = excluded.book_count,
+    updated_at = excluded.updated_at
+"""
+
+_BOOK_COLUMNS = "title, price_pence, rating, availability, category, url, image_url, description"
+
+
+def _record(row) -> Dict[str, Any]:
+    """A books row in the shape of Book.to_dict()."""
+    title, price_pence, rating, availability, category, url, image_url, description = row
+    return {"title": title, "price": format_pence(price_pence), "rating": rating, "availability": availability,
+            "category": category, "url": url, "image_url": image_url, "description": description}
+
+
+class BookStore:
+    """
+    SQLite store of every book scraped so far, keyed by URL.
+
+    Saving upserts, so re-scraping the catalogue updates rows instead of overwriting a
+    file, and book_history keeps each price/availability change. The query methods have
+    the same names as BookIndex and BookFrame, so the Processing helpers push their work
+    down into SQL when given a store; results come back in the shape of Book.to_dict(),
+    ordered like the list-based helpers order them (ties in first-seen order).
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Concurrent category crawls save into the same file; the timeout waits out their write locks
+        self._connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # --- Writing ---
+    def upsert_books(self, books: Iterable[Union[Dict[str, Any], Book]],
+                     batch_size: int = UPSERT_BATCH_SIZE) -> int:
+        """Insert or update books in one transaction, batch_size rows per executemany; returns the row count."""
+        seen_at = time.time()
+        count = 0
+        with self._lock, self._connection:
+            batch = []
+            for book in books:
+                if not isinstance(book, Book):
+                    book = Book.from_dict(book)
+                batch.append((book.url, book.title, book.price_pence, book.rating, book.availability, book.stock,
+                              book.category, book.image_url, book.description, seen_at, seen_at))
+                if len(batch) >= batch_size:
+                    self._connection.executemany(_UPSERT_BOOK, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._connection.executemany(_UPSERT_BOOK, batch)
+                count += len(batch)
+        return count
+
+    def upsert_categories(self, categories: Iterable[Category]) -> int:
+        updated_at = time.time()
+        rows = [(category.name, category.url, category.book_count, updated_at) for category in categories]
+        with self._lock, self._connection:
+            self._connection.executemany(_UPSERT_CATEGORY, rows)
+        return len(rows)
+
+    # --- Reading ---
+    def _query(self, where: str = "", parameters: tuple = (), order: str = "rowid",
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        sql = f"SELECT {_BOOK_COLUMNS} FROM books {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters = parameters + (max(limit, 0),)
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [_record(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._query())
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        records = self._query("WHERE url = ?", (url,))
+        return records[0] if records else None
+
+    def categories(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection.execute("SELECT name, url, book_count FROM categories ORDER BY rowid").fetchall()
+        return [{"name": name, "url": url, "book_count": book_count} for name, url, book_count in rows]
+
+    def price_history(self, url: str) -> List[Dict[str, Any]]:
+        """Every recorded price/availability of one book, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT price_pence, availability, seen_at FROM book_history WHERE url = ? ORDER BY seen_at, rowid",
+                (url,)).fetchall()
+        return [{"price": format_pence(price_pence), "availability": availability, "seen_at": seen_at}
+                for price_pence, availability, seen_at in rows]
+
+    # --- Queries behind the Processing helpers ---
+    # A missing price or rating counts as 0 in the list helpers. Ratings and prices are never
+    # below that, and SQLite sorts NULL lowest, so plain ORDER BY keeps that order and the indexes.
+    def sort_by_rating(self, descending: bool = True) -> List[Dict[str, Any]]:
+        return self._query(order=f"rating {'DESC' if descending else 'ASC'}, rowid")
+
+    def filter_min_rating(self, min_rating: float) -> List[Dict[str, Any]]:
+        # A missing rating counts as 0, as in filter_books_by_min_rating; the NULL test is only
+        # added when it can match, so a positive minimum still uses the rating index
+        where = "WHERE rating >= ?" + (" OR rating IS NULL" if min_rating <= 0 else "")
+        return self._query(where, (min_rating,))
+
+    def top_rated(self, n: int) -> List[Dict[str, Any]]:
+        return self._query(order="rating DESC, rowid", limit=n)
+
+    def in_price_range(self, low: float, high: float) -> List[Dict[str, Any]]:
+        where = "WHERE price_pence BETWEEN ? AND ?" + (" OR price_pence IS NULL" if low <= 0 <= high else "")
+        return self._query(where, (low * 100, high * 100))
+
+    def top_expensive(self, count: int = 5) -> List[Dict[str, Any]]:
+        return self._query(order="price_pence DESC, rowid", limit=count)
+
+    def top_cheap(self, count: int = 5) -> List[Dict[str, Any]]:
+        return self._query(order="price_pence, rowid", limit=count)
+
+    def search_title(self, text: str) -> List[Dict[str, Any]]:
+        # instr() on lower() rather than LIKE, so % and _ in the text are matched literally
+        return self._query("WHERE instr(lower(COALESCE(title, '')), ?) > 0", (text.lower(),))
+
+    def average_rating(self) -> float:
+        with self._lock:
+            average = self._connection.execute("SELECT AVG(rating) FROM books WHERE rating IS NOT NULL").fetchone()[0]
+        return average if average is not None else 0.0
+
+    def books_per_category(self) -> Dict[Any, int]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT COALESCE(category, 'Unknown'), COUNT(*) FROM books "
+                "GROUP BY COALESCE(category, 'Unknown') ORDER BY MIN(rowid)").fetchall()
+        return dict(rows)
+
+    def group_by_category(self) -> Dict[Any, List[Dict[str, Any]]]:
+        grouped = {category: [] for category in self.books_per_category()}
+        for record in self._query():
+            grouped[record["category"] if record["category"] is not None else "Unknown"].append(record)
+        return grouped
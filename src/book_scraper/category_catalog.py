@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from typing import Dict, Optional
+
+# File the category map of each site is kept in between runs, and for how long it is trusted
+CATEGORY_CACHE_FILE = "categories.json"
+DEFAULT_CATEGORY_TTL = 24 * 3600
+
+
+def default_category_cache_path(directory: str) -> str:
+    """Category cache file of an output directory, in its hidden .cache subdirectory."""
+    return os.path.join(directory, ".cache", CATEGORY_CACHE_FILE)
+
+
+def _directory(url: str) -> str:
+    return url[:url.rfind("/") + 1]
+
+
+class CategoryCatalog:
+    """
+    Lookup structures over one category map (name -> details, as extract_categories builds it).
+
+    Names are looked up by their case-folded form, and a book URL is resolved to the
+    category whose URL it starts with by walking the URL's directories through a dict
+    keyed by category directory, so neither lookup scans every category.
+    """
+
+    def __init__(self, categories: Dict[str, Dict]):
+        self.categories = categories
+        self._by_name = {}
+        # Directory of the category URL -> [(url, name)] in map order
+        self._by_directory = {}
+        for name, details in categories.items():
+            # The first of two names equal up to case wins, as in the previous linear scan
+            self._by_name.setdefault(name.casefold(), details)
+            url = details.get('url')
+            if url:
+                self._by_directory.setdefault(_directory(url), []).append((url, name))
+
+    def by_name(self, name: str) -> Optional[Dict]:
+        return self._by_name.get(name.casefold())
+
+    def name_for_url(self, url: str) -> Optional[str]:
+        """Name of the category whose URL is a prefix of url, or None."""
+        if not url or not self._by_directory:
+            return None
+        end = url.find("/") + 1
+        while end:
+            for category_url, name in self._by_directory.get(url[:end], ()):
+                if url.startswith(category_url):
+                    return name
+            end = url.find("/", end) + 1
+        return None
+
+
+def load_cached_categories(base_url: str, path: str,
+                           ttl: float = DEFAULT_CATEGORY_TTL) -> Optional[Dict[str, Dict]]:
+    """Category map of base_url from the cache file if it is younger than ttl seconds, else None."""
+    if not ttl or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f).get(base_url)
+    except (OSError, ValueError, AttributeError):
+        # A damaged cache only costs a fetch
+        return None
+    if not entry or time.time() - entry.get("fetched_at", 0) > ttl:
+        return None
+    return entry.get("categories") or None
+
+
+def save_cached_categories(base_url: str, categories: Dict[str, Dict], path: str) -> None:
+    """Store the category map of base_url in the cache file, next to those of other sites."""
+    cached = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+    if not isinstance(cached, dict):
+        cached = {}
+    cached[base_url] = {"fetched_at": time.time(), "categories": categories}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(cached, f, ensure_ascii=False)
+    os.replace(temporary_path, path)
@@ -0,0 +1,179 @@
+import os
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Only the Parquet export and loader need pyarrow
+    pa = None
+
+PYARROW_AVAILABLE = pa is not None
+
+from src.book_scraper.models.book import BOOK_FIELDS, Book, format_pence, parse_price_pence, parse_rating
+
+PARQUET_FILENAME = "books.parquet"
+DEFAULT_COMPRESSION = "zstd"
+# Rows per row group; min/max statistics are kept per group, so filters can skip whole groups
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+READ_BATCH_SIZE = 16 * 1024
+# Downloaded cover paths are kept too; the column is null for books without one
+PARQUET_FIELDS = BOOK_FIELDS + ("image_path",)
+
+# Prices are stored exactly, as pounds with two decimals
+PRICE_TYPE = pa.decimal128(10, 2) if pa is not None else None
+BOOK_SCHEMA = pa.schema([
+    ("title", pa.string()),
+    ("price", PRICE_TYPE),
+    ("rating", pa.int8()),
+    ("availability", pa.string()),
+    ("category", pa.string()),
+    ("url", pa.string()),
+    ("image_url", pa.string()),
+    ("description", pa.string()),
+    pa.field("image_path", pa.string(), nullable=True),
+]) if pa is not None else None
+
+Filters = Union[Sequence[Any], "pc.Expression", None]
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for the Parquet format: pip install pyarrow")
+
+
+def books_table(books: Iterable[Union[Dict[str, Any], Book]]):
+    """Typed Arrow table (BOOK_SCHEMA) from Book objects or book dictionaries."""
+    _require_pyarrow()
+    columns = {name: [] for name in PARQUET_FIELDS}
+    for book in books:
+        for name in PARQUET_FIELDS:
+            columns[name].append(book.get(name))
+    # Whatever form a price arrives in ("£51.77", 51.77, Decimal) it is written as "51.77" first
+    prices = [format_pence(parse_price_pence(price)) for price in columns["price"]]
+    columns["price"] = pc.cast(pa.array(prices, pa.string()), PRICE_TYPE)
+    columns["rating"] = pa.array([parse_rating(rating) for rating in columns["rating"]], pa.int8())
+    return pa.table(columns, schema=BOOK_SCHEMA)
+
+
+def _batches(books: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for book in books:
+        batch.append(book)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_books_parquet(books: Iterable[Union[Dict[str, Any], Book]], path: str,
+                        compression: str = DEFAULT_COMPRESSION,
+                        row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+    """
+    Write books to a Parquet file, one row group at a time, and return the number of rows.
+
+    books may be any iterable (e.g. a JSON Lines file being read), so only one row group
+    is held in memory. Text columns are dictionary encoded by Parquet, which is what
+    makes the repeated category and availability values cheap.
+    """
+    _require_pyarrow()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    try:
+        with pq.ParquetWriter(tmp_path, BOOK_SCHEMA, compression=compression) as writer:
+            for batch in _batches(books, row_group_size):
+                writer.write_table(books_table(batch), row_group_size=row_group_size)
+                rows += len(batch)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return rows
+
+
+def _filter_value(column: str, value: Any) -> Any:
+    # The price column is decimal; compare it with decimals of the same scale
+    if column != "price":
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [_filter_value(column, item) for item in value]
+    pence = parse_price_pence(value)
+    return Decimal(pence).scaleb(-2) if pence is not None else value
+
+
+def book_filter(filters: Filters):
+    """
+    Filter expression from pyarrow-style filters: a list of (column, op, value) tuples
+    that must all hold, or a list of such lists of which one must hold, e.g.
+    [("rating", ">=", 4), ("price", "<", 20)]. Prices are given in pounds.
+    An Arrow expression is passed through unchanged.
+    """
+    _require_pyarrow()
+    if filters is None or isinstance(filters, pc.Expression):
+        return filters
+    if not filters:
+        return None
+    disjunction = filters if isinstance(filters[0], list) else [filters]
+    normalized = [[(column, op, _filter_value(column, value)) for column, op, value in conjunction]
+                  for conjunction in disjunction]
+    return pq.filters_to_expression(normalized)
+
+
+def parquet_files(base_path: str) -> List[str]:
+    """Every books.parquet under base_path, in os.walk order; base_path may be a single file."""
+    if os.path.isfile(base_path):
+        return [base_path]
+    return [os.path.join(root, PARQUET_FILENAME)
+            for root, _, files in os.walk(base_path) if PARQUET_FILENAME in files]
+
+
+def _scanner(paths: Union[str, List[str]], columns: Optional[List[str]], filters: Filters,
+             batch_size: int = READ_BATCH_SIZE):
+    _require_pyarrow()
+    if isinstance(paths, str):
+        paths = parquet_files(paths)
+    dataset = ds.dataset(paths, schema=BOOK_SCHEMA, format="parquet")
+    return dataset.scanner(columns=list(columns) if columns else None, filter=book_filter(filters),
+                           batch_size=batch_size)
+
+
+def _records(table) -> List[Dict[str, Any]]:
+    # Prices come back as the "51.77" strings Book.to_dict writes
+    index = table.schema.get_field_index("price")
+    if index >= 0:
+        table = table.set_column(index, "price", pc.cast(table.column(index), pa.string()))
+    records = table.to_pylist()
+    # Like Book.to_dict, books without a downloaded cover have no image_path key
+    if "image_path" in table.column_names:
+        for record in records:
+            if record["image_path"] is None:
+                del record["image_path"]
+    return records
+
+
+def read_books_parquet(paths: Union[str, List[str]], columns: Optional[List[str]] = None,
+                       filters: Filters = None) -> List[Dict[str, Any]]:
+    """
+    Load book records from Parquet files with column projection and predicate pushdown.
+
+    Only the requested columns are decoded, and row groups whose min/max statistics rule
+    out the filters are skipped without being read, e.g.
+
+        read_books_parquet("output_data", columns=["price", "rating"], filters=[("rating", ">=", 4)])
+
+    paths is a file, a folder (every books.parquet under it) or a list of files.
+    Records have the same shape as the JSON exports, restricted to the requested columns.
+    """
+    return _records(_scanner(paths, columns, filters).to_table())
+
+
+def iter_books_parquet(paths: Union[str, List[str]], columns: Optional[List[str]] = None,
+                       filters: Filters = None, batch_size: int = READ_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Like read_books_parquet, but yields records one record batch at a time."""
+    for batch in _scanner(paths, columns, filters, batch_size).to_batches():
+        yield from _records(pa.Table.from_batches([batch]))
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from src.requests_module.session_manager import get_session_manager
+
+# Covers go in <output directory>/images, shared by every category crawled into it
+IMAGE_DIRECTORY = "images"
+DEFAULT_IMAGE_WORKERS = 4
+IMAGE_CHUNK_SIZE = 64 * 1024
+INDEX_FILENAME = "index.jsonl"
+
+# Partial files being written in this process, whichever downloader writes them
+_writing = {}
+_writing_lock = threading.Lock()
+
+
+def _downloadable(product: Dict[str, Any]) -> bool:
+    url = product.get('cover_url')
+    return bool(url) and urlparse(url).scheme in ("http", "https")
+
+
+class CoverDownloader:
+    """
+    Downloads cover images into a content-addressed store: <directory>/<ab>/<sha256>.<ext>.
+
+    Bodies are streamed to a partial file chunk by chunk while they are hashed, so an
+    image is never held in memory whole, and covers with the same bytes end up as one
+    file. index.jsonl maps every downloaded URL to its file, so a later run does not
+    fetch it again; a partial file left by an interrupted run is continued with a Range
+    request. Downloads run on at most max_workers threads, through the active session
+    manager's pool.
+    """
+
+    def __init__(self, directory: str, max_workers: int = DEFAULT_IMAGE_WORKERS,
+                 chunk_size: int = IMAGE_CHUNK_SIZE):
+        self.directory = directory
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._partial_directory = os.path.join(directory, ".partial")
+        self._index_path = os.path.join(directory, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._executor = None
+        # URL -> local path of every cover stored, from earlier runs too
+        self._paths = {}
+
+        self.downloaded = 0
+        self.resumed = 0
+        self.deduplicated = 0
+        self.reused = 0
+        self.failed = 0
+        self.bytes_downloaded = 0
+
+        os.makedirs(self._partial_directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line may be cut short by a crash
+                    continue
+                path = os.path.join(self.directory, entry["path"])
+                if os.path.exists(path):
+                    self._paths[entry["url"]] = path
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def fill_image_paths(self, products: List[Dict[str, Any]]) -> None:
+        """
+        Download the covers of a page's products concurrently and set product['image_path'].
+
+        Covers are fetched from product['cover_url'], the img src resolved against the listing
+        page; products without one (no image on the page) are left alone.
+        """
+        urls = list(dict.fromkeys(product['cover_url'] for product in products if _downloadable(product)))
+        if not urls:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        paths = dict(zip(urls, self._executor.map(self.download, urls)))
+        for product in products:
+            if _downloadable(product):
+                product['image_path'] = paths[product['cover_url']]
+
+    def download(self, url: str) -> Optional[str]:
+        """Local path of the cover at url, downloading it unless it is stored already; None on failure."""
+        with self._lock:
+            path = self._paths.get(url)
+            if path is not None:
+                self.reused += 1
+                return path
+
+        partial = os.path.join(self._partial_directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+        with _writing_lock:
+            waiter = _writing.get(partial)
+            if waiter is None:
+                done = _writing[partial] = threading.Event()
+        if waiter is not None:
+            # Another thread is writing this very file; use its result
+            waiter.wait()
+            with self._lock:
+                path = self._paths.get(url)
+            return path if path is not None else self.download(url)
+
+        try:
+            path = self._store(url, partial)
+        except Exception as e:
+            print(f"Error downloading image {url}: {e}")
+            with self._lock:
+                self.failed += 1
+            return None
+        finally:
+            with _writing_lock:
+                del _writing[partial]
+            done.set()
+
+        with self._lock:
+            self._paths[url] = path
+            with open(self._index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"url": url, "path": os.path.relpath(path, self.directory)}) + "\n")
+        return path
+
+    def _hash_file(self, path: str, digest) -> None:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(self.chunk_size), b''):
+                digest.update(block)
+
+    def _store(self, url: str, partial: str) -> str:
+        """Stream url into partial (continuing it if an earlier run left one), then file it by its hash."""
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        digest = hashlib.sha256()
+        response = get_session_manager().stream(url, headers={"Range": f"bytes={offset}-"} if offset else None)
+        try:
+            if offset and response.status_code == 416:
+                # The partial file is not a prefix of what the server has now: start over
+                response.close()
+                os.remove(partial)
+                return self._store(url, partial)
+            response.raise_for_status()
+            if offset and response.status_code == 206:
+                self._hash_file(partial, digest)
+                mode = 'ab'
+                with self._lock:
+                    self.resumed += 1
+            else:
+                # Full body: the server ignored the Range header, or there was nothing to resume
+                mode = 'wb'
+            received = 0
+            with open(partial, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    received += len(chunk)
+        finally:
+            response.close()
+
+        content_hash = digest.hexdigest()
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+        path = os.path.join(self.directory, content_hash[:2], content_hash + extension)
+        with self._lock:
+            self.downloaded += 1
+            self.bytes_downloaded += received
+            if os.path.exists(path):
+                self.deduplicated += 1
+                os.remove(partial)
+                return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(partial, path)
+        return path
+
+    def report(self) -> str:
+        return (f"Cover images: {self.downloaded} downloaded ({self.bytes_downloaded / 1024:.0f} KiB, "
+                f"{self.resumed} resumed, {self.deduplicated} identical to a stored image), "
+                f"{self.reused} already stored, {self.failed} failed")
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class CrawlJournal:
+    """
+    Append-only JSON Lines journal of one crawl, used to resume it after a crash.
+
+    Every finished listing page is appended together with its extracted products and
+    its "next" link, and the planned page URLs (the frontier) are appended once known.
+    A resumed crawl replays the journal and only fetches pages that are not in it.
+    The file is removed once the crawl has been saved with none of its pages missing.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+        # Cost of checkpointing, reported at the end of the crawl
+        self.writes = 0
+        self.bytes_written = 0
+        self.overhead_seconds = 0.0
+
+        # State replayed by load()
+        self.start_url = None
+        self.max_pages = None
+        self.frontier = None
+        self.pages = {}
+
+    def load(self, start_url: str, max_pages: int) -> bool:
+        """
+        Replay an existing journal for a crawl starting at start_url.
+
+        Returns True if there was something to resume. A journal written for a different
+        start URL or page limit is discarded.
+        """
+        if not os.path.exists(self.path):
+            return False
+
+        started = time.perf_counter()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Last line may be cut short by the crash
+                        continue
+                    event = entry.get("event")
+                    if event == "start":
+                        self.start_url = entry.get("start_url")
+                        self.max_pages = entry.get("max_pages")
+                    elif event == "frontier":
+                        self.frontier = entry.get("urls")
+                    elif event == "page":
+                        self.pages[entry["url"]] = entry
+        except Exception as e:
+            print(f"Error reading crawl journal {self.path}: {e}")
+            self.reset()
+            return False
+        finally:
+            self.overhead_seconds += time.perf_counter() - started
+
+        if self.start_url != start_url or self.max_pages != max_pages:
+            print(f"Crawl journal {self.path} belongs to another crawl, starting over")
+            self.reset()
+            return False
+
+        print(f"Resuming crawl from {self.path}: {len(self.pages)} pages already done")
+        return True
+
+    def reset(self) -> None:
+        """Forget any previous journal and start an empty one."""
+        self.close()
+        self.start_url = None
+        self.max_pages = None
+        self.frontier = None
+        self.pages = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.writes += 1
+            self.bytes_written += len(line)
+            self.overhead_seconds += time.perf_counter() - started
+
+    def record_start(self, start_url: str, max_pages: int) -> None:
+        if self.start_url is None:
+            self.start_url = start_url
+            self.max_pages = max_pages
+            self._append({"event": "start", "start_url": start_url, "max_pages": max_pages, "time": time.time()})
+
+    def record_frontier(self, urls: List[str]) -> None:
+        self.frontier = list(urls)
+        self._append({"event": "frontier", "urls": self.frontier})
+
+    def record_page(self, url: str, products: List[Dict[str, Any]], next_url: Optional[str]) -> None:
+        self._append({"event": "page", "url": url, "next": next_url, "products": products})
+        # The products are on disk now; only pages replayed by load() need them in memory
+        self.pages[url] = {"event": "page", "url": url, "next": next_url, "products": []}
+
+    def completed_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Journal entry of an already finished page, or None."""
+        return self.pages.get(url)
+
+    def missing_pages(self) -> List[str]:
+        """Pages of the crawl (the start page and the frontier, once known) not journaled as done yet."""
+        urls = [self.start_url] + (self.frontier or []) if self.start_url else []
+        return [url for url in urls if url not in self.pages]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def complete(self) -> None:
+        """The crawl has been saved: the journal is no longer needed."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        try:
+            os.rmdir(os.path.dirname(self.path))
+        except OSError:
+            pass  # Other crawls still have journals there
+
+    def report(self, crawl_seconds: float) -> str:
+        share = (self.overhead_seconds / crawl_seconds * 100) if crawl_seconds > 0 else 0.0
+        return (f"Checkpoint overhead: {self.overhead_seconds * 1000:.1f} ms for {self.writes} writes "
+                f"({self.bytes_written / 1024:.1f} KiB, {share:.2f}% of the crawl)")
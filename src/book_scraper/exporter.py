@@ -0,0 +1,363 @@
+import os
+import time
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.book_scraper.columnar import write_books_parquet
+from src.book_scraper.models.book import BOOK_FIELDS, Book
+from src.book_scraper.models.category import Category
+from src.book_scraper.sinks import (CsvSink, GroupedSpill, JsonArraySink, JsonLinesSink, csv_renderer, indented_json,
+                                    save_labels, save_timer)
+from src.Utils.metrics import REGISTRY
+
+# Between two books nested in a category of categories.json, and after the last one
+NESTED_SEPARATOR = ",\n            "
+NESTED_END = "\n        ]\n    }"
+# Books converted and written together, so each batch is rendered once and fanned out to every file
+EXPORT_BATCH_SIZE = 1000
+
+
+class CatalogExporter:
+    """
+    Writes a crawl's books and categories to every requested format in one pass.
+
+    Each Book is converted with to_dict() once; that row is then fanned out to
+    books.json, books.jsonl, books.csv, the nested books of categories.json and
+    category_books.csv, instead of a fresh set of dictionaries per file; write_all
+    also renders each book's JSON and CSV text once for both the book and the
+    category files. The JSON files are written element by element with
+    indented_json, not by json.dump's pure-Python indenting encoder, and CSV rows
+    are rendered a batch at a time. The files come out byte for byte as the
+    save_json/save_csv based exports wrote them.
+    """
+
+    def __init__(self, directory: str, formats: List[str]):
+        self.directory = directory
+        self.formats = formats
+        # id(book) -> (book, to_dict() row); the book is kept so its id stays unique
+        self._rows = {}
+
+    def _row(self, book: Book) -> Dict[str, Any]:
+        cached = self._rows.get(id(book))
+        if cached is None:
+            cached = self._rows[id(book)] = (book, book.to_dict())
+        return cached[1]
+
+    @staticmethod
+    def _csv_fieldnames(image_paths: bool, *extra: str) -> List[str]:
+        """
+        Header for a CSV of books: the to_dict() keys, plus image_path when covers were downloaded
+        (image_paths; some books may have one and others not, so the column is named up front).
+        """
+        return list(BOOK_FIELDS) + (["image_path"] if image_paths else []) + list(extra)
+
+    def _row_batches(self, books: List[Book], keep: bool = True) -> Iterator[Tuple[List[Book], List[Dict[str, Any]]]]:
+        """
+        The books with their to_dict() rows, EXPORT_BATCH_SIZE at a time; the rows are kept
+        for the categories unless keep is false.
+        """
+        for start in range(0, len(books), EXPORT_BATCH_SIZE):
+            batch = books[start:start + EXPORT_BATCH_SIZE]
+            yield batch, [self._row(book) for book in batch] if keep else [book.to_dict() for book in batch]
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    @staticmethod
+    def _write_all(sinks: Dict[str, Tuple[str, Any]], items, write) -> Dict[str, str]:
+        """
+        Feed every item to every sink. A sink that fails reports its error and is dropped,
+        the others carry on; returns the paths of the files completed, in sinks order.
+        The time spent on each file goes into the save_seconds metric.
+        """
+        failed = {}
+        seconds = dict.fromkeys(sinks, 0.0)
+        clock = time.perf_counter
+        for item in items:
+            for key, (_, sink) in sinks.items():
+                if key in failed:
+                    continue
+                started = clock()
+                try:
+                    write(key, sink, item)
+                except Exception as e:
+                    failed[key] = e
+                seconds[key] += clock() - started
+        paths = {}
+        for key, (label, sink) in sinks.items():
+            error = failed.get(key)
+            started = clock()
+            try:
+                sink.close()
+            except Exception as e:
+                error = error or e
+            seconds[key] += clock() - started
+            REGISTRY.observe("save_seconds", seconds[key], **save_labels(sink.path))
+            if error is None:
+                print(f"Data successfully saved to {sink.path}")
+                paths[key] = sink.path
+            else:
+                print(f"Error saving {label} data to {sink.path}: {error}")
+        return paths
+
+    def _open(self, sinks: Dict[str, Tuple[str, Any]], key: str, label: str, filename: str, sink_class,
+              **kwargs) -> None:
+        path = self._path(filename)
+        try:
+            sinks[key] = (label, sink_class(path, **kwargs))
+        except Exception as e:
+            print(f"Error saving {label} data to {path}: {e}")
+
+    def write_books(self, books: List[Book]) -> Dict[str, str]:
+        """books.json / books.jsonl / books.csv / books.parquet, as save_books writes them."""
+        return self._write_books(books)
+
+    def _write_books(self, books: List[Book], fan_out: Optional[Tuple[GroupedSpill, Dict[int, List[str]]]] = None,
+                     ) -> Dict[str, str]:
+        """
+        write_books; with fan_out (spill, id(book) -> names of its categories) the JSON and CSV
+        text of each book also goes into its categories' share of categories.json and
+        category_books.csv in the spill, as _spill_rows renders it.
+        """
+        if not books:
+            print("No books to save")
+            return {}
+
+        fieldnames = self._csv_fieldnames(any(book.image_path for book in books))
+        sinks = {}
+        if "json" in self.formats:
+            self._open(sinks, "json", "JSON", "books.json", JsonArraySink)
+        if "jsonl" in self.formats:
+            self._open(sinks, "jsonl", "JSON Lines", "books.jsonl", JsonLinesSink, append=False)
+        if "csv" in self.formats:
+            self._open(sinks, "csv", "CSV", "books.csv", CsvSink, append=False, fieldnames=fieldnames)
+        render_csv = csv_renderer(fieldnames)
+        spill, members = fan_out or (None, {})
+        # Category name -> its category_name column, appended to a book's books.csv line
+        name_columns = {}
+        render_name = csv_renderer(["name"])
+
+        def write(key, sink, batch):
+            books_batch, rows = batch
+            if key == "json":
+                for book, row in zip(books_batch, rows):
+                    text = indented_json(row, level=1)
+                    sink.write_indented((text,))
+                    for name in members.get(id(book), ()):
+                        nested_key = (name, "json")
+                        if nested_key in spill:
+                            spill.add(nested_key, NESTED_SEPARATOR)
+                        # Two levels deeper: the same text with every line indented by 8 more spaces
+                        spill.add(nested_key, text.replace("\n", "\n        "))
+            elif key == "csv":
+                if spill is None:
+                    sink.write_rendered(render_csv(rows), len(rows))
+                    return
+                lines = [render_csv((row,)) for row in rows]
+                sink.write_rendered("".join(lines), len(rows))
+                for book, line in zip(books_batch, lines):
+                    for name in members.get(id(book), ()):
+                        column = name_columns.get(name)
+                        if column is None:
+                            column = name_columns[name] = "," + render_name(({"name": name},))
+                        spill.add((name, "csv"), line[:-2] + column)
+            else:
+                for row in rows:
+                    sink.write(row)
+
+        paths = self._write_all(sinks, self._row_batches(books, keep=spill is None), write)
+
+        if "parquet" in self.formats:
+            # Parquet takes the typed values straight from the Books, not the text rows
+            parquet_path = self._path("books.parquet")
+            try:
+                with save_timer(parquet_path):
+                    write_books_parquet(books, parquet_path)
+                print(f"Data successfully saved to {parquet_path}")
+                paths["parquet"] = parquet_path
+            except Exception as e:
+                print(f"Error saving Parquet data to {parquet_path}: {e}")
+        return paths
+
+    @staticmethod
+    def _nested_books(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Books nested in a category of categories.json, indented and separated."""
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return
+        yield indented_json(first, level=3)
+        for row in rows:
+            yield NESTED_SEPARATOR
+            yield indented_json(row, level=3)
+
+    @staticmethod
+    def _category_head(category: Category, include_books: bool, has_books: bool) -> str:
+        """
+        A category as json.dump(indent=4) writes it inside the categories array, up to the first
+        of its nested books; the whole of it when there are none to follow.
+        """
+        head = {"name": category.name, "url": category.url, "book_count": category.book_count}
+        if not include_books:
+            return indented_json(head, level=1)
+        if not has_books:
+            return indented_json(dict(head, books=[]), level=1)
+        text = indented_json(dict(head, books=0), level=1)
+        # Everything up to the placeholder; the nested array follows a book at a time
+        return text[:text.rindex("0\n    }")] + "[\n            "
+
+    def _category_items(self, categories: List[Category], include_books: bool, spill: Optional[GroupedSpill]):
+        """
+        (category, rows, first, last) items: each category's books as to_dict() rows,
+        EXPORT_BATCH_SIZE at a time, or a single item per category when they are not
+        nested or come from the spill.
+        """
+        for category in categories:
+            books = category.books if include_books and spill is None else ()
+            if not books:
+                yield category, (), True, True
+                continue
+            for start in range(0, len(books), EXPORT_BATCH_SIZE):
+                end = start + EXPORT_BATCH_SIZE
+                yield category, [self._row(book) for book in books[start:end]], start == 0, end >= len(books)
+
+    def _spill_rows(self, rows: Iterable[Dict[str, Any]], nested_json: bool,
+                    render_csv: Optional[Callable[..., str]]) -> GroupedSpill:
+        """
+        Read rows once and render each into its category's share of categories.json
+        ((name, "json")) and, with render_csv, of category_books.csv ((name, "csv")).
+        """
+        spill = GroupedSpill(self.directory)
+        try:
+            for row in rows:
+                name = row.get("category")
+                if nested_json:
+                    key = (name, "json")
+                    if key in spill:
+                        spill.add(key, NESTED_SEPARATOR)
+                    spill.add(key, indented_json(row, level=3))
+                if render_csv is not None:
+                    spill.add((name, "csv"), render_csv((row,), name))
+        except BaseException:
+            spill.close()
+            raise
+        return spill
+
+    def write_categories(self, categories: List[Category], include_books: bool = True,
+                         rows: Optional[Iterable[Dict[str, Any]]] = None,
+                         image_paths: bool = False) -> Dict[str, str]:
+        """
+        categories.json / category_books.csv / categories.csv, as save_categories writes them.
+
+        The categories are walked once, each batch of a category's books converted once and
+        fanned out to categories.json and category_books.csv. The nested books are
+        category.books, or else rows: to_dict() rows carrying their "category", which the
+        stream mode of scrape_and_save reads back from books.jsonl. rows are read once, each
+        rendered into its category's text in a GroupedSpill, and the files are put together
+        from it category by category, so the crawl's books are never all in memory nor read
+        again per category. image_paths gives category_books.csv an image_path column for
+        rows (for category.books, whether any book has one decides).
+        """
+        if not categories:
+            print("No categories to save")
+            return {}
+
+        if rows is None:
+            image_paths = any(book.image_path for category in categories for book in category.books)
+        if rows is None or not include_books:
+            return self._write_categories(categories, include_books, None, image_paths)
+        render_csv = csv_renderer(self._csv_fieldnames(image_paths)) if "csv" in self.formats else None
+        with self._spill_rows(rows, "json" in self.formats, render_csv) as spill:
+            return self._write_categories(categories, include_books, spill, image_paths)
+
+    def _write_categories(self, categories: List[Category], include_books: bool, spill: Optional[GroupedSpill],
+                          image_paths: bool) -> Dict[str, str]:
+        """write_categories, with the nested books taken from spill when there is one, else category.books."""
+        render_csv = csv_renderer(self._csv_fieldnames(image_paths))
+        sinks = {}
+        if "json" in self.formats:
+            self._open(sinks, "json", "JSON", "categories.json", JsonArraySink)
+        if "csv" in self.formats:
+            has_books = (any((category.name, "csv") in spill for category in categories) if spill is not None
+                         else include_books and any(category.books for category in categories))
+            if has_books:
+                self._open(sinks, "csv_books", "CSV", "category_books.csv", CsvSink, append=False,
+                           fieldnames=self._csv_fieldnames(image_paths, "category_name"))
+            self._open(sinks, "csv", "CSV", "categories.csv", CsvSink, append=False)
+
+        def write(key, sink, item):
+            category, batch, first, last = item
+            if key == "json":
+                if spill is not None:
+                    nested = spill.read((category.name, "json"))
+                    text = next(nested, "")
+                    sink.write_indented(chain((self._category_head(category, include_books, bool(text)), text), nested,
+                                              (NESTED_END,) if text else ()))
+                    return
+                pieces = self._nested_books(batch)
+                if first:
+                    sink.write_indented((self._category_head(category, include_books, bool(batch)), *pieces))
+                else:
+                    sink.write_more((NESTED_SEPARATOR, *pieces))
+                if last and batch:
+                    sink.write_more((NESTED_END,))
+            elif key == "csv_books":
+                if spill is not None:
+                    for text in spill.read((category.name, "csv")):
+                        sink.write_rendered(text)
+                elif batch:
+                    sink.write_rendered(render_csv(batch, category.name), len(batch))
+            elif first:
+                sink.write({"name": category.name, "url": category.url, "book_count": category.book_count})
+
+        return self._write_all(sinks, self._category_items(categories, include_books, spill), write)
+
+    @staticmethod
+    def _category_members(books: List[Book], categories: List[Category]) -> Optional[Dict[int, List[str]]]:
+        """
+        id(book) -> names of the categories listing it, when the books of every category are
+        in books, in the same order, and no two categories share a name, so their nested books
+        can be collected in one pass over books; None otherwise.
+        """
+        position = {id(book): index for index, book in enumerate(books)}
+        if len(position) != len(books) or len({category.name for category in categories}) != len(categories):
+            return None
+        members = {}
+        for category in categories:
+            previous = -1
+            for book in category.books:
+                index = position.get(id(book))
+                if index is None or index <= previous:
+                    return None
+                previous = index
+                members.setdefault(id(book), []).append(category.name)
+        return members
+
+    def write_all(self, books: List[Book], categories: List[Category]) -> Dict[str, Dict[str, str]]:
+        """
+        write_books and write_categories, as save_all_data writes them. When the categories list
+        the books in their order (as a crawl builds them) both are written in one pass over the
+        books: each book's JSON and CSV text is rendered once, written to books.json / books.csv
+        and fanned out to its categories' share of categories.json and category_books.csv in a
+        GroupedSpill, from which those files are put together. Otherwise, or when books.json or
+        books.csv could not be written, the categories are written from their books afterwards.
+        """
+        result = {}
+        image_paths = any(book.image_path for book in books or ())
+        members = self._category_members(books, categories) if books and categories else None
+        nested_formats = {"json", "csv"} & set(self.formats)
+        if (members is None or not nested_formats
+                or image_paths != any(book.image_path for category in categories for book in category.books)):
+            if books:
+                result["books"] = self.write_books(books)
+            if categories:
+                result["categories"] = self.write_categories(categories)
+            return result
+
+        with GroupedSpill(self.directory) as spill:
+            result["books"] = self._write_books(books, (spill, members))
+            if nested_formats.issubset(result["books"]):
+                result["categories"] = self._write_categories(categories, True, spill, image_paths)
+            else:
+                result["categories"] = self.write_categories(categories)
+        return result
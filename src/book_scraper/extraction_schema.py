@@ -0,0 +1,220 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+import soupsieve
+
+from src.Utils.metrics import REGISTRY
+from src.Utils.utils import absolute_url
+
+# Star rating class on the listing page -> numeric rating
+RATING_MAP = {'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5}
+
+
+class MissingFieldError(ValueError):
+    """A required field's selector matched nothing."""
+
+
+# --- Post-processors: (raw value, base_url) -> field value ---
+def clean_price(text: str, base_url: str) -> str:
+    # The site's pound sign is read as "Â£" when the page is decoded as ISO-8859-1
+    return text.replace("Â", "")
+
+def rating_from_classes(classes: List[str], base_url: str) -> int:
+    for cls in classes:
+        if cls in RATING_MAP:
+            return RATING_MAP[cls]
+    return 0
+
+def catalogue_link(href: str, base_url: str) -> str:
+    if 'catalogue/' not in href:
+        href = 'catalogue/' + href
+    return absolute_url(base_url, href)
+
+def absolutize(src: str, base_url: str) -> str:
+    return absolute_url(base_url, src)
+
+def page_relative(src: str, base_url: str) -> str:
+    # Resolved the way a browser does, against the URL of the page it appears on
+    return urljoin(base_url, src)
+
+
+class FieldSpec:
+    """
+    One field of an extraction schema.
+
+    The selector is compiled once with soupsieve and applied to the record's root
+    element. The field's value is the matched element's attribute (or its stripped
+    text when no attribute is given), passed through `post`. If the selector matches
+    nothing, or the attribute is missing, the field gets `default`; a `required` field
+    raises MissingFieldError instead. A field without a selector always gets `default`.
+    """
+
+    __slots__ = ("name", "selector", "attribute", "post", "default", "required", "_compiled")
+
+    def __init__(self, name: str, selector: Optional[str] = None, attribute: Optional[str] = None,
+                 post: Optional[Callable[[Any, str], Any]] = None, default: Any = None, required: bool = False):
+        self.name = name
+        self.selector = selector
+        self.attribute = attribute
+        self.post = post
+        self.default = default
+        self.required = required
+        self._compiled = soupsieve.compile(selector) if selector else None
+
+    def extract(self, root, base_url: str) -> Any:
+        if self._compiled is None:
+            return self.default
+        return self.value(self._compiled.select_one(root), base_url)
+
+    def value(self, element, base_url: str) -> Any:
+        """Field value for an already matched element (None if nothing matched)."""
+        if element is None:
+            if self.required:
+                raise MissingFieldError(f"'{self.selector}' not found for field '{self.name}'")
+            return self.default
+        value = element.get(self.attribute) if self.attribute else element.get_text(strip=True)
+        if value is None:
+            return self.default
+        return self.post(value, base_url) if self.post else value
+
+
+class ExtractionSchema:
+    """
+    Declarative extractor: a record selector plus a list of FieldSpecs.
+
+    Selectors and post-processors are compiled when the schema is built, so extracting
+    a page only runs the compiled matchers. Every field's extraction time, misses (the
+    default was used) and errors are counted across all pages the schema has seen;
+    stats() and report() show which selectors are expensive or failing.
+    """
+
+    def __init__(self, record_selector: str, fields: List[FieldSpec]):
+        self.record_selector = record_selector
+        self.fields = list(fields)
+        self._records = soupsieve.compile(record_selector)
+
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.records = 0
+        self.skipped = 0
+        self._seconds = {field.name: 0.0 for field in self.fields}
+        self._misses = {field.name: 0 for field in self.fields}
+        self._errors = {field.name: 0 for field in self.fields}
+
+    def extract(self, soup, base_url: str) -> List[Dict[str, Any]]:
+        """
+        Extract one record per element matching the record selector.
+
+        A record with a failing field is skipped (and reported) rather than failing the page.
+        """
+        roots = self._records.select(soup)
+        if not roots:
+            raise ValueError(f"No records matching '{self.record_selector}' found.")
+
+        # Counted locally and merged once, so threads extracting different pages don't contend
+        seconds = dict.fromkeys(self._seconds, 0.0)
+        misses = dict.fromkeys(self._misses, 0)
+        errors = dict.fromkeys(self._errors, 0)
+        records = []
+        record_seconds = []
+        clock = time.perf_counter
+        for root in roots:
+            record_started = clock()
+            record = {}
+            # Fields sharing a selector (title and link) share one match
+            matched = {}
+            try:
+                for field in self.fields:
+                    started = clock()
+                    try:
+                        if field._compiled is None:
+                            value = field.default
+                        else:
+                            if field.selector not in matched:
+                                matched[field.selector] = field._compiled.select_one(root)
+                            value = field.value(matched[field.selector], base_url)
+                    except Exception:
+                        errors[field.name] += 1
+                        raise
+                    finally:
+                        seconds[field.name] += clock() - started
+                    if value is field.default and field.selector:
+                        misses[field.name] += 1
+                    record[field.name] = value
+            except Exception as e:
+                print(f"Error extracting product info: {e}")
+                continue
+            finally:
+                record_seconds.append(clock() - record_started)
+            records.append(record)
+
+        REGISTRY.observe_many("extract_seconds", record_seconds)
+        with self._lock:
+            self.pages += 1
+            self.records += len(records)
+            self.skipped += len(roots) - len(records)
+            for name in self._seconds:
+                self._seconds[name] += seconds[name]
+                self._misses[name] += misses[name]
+                self._errors[name] += errors[name]
+        return records
+
+    def extract_many(self, soups, base_url: str) -> List[List[Dict[str, Any]]]:
+        """Apply the schema to a batch of parsed pages; a page that fails yields []."""
+        results = []
+        for soup in soups:
+            try:
+                results.append(self.extract(soup, base_url))
+            except Exception as e:
+                print(f"Main product extraction error: {e}")
+                results.append([])
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                field.name: {
+                    "seconds": round(self._seconds[field.name], 6),
+                    "misses": self._misses[field.name],
+                    "errors": self._errors[field.name],
+                }
+                for field in self.fields
+            }
+
+    def report(self) -> str:
+        stats = self.stats()
+        lines = [f"Extraction: {self.records} records from {self.pages} pages ({self.skipped} skipped)"]
+        for name, field_stats in sorted(stats.items(), key=lambda item: -item[1]["seconds"]):
+            per_record = field_stats["seconds"] / self.records * 1e6 if self.records else 0.0
+            lines.append(f"  {name:<14} {per_record:8.2f} us/record  "
+                         f"misses={field_stats['misses']} errors={field_stats['errors']}")
+        return "\n".join(lines)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.pages = self.records = self.skipped = 0
+            for name in self._seconds:
+                self._seconds[name] = 0.0
+                self._misses[name] = 0
+                self._errors[name] = 0
+
+
+def listing_schema() -> ExtractionSchema:
+    """Schema for the product pods of a books.toscrape.com listing page."""
+    return ExtractionSchema('article.product_pod', [
+        FieldSpec('title', 'h3 a', attribute='title', default="Title not found"),
+        FieldSpec('price', '.price_color', post=clean_price, default="Price not found"),
+        # A pod without a title link is not a product we can follow
+        FieldSpec('link', 'h3 a', attribute='href', post=catalogue_link, default="Link not found", required=True),
+        FieldSpec('image_url', 'img', attribute='src', post=absolutize, default="Image not found"),
+        # Where the cover can actually be downloaded from; only used by the image stage
+        FieldSpec('cover_url', 'img', attribute='src', post=page_relative),
+        FieldSpec('availability', 'p.instock.availability', default="Availability not found"),
+        FieldSpec('description'),  # Filled in once the detail page is fetched
+        FieldSpec('rating', 'p.star-rating', attribute='class', post=rating_from_classes, default=0),
+    ])
+
+
+LISTING_SCHEMA = listing_schema()
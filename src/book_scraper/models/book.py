@@ -1,22 +1,155 @@
+import re
+import sys
+from decimal import Decimal, InvalidOperation
+
+PRICE_PATTERN = re.compile(r'(\d+)(?:\.(\d{1,2}))?')
+STOCK_PATTERN = re.compile(r'\((\d+)\s+available\)', re.IGNORECASE)
+
+# Keys of to_dict(), which is also what the read-only mapping interface exposes
+BOOK_FIELDS = ("title", "price", "rating", "availability", "category", "url", "image_url", "description")
+# ...plus image_path, which to_dict() only writes when a cover was downloaded
+_MAPPING_FIELDS = BOOK_FIELDS + ("image_path",)
+
+
+def parse_price_pence(value):
+    """
+    Price in integer pence from "51.77", "£51.77", "Â£51.77", 51.77 or Decimal("51.77").
+    Returns None when there is no price in the value.
+    """
+    if type(value) is str:
+        # Fast path for the "51.77" strings written by to_dict()
+        pounds, dot, pence = value.partition(".")
+        if dot and len(pence) == 2 and pounds.isdigit() and pence.isdigit():
+            return int(pounds) * 100 + int(pence)
+    elif value is None or isinstance(value, bool):
+        return None
+    elif isinstance(value, int):
+        return value * 100
+    elif isinstance(value, (float, Decimal)):
+        try:
+            return int((Decimal(str(value)) * 100).to_integral_value())
+        except InvalidOperation:
+            return None
+    match = PRICE_PATTERN.search(str(value).replace(",", ""))
+    if not match:
+        return None
+    pounds, pence = match.groups()
+    return int(pounds) * 100 + (int(pence.ljust(2, "0")) if pence else 0)
+
+
+def format_pence(pence):
+    """Integer pence -> "51.77", the way prices are written out."""
+    if pence is None:
+        return None
+    return f"{pence // 100}.{pence % 100:02d}"
+
+
+def parse_rating(value):
+    if type(value) is int:
+        return value
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_stock(availability):
+    """Copies in stock from the availability text; None when the page doesn't say how many."""
+    if not availability:
+        return None
+    match = STOCK_PATTERN.search(availability)
+    if match:
+        return int(match.group(1))
+    if "out of stock" in availability.lower():
+        return 0
+    return None
+
+
+def _intern(value):
+    # Availability and category take a handful of distinct values across the whole catalogue
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# availability text -> (interned text, stock); there are only a few dozen distinct texts
+_availability_cache = {}
+
+
+def _parse_availability(availability):
+    cached = _availability_cache.get(availability)
+    if cached is None:
+        cached = (_intern(availability), parse_stock(availability))
+        if len(_availability_cache) < 10_000:
+            _availability_cache[availability] = cached
+    return cached
+
+
 class Book:
-    def __init__(self, title, price, rating, availability, category, url=None, image_url=None, description=None):
+    """
+    One scraped book, typed once when it is created.
+
+    price is kept as integer pence (exposed as a Decimal through `price`), rating as an
+    int and the stock count parsed out of the availability text. Attributes live in
+    __slots__ and repeated texts are interned, so a book takes less memory than a
+    dict-backed object. The book can also be read like the dictionary to_dict() returns
+    (book.get("rating"), book["title"]), which lets the analytics in Processing take
+    Book objects or loaded JSON records; as in a record with the key left out, a field
+    that is None is not in keys() and get() falls back to its default.
+    """
+
+    __slots__ = ("title", "price_pence", "rating", "availability", "stock", "category",
+                 "url", "image_url", "description", "image_path")
+
+    def __init__(self, title, price, rating, availability, category, url=None, image_url=None, description=None,
+                 image_path=None):
         self.title = title
-        self.price = price
-        self.rating = rating
-        self.availability = availability
-        self.category = category
+        self.price_pence = parse_price_pence(price)
+        self.rating = parse_rating(rating)
+        self.availability, self.stock = _parse_availability(availability)
+        self.category = _intern(category)
         self.url = url
         self.image_url = image_url
         self.description = description
+        # Local copy of the cover, when the crawl downloaded it
+        self.image_path = image_path
+
+    @property
+    def price(self):
+        return Decimal(self.price_pence).scaleb(-2) if self.price_pence is not None else None
+
+    @price.setter
+    def price(self, value):
+        self.price_pence = parse_price_pence(value)
 
     def __str__(self):
         return f"{self.title} (£{self.price}) - {self.rating} stars"
 
+    def __repr__(self):
+        return f"Book(title={self.title!r}, price={format_pence(self.price_pence)}, rating={self.rating})"
+
+    # --- Read-only mapping interface over the fields that are set, same keys as to_dict() ---
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in _MAPPING_FIELDS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in _MAPPING_FIELDS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in _MAPPING_FIELDS else None
+        return default if value is None else value
+
+    def keys(self):
+        return tuple(name for name in _MAPPING_FIELDS if getattr(self, name) is not None)
+
     def to_dict(self):
         """Convert book object to dictionary for easy JSON serialization"""
-        return {
+        data = {
             "title": self.title,
-            "price": self.price,
+            "price": format_pence(self.price_pence),
             "rating": self.rating,
             "availability": self.availability,
             "category": self.category,
@@ -24,17 +157,14 @@ class Book:
             "image_url": self.image_url,
             "description": self.description
         }
+        # Only present when covers were downloaded, so other exports keep their columns
+        if self.image_path is not None:
+            data["image_path"] = self.image_path
+        return data
 
     @classmethod
     def from_dict(cls, data):
         """Create a Book object from a dictionary"""
-        return cls(
-            title=data.get("title"),
-            price=data.get("price"),
-            rating=data.get("rating"),
-            availability=data.get("availability"),
-            category=data.get("category"),
-            url=data.get("url"),
-            image_url=data.get("image_url"),
-            description=data.get("description")
-        )
+        get = data.get
+        return cls(get("title"), get("price"), get("rating"), get("availability"), get("category"),
+                   get("url"), get("image_url"), get("description"), get("image_path"))
@@ -1,4 +1,9 @@
+from src.book_scraper.models.book import Book
+
+
 class Category:
+    __slots__ = ("name", "url", "book_count", "books")
+
     def __init__(self, name, url = None, book_count = 0, books = None):
         if books is None:
             books = []
@@ -21,9 +26,10 @@ class Category:
     @classmethod
     def from_dict(cls, data):
         """Create a Category object from a dictionary"""
+        books = [book if isinstance(book, Book) else Book.from_dict(book) for book in data.get("books") or []]
         return cls(
             name=data.get("name"),
             url=data.get("url"),
-            book_count=data.get("book_count"),
-            books=data.get("books"),
+            book_count=data.get("book_count", len(books)),
+            books=books,
         )
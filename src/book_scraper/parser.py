@@ -1,13 +1,106 @@
-from bs4 import BeautifulSoup, Tag
+import codecs
+import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from src.book_scraper.extraction_schema import LISTING_SCHEMA
+from src.book_scraper.seen_urls import active_seen_urls
 from src.requests_module.requests_manager import get_request
-from src.Utils.utils import absolute_url, extract_number
+from src.requests_module.async_requests_manager import async_get_request
+from src.requests_module.session_manager import get_session_manager
+from src.Utils.metrics import REGISTRY
+from src.Utils.utils import extract_number
 
+# Maximum number of detail pages fetched at the same time for one listing page
+DEFAULT_DETAIL_WORKERS = 8
+# Listing pages fetched at the same time once the pager has been read
+DEFAULT_PAGE_WORKERS = 4
 
-def parse_html(html_content):
+PAGE_COUNT_PATTERN = re.compile(r'Page\s+(\d+)\s+of\s+(\d+)', re.IGNORECASE)
+PAGE_URL_PATTERN = re.compile(r'page-(\d+)\.html$')
+
+# 'dom' parses the whole detail page; 'stream' tokenizes it incrementally and stops at the description
+DESCRIPTION_MODES = ('dom', 'stream')
+_description_mode = 'dom'
+STREAM_CHUNK_SIZE = 4096
+# Unread bytes still drained after the description so the connection can be reused
+STREAM_DRAIN_LIMIT = 16 * 1024
+
+VOID_ELEMENTS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                           'link', 'meta', 'param', 'source', 'track', 'wbr'])
+
+
+class PageRegionStrainer(SoupStrainer):
+    """
+    Only build the parts of a page the extractors read: product pods, the description
+    header and the paragraphs after it, the pager, the result count and the category menu.
+    Everything else (header, navigation, scripts, footer) is skipped while parsing.
+    """
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        classes = attrs.get('class') or ''
+        if isinstance(classes, str):
+            classes = classes.split()
+        if name == 'article':
+            return 'product_pod' in classes
+        if name == 'div':
+            return attrs.get('id') == 'product_description' or 'side_categories' in classes
+        if name == 'li':
+            return 'next' in classes or 'current' in classes
+        if name == 'form':
+            return 'form-horizontal' in classes
+        # Top-level paragraphs: the description is the first one after #product_description
+        return name == 'p'
+
+    def allow_string_creation(self, string):
+        return False
+
+
+def _lxml_available():
+    try:
+        import lxml  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+LXML_AVAILABLE = _lxml_available()
+
+# name -> (tree builder, parse_only strainer factory); all of them produce BeautifulSoup trees,
+# so every extraction function works unchanged whichever backend built the soup
+PARSER_BACKENDS = {
+    'html.parser': ('html.parser', None),
+    'lxml': ('lxml', None),
+    'strained': ('lxml' if LXML_AVAILABLE else 'html.parser', PageRegionStrainer),
+}
+DEFAULT_PARSER_BACKEND = 'html.parser'
+_parser_backend = DEFAULT_PARSER_BACKEND
+
+
+def set_parser_backend(backend):
+    """Select the backend used by parse_html when none is passed explicitly."""
+    global _parser_backend
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}'. Available: {', '.join(PARSER_BACKENDS)}")
+    if PARSER_BACKENDS[backend][0] == 'lxml' and not LXML_AVAILABLE:
+        raise ValueError(f"Parser backend '{backend}' requires lxml: pip install lxml")
+    _parser_backend = backend
+
+def get_parser_backend():
+    return _parser_backend
+
+def parse_html(html_content, backend=None):
     try:
         if not html_content:
             raise ValueError("HTML content is empty or None.")
-        return BeautifulSoup(html_content, 'html.parser')
+        backend = backend or _parser_backend
+        features, strainer = PARSER_BACKENDS[backend]
+        with REGISTRY.timer("parse_seconds", backend=backend):
+            if strainer is not None:
+                return BeautifulSoup(html_content, features, parse_only=strainer())
+            return BeautifulSoup(html_content, features)
     except Exception as e:
         print(f"Failed to parse HTML content: {e}")
         return None
@@ -43,86 +136,328 @@ def recursive_text_extraction(element, depth=0, max_depth=5):
             results.extend(recursive_text_extraction(child, depth + 1, max_depth))
     return results
 
-def extract_description(detail_url):
+def parse_description(html_content):
+    """Read the description paragraph out of a product detail page."""
+    soup = parse_html(html_content)
+    if not soup:
+        return "Description not available"
+    desc_header = soup.find('div', id='product_description')
+    if desc_header:
+        desc_paragraph = desc_header.find_next_sibling('p')
+        return desc_paragraph.get_text(strip=True) if desc_paragraph else "Description not found"
+    return "Description not found"
+
+class DescriptionStreamParser(HTMLParser):
+    """
+    Incremental tokenizer that finds the same paragraph as parse_description
+    (the first <p> sibling after div#product_description) without building a tree.
+
+    Feed it chunks of the page; `done` turns True as soon as the paragraph is closed,
+    so the rest of the page never has to be read or tokenized.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.depth = 0
+        self.done = False
+        self.found_header = False
+        self.chars_fed = 0
+        self._header_depth = None    # depth of div#product_description while inside it
+        self._sibling_depth = None   # depth at which its siblings live once it is closed
+        self._skip_depth = None      # inside a non-<p> sibling
+        self._paragraph_depth = None # inside the description <p>
+        self._strings = []
+        self._text = []
+
+    def feed(self, data):
+        if self.done:
+            return
+        self.chars_fed += len(data)
+        super().feed(data)
+
+    def _flush_text(self):
+        # Like get_text(strip=True): strip every text node on its own, then concatenate
+        if self._text:
+            string = "".join(self._text).strip()
+            if string:
+                self._strings.append(string)
+            self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self._paragraph_depth is not None:
+            self._flush_text()
+        if tag in VOID_ELEMENTS:
+            return
+        self.depth += 1
+
+        if self._sibling_depth is not None and self._paragraph_depth is None and self._skip_depth is None \
+                and self.depth == self._sibling_depth:
+            if tag == 'p':
+                self._paragraph_depth = self.depth
+            else:
+                self._skip_depth = self.depth
+        elif not self.found_header and tag == 'div' and dict(attrs).get('id') == 'product_description':
+            self.found_header = True
+            self._header_depth = self.depth
+
+    def handle_startendtag(self, tag, attrs):
+        if self._paragraph_depth is not None:
+            self._flush_text()
+
+    def handle_endtag(self, tag):
+        if self.done or tag in VOID_ELEMENTS:
+            return
+        if self._paragraph_depth is not None:
+            self._flush_text()
+            if self.depth == self._paragraph_depth:
+                self.done = True
+        elif self._skip_depth is not None and self.depth == self._skip_depth:
+            self._skip_depth = None
+        elif self._header_depth is not None and self.depth == self._header_depth:
+            self._header_depth = None
+            self._sibling_depth = self.depth
+        elif self._sibling_depth is not None and self.depth < self._sibling_depth:
+            # The header's parent closed without a <p> sibling
+            self.done = True
+            self._sibling_depth = None
+        self.depth -= 1
+
+    def handle_data(self, data):
+        if self._paragraph_depth is not None and not self.done:
+            self._text.append(data)
+
+    def result(self):
+        if self._paragraph_depth is not None:
+            self._flush_text()
+            return "".join(self._strings)
+        if not self.chars_fed:
+            return "Description not available"
+        return "Description not found"
+
+
+def parse_description_stream(chunks):
+    """Streaming counterpart of parse_description over an iterable of text chunks."""
+    stream_parser = DescriptionStreamParser()
+    for chunk in chunks:
+        stream_parser.feed(chunk)
+        if stream_parser.done:
+            break
+    return stream_parser.result()
+
+def stream_description(detail_url, chunk_size=STREAM_CHUNK_SIZE, drain_limit=STREAM_DRAIN_LIMIT):
+    """
+    Fetch a detail page as a stream and stop reading once the description is complete.
+
+    If what is left of the body is smaller than drain_limit it is still read, so the
+    keep-alive connection goes back to the pool; otherwise the connection is closed.
+    """
+    manager = get_session_manager()
+    if manager.cache is not None:
+        # Cached pages are served from disk as a whole, there is nothing to stream
+        response = get_request(detail_url)
+        return parse_description_stream([response.text])
+
+    response = manager.get(detail_url, stream=True)
     try:
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        stream_parser = DescriptionStreamParser()
+        bytes_read = 0
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            bytes_read += len(chunk)
+            stream_parser.feed(decoder.decode(chunk))
+            if stream_parser.done:
+                break
+        else:
+            stream_parser.feed(decoder.decode(b'', final=True))
+
+        content_length = response.headers.get('Content-Length')
+        if stream_parser.done and content_length and content_length.isdigit() \
+                and int(content_length) - bytes_read <= drain_limit:
+            for _ in response.iter_content(chunk_size=drain_limit or 1):
+                pass
+        return stream_parser.result()
+    finally:
+        response.close()
+
+def set_description_mode(mode):
+    """Select how extract_description reads detail pages: 'dom' or 'stream'."""
+    global _description_mode
+    if mode not in DESCRIPTION_MODES:
+        raise ValueError(f"Unknown description mode '{mode}'. Available: {', '.join(DESCRIPTION_MODES)}")
+    _description_mode = mode
+
+def extract_description(detail_url, mode=None):
+    try:
+        if (mode or _description_mode) == 'stream':
+            return stream_description(detail_url)
         response = get_request(detail_url)
         if not response or not hasattr(response, 'text'):
             return "Description not available"
-        soup = parse_html(response.text)
-        if not soup:
-            return "Description not available"
-        desc_header = soup.find('div', id='product_description')
-        if desc_header:
-            desc_paragraph = desc_header.find_next_sibling('p')
-            return desc_paragraph.get_text(strip=True) if desc_paragraph else "Description not found"
-        return "Description not found"
+        return parse_description(response.text)
     except Exception as e:
         print(f"Error extracting description from {detail_url}: {e}")
         return "Description error"
 
-def extract_product_details(soup, base_url):
-    products = []
+def description_fetched(description):
+    """
+    False for the placeholders returned when a detail page could not be read; such pages
+    are not remembered as seen, so the next crawl retries them.
+    """
+    return description not in ("Description not available", "Description error")
+
+async def aextract_description(detail_url, session_manager=None):
+    """Async counterpart of extract_description for the asyncio crawl engine."""
+    async def fetch(url):
+        try:
+            html_content = await async_get_request(url, session_manager=session_manager)
+            if not html_content:
+                return "Description not available"
+            return parse_description(html_content)
+        except Exception as e:
+            print(f"Error extracting description from {url}: {e}")
+            return "Description error"
+
+    seen = active_seen_urls()
+    if seen is None:
+        return await fetch(detail_url)
+    return await seen.aget_or_fetch(detail_url, fetch, keep=description_fetched)
+
+def _safe_extract_description(detail_url):
+    # A single bad detail page must not take down the rest of the listing page
     try:
-        product_articles = soup.select('article.product_pod')
-        if not product_articles:
-            raise ValueError("No product articles found.")
-
-        for article in product_articles:
-            try:
-                title_tag = article.select_one('h3 a')
-                title = title_tag['title'] if title_tag and 'title' in title_tag.attrs else "Title not found"
-                relative_link = title_tag.get("href", "")
-                if 'catalogue/' not in relative_link:
-                    relative_link = 'catalogue/' + relative_link
-                full_link = absolute_url(base_url, relative_link) if relative_link else "Link not found"
-
-                price = select_with_css(article, '.price_color')
-                image = article.find('img')
-                image_url = absolute_url(base_url, image['src']) if image and 'src' in image.attrs else "Image not found"
-
-                availability_list = select_with_tag_and_attr(article, 'p', 'class', 'instock availability')
-                availability_text = availability_list[0] if availability_list else "Availability not found"
-
-                description = extract_description(full_link)
-
-                rating_tag = article.select_one('p.star-rating')
-                rating_map = {
-                    'One': 1, 'Two': 2, 'Three': 3,
-                    'Four': 4, 'Five': 5
-                }
-                rating = 0
-                if rating_tag:
-                    for cls in rating_tag.get('class', []):
-                        if cls in rating_map:
-                            rating = rating_map[cls]
-                            break
-
-                product_data = {
-                    'title': title,
-                    'price': price[0].replace("Â", "") if price else "Price not found",
-                    'link': full_link,
-                    'image_url': image_url,
-                    'availability': availability_text,
-                    'description': description,
-                    'rating': rating  # Add this line
-                }
-
-                products.append(product_data)
-            except Exception as inner_e:
-                print(f"Error extracting product info: {inner_e}")
-                continue
+        seen = active_seen_urls()
+        if seen is not None:
+            return seen.get_or_fetch(detail_url, extract_description, keep=description_fetched)
+        return extract_description(detail_url)
+    except Exception as e:
+        print(f"Error extracting description from {detail_url}: {e}")
+        return "Description error"
+
+def fetch_descriptions(detail_urls, max_workers=DEFAULT_DETAIL_WORKERS):
+    """Fetch detail-page descriptions concurrently, returned in the order of detail_urls."""
+    if not detail_urls:
+        return []
+    if max_workers is None or max_workers <= 1 or len(detail_urls) == 1:
+        return [_safe_extract_description(url) for url in detail_urls]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(detail_urls))) as executor:
+        return list(executor.map(_safe_extract_description, detail_urls))
+
+def extract_listing_products(soup, base_url, schema=None, page_url=None):
+    """
+    Extract the listing fields of every article.product_pod on a page.
+    The 'description' of each product is left as None; it lives on the detail page.
+    Links relative to the page (the cover_url) are resolved against page_url when it is given.
+    """
+    try:
+        return (schema or LISTING_SCHEMA).extract(soup, page_url or base_url)
     except Exception as e:
         print(f"Main product extraction error: {e}")
+        return []
+
+def extract_product_details(soup, base_url, max_workers=DEFAULT_DETAIL_WORKERS, page_url=None):
+    products = extract_listing_products(soup, base_url, page_url=page_url)
+
+    # Detail pages are independent of each other, so fan them out
+    descriptions = fetch_descriptions([product['link'] for product in products], max_workers)
+    for product, description in zip(products, descriptions):
+        product['description'] = description
     return products
 
+def extract_categories(soup, base_url):
+    """Map category name -> details from the side menu of the home page."""
+    # Find the category navigation section
+    side_categories = soup.select('.side_categories .nav-list > li > ul > li > a')
+
+    categories_map = {}
+
+    for category_link in side_categories:
+        category_name = category_link.get_text(strip=True)
+        category_url = category_link.get('href', '')
+
+        # Build the full URL for the category
+        if category_url:
+            category_url = base_url + category_url if not category_url.startswith('http') else category_url
+
+        # Extract category ID from URL if possible
+        category_id = None
+        if category_url and '/' in category_url:
+            parts = category_url.rstrip('/').split('/')
+            for i, part in enumerate(parts):
+                if part == "category" and i + 2 < len(parts):
+                    # Format is typically /category/books/category_id/
+                    category_id = parts[i + 2].split('_')[1] if '_' in parts[i + 2] else None
+                    break
+
+        categories_map[category_name] = {
+            'name': category_name,
+            'url': category_url,
+            'id': category_id,
+            'book_count': 0
+        }
+
+    return categories_map
+
 def get_next_page_url(soup, current_url):
     next_li = soup.find('li', class_='next')
     if next_li:
         next_link = next_li.find('a')
         if next_link and next_link.get('href'):
-            return absolute_url(current_url, next_link['href'])
+            # Resolve against the current page: category pagers link to "page-2.html"
+            # next to the category index, not under the catalogue root
+            return urljoin(current_url, next_link['href'])
     return None
 
+def get_page_count(soup):
+    """Total number of listing pages from the pager ("Page 1 of N"), or None if it can't be read."""
+    current_li = soup.find('li', class_='current')
+    if not current_li:
+        return None
+    match = PAGE_COUNT_PATTERN.search(current_li.get_text(" ", strip=True))
+    return int(match.group(2)) if match else None
+
+def get_result_count(soup):
+    """Total number of books in the listing ("<strong>N</strong> results"), or None."""
+    count_tag = soup.select_one('form.form-horizontal strong')
+    if count_tag:
+        text = count_tag.get_text(strip=True)
+        if text.isdigit():
+            return int(text)
+    return None
+
+def plan_page_urls(soup, current_url, max_pages):
+    """
+    Build the URLs of the listing pages after the current one from its pager, so that
+    max_pages pages are visited in total (the current page included).
+
+    Returns an empty list for a single-page listing and None when the pager can't be parsed,
+    in which case the caller should fall back to following "next" links.
+    """
+    next_url = get_next_page_url(soup, current_url)
+    if not next_url:
+        return []
+
+    # The "next" link names the following page; the others only differ in their number
+    next_match = PAGE_URL_PATTERN.search(next_url)
+    if not next_match:
+        return None
+    next_number = int(next_match.group(1))
+
+    page_count = get_page_count(soup)
+    if page_count is None:
+        result_count = get_result_count(soup)
+        page_size = len(soup.select('article.product_pod'))
+        if not result_count or not page_size:
+            return None
+        page_count = -(-result_count // page_size)
+    if page_count < next_number:
+        # Pager contradicts the "next" link
+        return None
+
+    last_page = min(page_count, next_number - 1 + max_pages - 1)
+    return [PAGE_URL_PATTERN.sub(f"page-{number}.html", next_url) for number in range(next_number, last_page + 1)]
+
 def scrape_all_pages(base_url):
     all_products = []
     next_page = base_url
@@ -0,0 +1,332 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.book_scraper.crawl_journal import CrawlJournal
+from src.book_scraper.parser import (description_fetched, extract_listing_products, get_next_page_url,
+                                     get_parser_backend, parse_description, parse_html, plan_page_urls,
+                                     set_parser_backend, DEFAULT_DETAIL_WORKERS)
+from src.book_scraper.seen_urls import active_seen_urls
+from src.requests_module.requests_manager import get_request
+from src.Utils.metrics import REGISTRY
+
+DEFAULT_PARSE_WORKERS = os.cpu_count() or 1
+# Fetched pages allowed to wait for the parsers, and parsed pages allowed to wait for the sink
+DEFAULT_QUEUE_SIZE = 32
+
+LISTING = "listing"
+DETAIL = "detail"
+_STOP = None
+
+
+def _init_parse_worker(parser_backend: str) -> None:
+    set_parser_backend(parser_backend)
+
+
+def parse_page(kind: str, url: str, html: str, base_url: str, max_pages: int, plan: bool):
+    """
+    CPU stage, run in a worker process: parse one fetched page.
+
+    Returns (seconds spent, result, metrics). A detail page's result is its description; a
+    listing page's is (products, next_url, planned_urls), with planned_urls only read from
+    the pager when plan is true, or None when the page could not be parsed. metrics is what
+    the parse recorded in a worker process's REGISTRY, for the parent to merge, or None
+    when the page was parsed in the parent itself.
+    """
+    started = time.perf_counter()
+    if kind == DETAIL:
+        result = parse_description(html)
+    else:
+        soup = parse_html(html)
+        if soup is None:
+            result = None
+        else:
+            planned = plan_page_urls(soup, url, max_pages) if plan and max_pages > 1 else []
+            result = extract_listing_products(soup, base_url, page_url=url), get_next_page_url(soup, url), planned
+    seconds = time.perf_counter() - started
+    metrics = REGISTRY.drain() if multiprocessing.parent_process() is not None else None
+    return seconds, result, metrics
+
+
+class StageMetrics:
+    """Counters of one pipeline stage: items handled, time busy and blocked, depth of its input queue."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self._lock = threading.Lock()
+
+    def add(self, busy: float = 0.0, blocked: float = 0.0) -> None:
+        with self._lock:
+            self.items += 1
+            self.busy += busy
+            self.blocked += blocked
+
+    def sample(self, depth: int) -> None:
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            self._depth_total += depth
+            self._depth_samples += 1
+
+    def summary(self) -> str:
+        mean_depth = self._depth_total / self._depth_samples if self._depth_samples else 0.0
+        text = (f"{self.name}: {self.items} pages, {self.busy:.2f} s busy, "
+                f"queue depth mean {mean_depth:.1f} / max {self.max_depth}")
+        if self.blocked:
+            text += f", {self.blocked:.2f} s blocked on a full queue"
+        return text
+
+
+class CrawlPipeline:
+    """
+    Crawl of one listing split into stages that overlap instead of taking turns:
+
+    - fetch: fetch_workers threads download listing and detail pages through the active
+      session manager and put the raw HTML on a queue of queue_size pages;
+    - parse: a pool of parse_workers processes (so parsing is not serialized by the GIL),
+      started by run() and shut down when it ends, runs parse_html and the extraction on each page;
+    - sink: the calling thread joins descriptions to their products and yields each
+      listing page's products, in listing order, once all of its detail pages are in.
+
+    Backpressure: fetchers block while the parse queue is full, and no more than
+    queue_size parsed pages wait for the sink, so a slow stage holds back the ones
+    before it instead of buffering the crawl in memory. Each stage's queue depth and
+    busy/blocked time is kept in metrics. parse_workers=0 parses on a thread instead,
+    for machines with a single core.
+    """
+
+    def __init__(self, base_url: str, fetch_workers: int = DEFAULT_DETAIL_WORKERS,
+                 parse_workers: int = DEFAULT_PARSE_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.base_url = base_url
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = parse_workers
+        self.queue_size = max(1, queue_size)
+        self.metrics = {name: StageMetrics(name) for name in ("fetch", "parse", "sink")}
+
+    def _executor(self):
+        if self.parse_workers <= 0:
+            return ThreadPoolExecutor(max_workers=1)
+        # Spawned, not forked: the crawl already runs threads holding locks and sockets
+        return ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_parse_worker, initargs=(get_parser_backend(),))
+
+    def run(self, start_url: str, max_pages: int, journal: Optional[CrawlJournal] = None,
+            failed: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Crawl up to max_pages listing pages from start_url and yield each page's products,
+        descriptions filled in, in listing order. Pages already in the journal are replayed
+        from it, and finished pages are journaled, as in Processing.scrape_and_save.
+
+        Nothing is yielded past a listing page that could not be fetched or parsed, so the
+        output has no hole; its URL is appended to failed. The pages in flight are still
+        finished and journaled.
+        """
+        failed = failed if failed is not None else []
+        fetch_queue = queue.Queue()
+        parse_queue = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue()
+        # Taken by the dispatcher for each page it hands on, given back once the sink is done with it
+        sink_slots = threading.Semaphore(self.queue_size)
+        cancelled = threading.Event()
+        executor = self._executor()
+        metrics = self.metrics
+
+        def fetch_loop():
+            while True:
+                task = fetch_queue.get()
+                if task is _STOP:
+                    return
+                if cancelled.is_set():
+                    continue
+                started = time.perf_counter()
+                html, error = None, None
+                try:
+                    response = get_request(task[1])
+                    if response and hasattr(response, 'text'):
+                        html = response.text
+                except Exception as e:
+                    error = e
+                fetched = time.perf_counter()
+                # Blocks while the parsers are behind
+                parse_queue.put((task, html, error))
+                metrics["fetch"].add(busy=fetched - started, blocked=time.perf_counter() - fetched)
+                metrics["parse"].sample(parse_queue.qsize())
+
+        def dispatch_loop():
+            while True:
+                item = parse_queue.get()
+                if item is _STOP:
+                    return
+                while not sink_slots.acquire(timeout=0.1):
+                    if cancelled.is_set():
+                        break
+                if cancelled.is_set():
+                    continue
+                task, html, error = item
+                if error is not None or not html:
+                    results.put((task, None, error))
+                    continue
+                kind, url = task[0], task[1]
+                future = executor.submit(parse_page, kind, url, html, self.base_url, max_pages,
+                                         kind == LISTING and task[3])
+                future.add_done_callback(lambda done, task=task: results.put((task, done, None)))
+
+        fetchers = [threading.Thread(target=fetch_loop, daemon=True) for _ in range(self.fetch_workers)]
+        dispatcher = threading.Thread(target=dispatch_loop, daemon=True)
+        for thread in fetchers + [dispatcher]:
+            thread.start()
+
+        seen = active_seen_urls()
+        pages = {}
+        # Detail URL -> [(page index, product index)] waiting for its description
+        waiting = {}
+        outstanding = 0
+        next_to_yield = 0
+        stopped = False
+        follow_links = False
+
+        def submit(task):
+            nonlocal outstanding
+            outstanding += 1
+            fetch_queue.put(task)
+            metrics["fetch"].sample(fetch_queue.qsize())
+
+        def add_listing(index, url, plan=False):
+            entry = journal.completed_page(url) if journal else None
+            if entry is not None:
+                print(f"Already scraped, skipping: {url}")
+                pages[index] = {"url": url, "products": entry["products"], "next": entry["next"],
+                                "missing": 0, "ok": True, "journaled": True}
+                listing_done(index, plan)
+            else:
+                pages[index] = {"url": url, "products": None, "next": None, "missing": 0, "ok": False,
+                                "journaled": False}
+                submit((LISTING, url, index, plan))
+
+        def listing_done(index, plan, planned=None):
+            nonlocal follow_links
+            page = pages[index]
+            if plan:
+                # The first page decides how the rest of the listing is found
+                planned_urls = journal.frontier if journal else None
+                if planned_urls is None and not page["journaled"] and page["ok"]:
+                    planned_urls = planned
+                    if planned_urls is not None and journal:
+                        journal.record_frontier(planned_urls)
+                if planned_urls is None:
+                    print("Could not read the page count, following next-page links instead")
+                    follow_links = True
+                elif planned_urls:
+                    print(f"Fetching pages 2-{len(planned_urls) + 1} of {max_pages} through the pipeline")
+                    for offset, page_url in enumerate(planned_urls, start=1):
+                        add_listing(offset, page_url)
+            if follow_links and page["ok"] and page["next"] and index + 1 < max_pages:
+                print(f"Fetching page {index + 2} of {max_pages}: {page['next']}")
+                add_listing(index + 1, page["next"])
+
+        def page_finished(index):
+            page = pages[index]
+            if page["ok"] and not page["journaled"] and journal:
+                journal.record_page(page["url"], page["products"], page["next"])
+
+        def handle_listing(task, fetched, parsed, error):
+            index, plan = task[2], task[3]
+            page = pages[index]
+            if error is not None:
+                print(f"Error during scraping: {error}")
+            elif not fetched:
+                print(f"Failed to fetch {task[1]}")
+            page["products"] = parsed[0] if parsed else []
+            page["next"] = parsed[1] if parsed else None
+            page["ok"] = parsed is not None
+
+            for position, product in enumerate(page["products"]):
+                link = product.get('link')
+                description = seen.lookup(link) if seen is not None and link else None
+                if description is not None:
+                    product['description'] = description
+                    continue
+                page["missing"] += 1
+                if link in waiting:
+                    waiting[link].append((index, position))
+                else:
+                    waiting[link] = [(index, position)]
+                    submit((DETAIL, link))
+            listing_done(index, plan, parsed[2] if parsed else None)
+            if not page["missing"]:
+                page_finished(index)
+
+        def handle_detail(task, fetched, description, error):
+            url = task[1]
+            if error is not None:
+                print(f"Error extracting description from {url}: {error}")
+                description = "Description error"
+            elif not fetched:
+                description = "Description not available"
+            if seen is not None and url:
+                seen.record_fetch(url, description, keep=description_fetched)
+            for index, position in waiting.pop(url, ()):
+                page = pages[index]
+                page["products"][position]['description'] = description
+                page["missing"] -= 1
+                if not page["missing"]:
+                    page_finished(index)
+
+        try:
+            add_listing(0, start_url, plan=True)
+            while True:
+                # Hand out every page that is complete, in listing order
+                while not stopped and next_to_yield in pages and pages[next_to_yield]["products"] is not None \
+                        and not pages[next_to_yield]["missing"]:
+                    page = pages.pop(next_to_yield)
+                    if not page["ok"]:
+                        failed.append(page["url"])
+                        stopped = True
+                        break
+                    started = time.perf_counter()
+                    yield page["products"]
+                    metrics["sink"].add(busy=time.perf_counter() - started)
+                    next_to_yield += 1
+                if not outstanding:
+                    break
+
+                metrics["sink"].sample(results.qsize())
+                task, done, error = results.get()
+                # done is the parse future, or None when there was no page to parse
+                result = None
+                if done is not None:
+                    try:
+                        seconds, result, worker_metrics = done.result()
+                        metrics["parse"].add(busy=seconds)
+                        if worker_metrics is not None:
+                            REGISTRY.merge(worker_metrics)
+                    except Exception as e:
+                        error = e
+                handle = handle_listing if task[0] == LISTING else handle_detail
+                handle(task, done is not None, result, error)
+                outstanding -= 1
+                sink_slots.release()
+        finally:
+            cancelled.set()
+            for _ in fetchers:
+                fetch_queue.put(_STOP)
+            for thread in fetchers:
+                # A fetcher stuck on a full queue is freed as the dispatcher drops what it takes off
+                while thread.is_alive():
+                    thread.join(timeout=0.1)
+            parse_queue.put(_STOP)
+            dispatcher.join()
+            # Nothing is submitted past this point; parses still queued are not needed any more
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def report(self) -> str:
+        return "Pipeline: " + "; ".join(stage.summary() for stage in self.metrics.values())
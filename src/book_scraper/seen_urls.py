@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlparse
+
+from src.Utils.utils import absolute_url
+
+# How long a detail page fetched by an earlier run is trusted, in seconds
+DEFAULT_FRESHNESS = 24 * 3600
+# Past capacity the filter only lets more lookups through to the exact store
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.01
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a book URL, so "../../../a-light_1000/index.html" style links and
+    absolute catalogue URLs of the same page compare equal: lower-case scheme and host,
+    no fragment, and the path run through Utils.utils.absolute_url.
+    """
+    parsed = urlparse(url)
+    if not parsed.scheme or not parsed.netloc:
+        return url
+    root = f"{parsed.scheme.lower()}://{parsed.netloc.lower()}/"
+    normalized = absolute_url(root, parsed.path)
+    return f"{normalized}?{parsed.query}" if parsed.query else normalized
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings: no false negatives, false positives at about
+    error_rate once capacity items are in. Takes about 1.2 bytes per item at 1%.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class SeenUrls:
+    """
+    Crawl-wide record of the detail pages already fetched, with their descriptions.
+
+    A Bloom filter answers "never seen" without touching the exact store, which is a
+    SQLite table on disk mapping the normalized URL to its fetch time and description:
+    in the given file, to carry it across runs, or else in a temporary file removed on
+    close, so descriptions never pile up in memory. A page counts as seen when it was fetched in
+    this run, or by an earlier run less than freshness seconds ago; get_or_fetch() then
+    returns the stored description instead of requesting the page again. Threads asking
+    for a page another thread is already fetching wait for that fetch.
+    """
+
+    def __init__(self, path: Optional[str] = None, freshness: float = DEFAULT_FRESHNESS,
+                 capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.path = path
+        self.freshness = freshness
+        self.run_started = time.time()
+        self.fetched = 0
+        self.skipped = 0
+        self.bloom = BloomFilter(capacity, error_rate)
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._async_in_flight = {}
+        self._temporary_path = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        else:
+            handle, self._temporary_path = tempfile.mkstemp(prefix="seen_urls_", suffix=".db")
+            os.close(handle)
+        self._connection = sqlite3.connect(path or self._temporary_path, check_same_thread=False)
+        if self._temporary_path:
+            # Nothing to recover after a crash, so skip the journal and the syncs
+            self._connection.execute("PRAGMA journal_mode = OFF")
+            self._connection.execute("PRAGMA synchronous = OFF")
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS seen_urls "
+                                     "(url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, description TEXT)")
+            # Only entries still fresh can ever be hits, so only they go into the filter
+            rows = self._connection.execute("SELECT url FROM seen_urls WHERE fetched_at >= ?",
+                                            (self._fresh_since(),))
+            for (url,) in rows:
+                self.bloom.add(url)
+
+    def _fresh_since(self) -> float:
+        return min(self.run_started, time.time() - self.freshness) if self.freshness else self.run_started
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+            if self._temporary_path and os.path.exists(self._temporary_path):
+                os.remove(self._temporary_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _lookup(self, key: str):
+        # Caller holds the lock
+        if key not in self.bloom:
+            return None
+        row = self._connection.execute("SELECT fetched_at, description FROM seen_urls WHERE url = ?",
+                                       (key,)).fetchone()
+        if row is None or row[0] < self._fresh_since():
+            return None
+        return row
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Stored description of url if it counts as seen, else None; a hit counts as a skipped request."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._lookup(key)
+            if row is None:
+                return None
+            self.skipped += 1
+            return row[1]
+
+    def record(self, url: str, description: Optional[str]) -> None:
+        key = normalize_url(url)
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO seen_urls VALUES (?, ?, ?)",
+                                     (key, time.time(), description))
+            self.bloom.add(key)
+
+    def record_fetch(self, url: str, description: str, keep: Callable[[str], bool] = lambda value: True) -> None:
+        """Count a fetch the caller made itself, recording its result when keep(description) is true."""
+        with self._lock:
+            self.fetched += 1
+        if keep(description):
+            self.record(url, description)
+
+    def get_or_fetch(self, url: str, fetch: Callable[[str], str],
+                     keep: Callable[[str], bool] = lambda value: True) -> str:
+        """
+        Description of url from the store, or from fetch(url), recorded when keep(result)
+        is true (failed fetches should not be remembered).
+        """
+        key = normalize_url(url)
+        while True:
+            with self._lock:
+                row = self._lookup(key)
+                if row is not None:
+                    self.skipped += 1
+                    return row[1]
+                waiter = self._in_flight.get(key)
+                if waiter is None:
+                    done = self._in_flight[key] = threading.Event()
+                    break
+            # Someone else is fetching this page; look again once they are done
+            waiter.wait()
+
+        try:
+            value = fetch(url)
+            if keep(value):
+                self.record(url, value)
+            return value
+        finally:
+            with self._lock:
+                self.fetched += 1
+                del self._in_flight[key]
+            done.set()
+
+    async def aget_or_fetch(self, url: str, fetch: Callable[[str], Awaitable[str]],
+                            keep: Callable[[str], bool] = lambda value: True) -> str:
+        """get_or_fetch for the asyncio engine; tasks of one event loop wait on each other's fetches."""
+        key = normalize_url(url)
+        while True:
+            value = self.lookup(url)
+            if value is not None:
+                return value
+            waiter = self._async_in_flight.get(key)
+            if waiter is None:
+                done = self._async_in_flight[key] = asyncio.Event()
+                break
+            await waiter.wait()
+
+        try:
+            value = await fetch(url)
+            if keep(value):
+                self.record(url, value)
+            return value
+        finally:
+            with self._lock:
+                self.fetched += 1
+            del self._async_in_flight[key]
+            done.set()
+
+    def report(self) -> str:
+        return (f"Detail pages: {self.fetched} fetched, {self.skipped} requests skipped as already seen "
+                f"(seen-set filter {self.bloom.nbytes / 1024:.0f} KiB)")
+
+
+# Seen-sets of the crawls in progress; the innermost one is used by the parser
+_active_seen = []
+_active_lock = threading.Lock()
+
+
+def active_seen_urls() -> Optional[SeenUrls]:
+    with _active_lock:
+        return _active_seen[-1] if _active_seen else None
+
+
+@contextmanager
+def seen_scope(seen_urls: Optional[SeenUrls]):
+    """Make seen_urls the seen-set used by detail page fetches until the block exits."""
+    if seen_urls is None:
+        yield None
+        return
+    with _active_lock:
+        _active_seen.append(seen_urls)
+    try:
+        yield seen_urls
+    finally:
+        with _active_lock:
+            for i in range(len(_active_seen) - 1, -1, -1):
+                if _active_seen[i] is seen_urls:
+                    del _active_seen[i]
+                    break
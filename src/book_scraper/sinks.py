@@ -0,0 +1,356 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+from src.book_scraper.columnar import write_books_parquet
+from src.book_scraper.streaming_analytics import iter_json_lines
+from src.Utils.metrics import REGISTRY
+
+# Records buffered before they are written out and flushed
+DEFAULT_BUFFER_SIZE = 100
+# Characters of text a GroupedSpill keeps per key before appending them to its file
+DEFAULT_SPILL_CHUNK = 64 * 1024
+
+
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+# nesting level -> encoder; with no indent json uses its C encoder, and for a flat object
+# an item separator carrying the newline and indentation gives the indented layout
+_flat_encoders = {}
+
+
+def indented_json(row: Dict[str, Any], level: int = 0) -> str:
+    """
+    json.dumps(row, indent=4, ensure_ascii=False) for a flat dictionary such as Book.to_dict(),
+    as it appears nested level deep in an indented document (every line after the first
+    indented by 4 * level more spaces).
+
+    json only uses its C encoder when there is no indent, so for an object of scalars
+    the same text is produced with the indentation folded into the item separator.
+    Rows with nested values fall back to json.dumps.
+    """
+    padding = "    " * level
+    if not _SCALAR_TYPES.issuperset(map(type, row.values())):
+        text = json.dumps(row, indent=4, ensure_ascii=False)
+        return text.replace("\n", "\n" + padding) if level else text
+    if not row:
+        return "{}"
+    encode = _flat_encoders.get(level)
+    if encode is None:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",\n    " + padding, ": "))
+        encode = _flat_encoders[level] = encoder.encode
+    return "{\n    " + padding + encode(row)[1:-1] + "\n" + padding + "}"
+
+
+def csv_renderer(fieldnames: List[str]) -> Callable[..., str]:
+    """
+    Function turning records into their CSV lines, as csv.DictWriter(fieldnames) writes
+    them (missing keys and None as empty fields), for text that is written out later.
+    render(records, *extra) appends the extra values to every line, as further columns,
+    without copying the records; it skips DictWriter's per-record key check.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def render(records: Iterable[Dict[str, Any]], *extra: Any) -> str:
+        tail = list(extra)
+        writer.writerows([[record.get(name, "") for name in fieldnames] + tail for record in records])
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    return render
+
+
+class JsonLinesSink:
+    """
+    Append-mode JSON Lines writer: one record per line, written in buffered batches.
+
+    Records reach the disk every buffer_size records (and on flush/close), so a crawl
+    keeps at most one batch in memory and what it has written survives a crash.
+    """
+
+    def __init__(self, path: str, buffer_size: int = DEFAULT_BUFFER_SIZE, append: bool = True):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.records_written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self._buffer = []
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(record, ensure_ascii=False))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self.records_written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class CsvSink:
+    """
+    Streaming CSV writer with the same buffering as JsonLinesSink.
+
+    The header comes from fieldnames, or from the first record's keys like
+    Processing.save_csv; it is only written when the file is new or empty.
+    """
+
+    def __init__(self, path: str, fieldnames: Optional[List[str]] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE, append: bool = True):
+        self.path = path
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.buffer_size = buffer_size
+        self.records_written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._needs_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self._file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self._writer = None
+        self._buffer = []
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_rendered(self, text: str, records: int = 0) -> None:
+        """Append records already rendered with csv_renderer(fieldnames); needs the fieldnames up front."""
+        self.flush()
+        self._start(self.fieldnames)
+        self._file.write(text)
+        self.records_written += records
+
+    def _start(self, fieldnames: List[str]) -> None:
+        if self._writer is None:
+            self.fieldnames = fieldnames
+            self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+            if self._needs_header:
+                self._writer.writeheader()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._start(self.fieldnames or list(self._buffer[0].keys()))
+            self._writer.writerows(self._buffer)
+            self.records_written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class JsonArraySink:
+    """
+    Writes a JSON array element by element, as the same text json.dump(records, indent=4)
+    produces for the whole list. write_text() takes an element serialized with
+    json.dumps(indent=4); write_indented() takes the pieces of one already indented for
+    its place in the array (indented_json(row, level=1)), so nothing is re-indented.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records_written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write_indented(self, pieces: Iterable[str]) -> None:
+        self._file.write("[\n    " if not self.records_written else ",\n    ")
+        self._file.writelines(pieces)
+        self.records_written += 1
+
+    def write_more(self, pieces: Iterable[str]) -> None:
+        """Continue the element the last write_indented() started, for one written in parts."""
+        self._file.writelines(pieces)
+
+    def write_text(self, text: str) -> None:
+        # Each element is indented one level inside the array
+        self.write_indented((text.replace("\n", "\n    "),))
+
+    def write(self, record: Any) -> None:
+        if isinstance(record, dict):
+            self.write_indented((indented_json(record, level=1),))
+        else:
+            self.write_text(json.dumps(record, indent=4, ensure_ascii=False))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.write("\n]" if self.records_written else "[]")
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class GroupedSpill:
+    """
+    Text grouped by key in one pass over records that arrive in any order, for outputs
+    that must come out grouped (the categories of categories.json, category_books.csv).
+
+    Each key's text is buffered and appended to one temporary file, in directory, in
+    chunks of about chunk_size characters: memory holds at most a chunk per key and a
+    single file is open however many keys there are. read(key) gives the key's text back
+    in the order it was added, chunk by chunk. The file is removed on close.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = DEFAULT_SPILL_CHUNK):
+        self.chunk_size = chunk_size
+        os.makedirs(directory or ".", exist_ok=True)
+        self._file = tempfile.TemporaryFile(dir=directory or None)
+        # key -> [pending texts, their length]
+        self._pending = {}
+        # key -> [(offset, byte length)] of its chunks in the file
+        self._chunks = {}
+
+    def add(self, key: Hashable, text: str) -> None:
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = [[], 0]
+        pending[0].append(text)
+        pending[1] += len(text)
+        if pending[1] >= self.chunk_size:
+            self._spill(key, pending)
+
+    def _spill(self, key: Hashable, pending: List) -> None:
+        data = "".join(pending[0]).encode("utf-8")
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self._chunks.setdefault(key, []).append((offset, len(data)))
+        pending[0], pending[1] = [], 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pending
+
+    def read(self, key: Hashable) -> Iterator[str]:
+        for offset, length in self._chunks.get(key, ()):
+            self._file.seek(offset)
+            yield self._file.read(length).decode("utf-8")
+        pending = self._pending.get(key)
+        if pending and pending[0]:
+            yield "".join(pending[0])
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def save_labels(path: str, file_format: Optional[str] = None) -> Dict[str, str]:
+    """Labels of the save_seconds metric for an output file: its format (the extension by default) and name."""
+    return {"format": file_format or os.path.splitext(path)[1].lstrip(".") or "file", "file": os.path.basename(path)}
+
+
+def save_timer(path: str, file_format: Optional[str] = None):
+    """Time writing the file at path into the save_seconds metric."""
+    return REGISTRY.timer("save_seconds", **save_labels(path, file_format))
+
+
+def finalize_json(jsonl_path: str, json_path: str) -> str:
+    """
+    Rewrite a JSON Lines file as the indented JSON array Processing.save_json produces,
+    one record at a time, so the file is never loaded as a whole.
+    """
+    tmp_path = f"{json_path}.tmp"
+    with save_timer(json_path):
+        with JsonArraySink(tmp_path) as out:
+            for record in iter_json_lines(jsonl_path):
+                out.write(record)
+        os.replace(tmp_path, json_path)
+    return json_path
+
+
+class BookStreamWriter:
+    """
+    Persists a crawl's books as they are scraped: <directory>/books.jsonl, plus
+    books.csv when "csv" is among the formats. finalize() (write_exports) also writes the
+    books.json and books.parquet that save_books would have produced, streamed from
+    the JSON Lines file.
+    """
+
+    def __init__(self, directory: str, formats: List[str], buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 csv_fieldnames: Optional[Iterable[str]] = None):
+        self.directory = directory
+        self.formats = formats
+        # A crawl (resumed or not) writes every book again, so the files start empty
+        self.jsonl = JsonLinesSink(os.path.join(directory, "books.jsonl"), buffer_size, append=False)
+        self.csv = CsvSink(os.path.join(directory, "books.csv"), fieldnames=csv_fieldnames, buffer_size=buffer_size,
+                           append=False) if "csv" in formats else None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.jsonl.write(record)
+        if self.csv is not None:
+            self.csv.write(record)
+
+    @property
+    def records_written(self) -> int:
+        return self.jsonl.records_written
+
+    def close(self) -> None:
+        self.jsonl.close()
+        if self.csv is not None:
+            self.csv.close()
+
+    def finalize(self, write_exports: bool = True) -> Dict[str, str]:
+        """Close the sinks and return the paths of the book files, like save_books."""
+        self.close()
+        paths = {"jsonl": self.jsonl.path}
+        if self.csv is not None:
+            if self.csv.records_written:
+                paths["csv"] = self.csv.path
+            else:
+                os.remove(self.csv.path)
+        if write_exports and "json" in self.formats:
+            json_path = os.path.join(self.directory, "books.json")
+            try:
+                paths["json"] = finalize_json(self.jsonl.path, json_path)
+                print(f"Data successfully saved to {json_path}")
+            except Exception as e:
+                print(f"Error saving JSON data to {json_path}: {e}")
+        if write_exports and "parquet" in self.formats:
+            parquet_path = os.path.join(self.directory, "books.parquet")
+            try:
+                with save_timer(parquet_path):
+                    write_books_parquet(iter_json_lines(self.jsonl.path), parquet_path)
+                paths["parquet"] = parquet_path
+                print(f"Data successfully saved to {parquet_path}")
+            except Exception as e:
+                print(f"Error saving Parquet data to {parquet_path}: {e}")
+        return paths
@@ -0,0 +1,214 @@
+import csv
+import heapq
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from src.book_scraper.columnar import PYARROW_AVAILABLE, iter_books_parquet
+from src.book_scraper.models.book import parse_price_pence, parse_rating
+
+# Book exports written by Processing.save_books, most efficient to stream first.
+# A directory holds the same books in several formats, so only one of them is read.
+BOOK_FILE_PREFERENCE = (("books.parquet",) if PYARROW_AVAILABLE else ()) + ("books.jsonl", "books.json", "books.csv")
+# Exports modified within this many seconds of the newest one count as written by the same save
+# (and coarse file systems only keep modification times to the second)
+SAME_SAVE_SECONDS = 1.0
+
+READ_CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks and each element is decoded with raw_decode as soon as it
+    is complete, so memory stays at one chunk plus one element whatever the file size.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        position = 0
+        eof = False
+        started = False
+
+        def fill():
+            nonlocal buffer, position, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        while True:
+            # Skip whitespace and the separators between elements
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n,":
+                    position += 1
+                if position < len(buffer) or eof:
+                    break
+                fill()
+            if position >= len(buffer):
+                if started:
+                    raise ValueError(f"Unterminated JSON array in {path}")
+                return  # Empty file
+
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError(f"{path} does not contain a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+
+            try:
+                element, end = _decoder.raw_decode(buffer, position)
+                # A number cut at the chunk boundary still decodes; only trust it if something follows
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                fill()
+                continue
+            position = end
+            yield element
+
+
+def iter_json_lines(path: str) -> Iterator[Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            # CSV has no types; ratings come back as text
+            if 'rating' in row:
+                row['rating'] = parse_rating(row['rating'])
+            yield row
+
+
+def iter_records(path: str) -> Iterator[Any]:
+    """Lazily iterate the records of a .json, .jsonl, .csv or .parquet export."""
+    if path.endswith('.parquet'):
+        return iter_books_parquet(path)
+    if path.endswith('.jsonl'):
+        return iter_json_lines(path)
+    if path.endswith('.csv'):
+        return iter_csv(path)
+    return iter_json_array(path)
+
+
+def book_files(base_path: str) -> List[str]:
+    """
+    One book export per directory under base_path: the most recently modified, so a file
+    left by an earlier save in another format never shadows a fresher one, and among the
+    exports of that latest save the first in BOOK_FILE_PREFERENCE.
+    """
+    paths = []
+    for root, _, files in os.walk(base_path):
+        names = set(files)
+        modified = {}
+        for name in BOOK_FILE_PREFERENCE:
+            if name in names:
+                try:
+                    modified[name] = os.path.getmtime(os.path.join(root, name))
+                except OSError:
+                    continue
+        if modified:
+            newest = max(modified.values())
+            name = next(name for name, mtime in modified.items() if mtime >= newest - SAME_SAVE_SECONDS)
+            paths.append(os.path.join(root, name))
+    return paths
+
+
+def iter_folder_books(base_path: str) -> Iterator[Any]:
+    for path in book_files(base_path):
+        yield from iter_records(path)
+
+
+class StreamingAggregator:
+    """
+    Single-pass, bounded-memory version of the Processing analytics.
+
+    Keeps running rating totals, per-category counts, price-range counts and three
+    heaps of at most top_n records (best rated, most expensive, cheapest). Memory
+    depends on top_n and on the number of categories, not on the number of records.
+    Ties are broken by arrival order, as the stable sorts in Processing do.
+    """
+
+    def __init__(self, top_n: int = 5, price_ranges: Sequence[Tuple[float, float]] = ()):
+        self.top_n = top_n
+        self.price_ranges = [(low, high) for low, high in price_ranges]
+        self._pence_ranges = [(low * 100, high * 100) for low, high in self.price_ranges]
+        self.records = 0
+        self.rating_sum = 0
+        self.rated = 0
+        self.category_counts = {}
+        self.range_counts = [0] * len(self.price_ranges)
+        self._top_rated = []
+        self._expensive = []
+        self._cheap = []
+
+    def _push(self, heap: list, key, record) -> None:
+        # Entries are (key, -arrival): the heap root is the entry to evict first. A later
+        # record with an equal key never displaces an earlier one, so only key > root counts.
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, (key, -self.records, record))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, -self.records, record))
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.records += 1
+        rating = parse_rating(record.get('rating'))
+        if rating is not None:
+            self.rating_sum += rating
+            self.rated += 1
+        category = record.get('category', 'Unknown')
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+
+        pence = parse_price_pence(record.get('price', 0))
+        pence = pence if pence is not None else 0
+        for i, (low, high) in enumerate(self._pence_ranges):
+            if low <= pence <= high:
+                self.range_counts[i] += 1
+
+        if self.top_n > 0:
+            self._push(self._top_rated, rating or 0, record)
+            self._push(self._expensive, pence, record)
+            self._push(self._cheap, -pence, record)
+
+    def consume(self, records: Iterable[Dict[str, Any]]) -> "StreamingAggregator":
+        for record in records:
+            self.add(record)
+        return self
+
+    @staticmethod
+    def _ranked(heap: list) -> List[Dict[str, Any]]:
+        return [record for _, _, record in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def average_rating(self) -> float:
+        return self.rating_sum / self.rated if self.rated else 0.0
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "records": self.records,
+            "average_rating": self.average_rating(),
+            "books_per_category": dict(self.category_counts),
+            "price_range_counts": {f"{low}-{high}": count
+                                   for (low, high), count in zip(self.price_ranges, self.range_counts)},
+            "top_rated": self._ranked(self._top_rated),
+            "top_expensive": self._ranked(self._expensive),
+            "top_cheap": self._ranked(self._cheap),
+        }
+
+
+def aggregate_folder(base_path: str, top_n: int = 5,
+                     price_ranges: Sequence[Tuple[float, float]] = ((10, 30),)) -> Dict[str, Any]:
+    """Stream every book export under base_path through one StreamingAggregator."""
+    return StreamingAggregator(top_n, price_ranges).consume(iter_folder_books(base_path)).result()
@@ -1 +1,4 @@
-from .requests_manager import get_request
\ No newline at end of file
+from .requests_manager import get_request
+from .session_manager import SessionManager, get_session_manager, active_session_manager, session_scope
+from .response_cache import ResponseCache
+from .rate_limiter import RateLimiter, TokenBucket, AdaptiveConcurrency
\ No newline at end of file
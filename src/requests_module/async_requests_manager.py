@@ -0,0 +1,151 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from requests.utils import get_encoding_from_headers
+
+from src.requests_module.error_handler import record_request_error, record_response
+from src.Utils.metrics import REGISTRY
+
+try:
+    import aiohttp
+except ImportError:  # Only the asyncio crawl engine needs aiohttp
+    aiohttp = None
+
+# Global cap on requests in flight across every task of an async crawl
+DEFAULT_ASYNC_CONCURRENCY = 20
+
+
+class AsyncSessionManager:
+    """
+        Shared aiohttp.ClientSession for the asyncio crawl engine.
+
+        Mirrors SessionManager: one keep-alive connection pool per crawl,
+        the same retry policy as the sync path, and a global limit on the
+        number of requests in flight.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_ASYNC_CONCURRENCY, limit_per_host=10,
+                 max_retries=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504)):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for the async crawl engine: pip install aiohttp")
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = list(status_forcelist)
+
+        self._session = None
+        self._semaphore = None
+        self.requests_sent = 0
+        self.requests_failed = 0
+
+    def _ensure_session(self):
+        # Created lazily so the session binds to the running event loop
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def get_text(self, url, headers=None, timeout=10):
+        """GET url and return the decoded body, retrying like the sync adapter."""
+        session = self._ensure_session()
+        self.requests_sent += 1
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with session.get(url, headers=headers or {},
+                                           timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                        if response.status >= 400:
+                            record_response(response.status, time.perf_counter() - started)
+                            if response.status in self.status_forcelist and attempt < self.max_retries:
+                                raise _RetryableStatus(response.status)
+                            response.raise_for_status()
+                        body = await response.read()
+                        record_response(response.status, time.perf_counter() - started, len(body))
+                        # Decode the way requests does so both engines produce identical text
+                        encoding = get_encoding_from_headers(response.headers) or "utf-8"
+                        return body.decode(encoding, errors="replace")
+            except (_RetryableStatus, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if not isinstance(e, _RetryableStatus):
+                    record_request_error(e)
+                if attempt >= self.max_retries:
+                    self.requests_failed += 1
+                    raise
+                attempt += 1
+                REGISTRY.inc("request_retries_total")
+                await asyncio.sleep(self.backoff_factor * (2 ** (attempt - 1)) if attempt > 1 else 0)
+            except Exception:
+                self.requests_failed += 1
+                raise
+
+    def stats(self):
+        return {
+            "requests": self.requests_sent,
+            "failed": self.requests_failed,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        self._token = _active_manager.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        _active_manager.reset(self._token)
+        await self.close()
+        return False
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status):
+        super().__init__(f"Retryable HTTP status {status}")
+        self.status = status
+
+
+# Tasks inherit the context they were created in, so every task spawned
+# inside an async_session_scope() sees the same manager
+_active_manager = ContextVar("active_async_session_manager", default=None)
+
+
+@asynccontextmanager
+async def async_session_scope(session_manager=None, max_concurrency=DEFAULT_ASYNC_CONCURRENCY):
+    """
+        Activate an AsyncSessionManager for the duration of an async crawl.
+
+        A manager passed in is activated but left open for its owner to
+        close; otherwise a new one is created and closed on exit.
+    """
+    owns_manager = session_manager is None
+    manager = session_manager or AsyncSessionManager(max_concurrency=max_concurrency)
+    token = _active_manager.set(manager)
+    try:
+        yield manager
+    finally:
+        _active_manager.reset(token)
+        if owns_manager:
+            await manager.close()
+
+
+async def async_get_request(url, headers=None, timeout=10, session_manager=None):
+    manager = session_manager or _active_manager.get()
+    if manager is None:
+        async with async_session_scope() as manager:
+            return await _get_text(manager, url, headers, timeout)
+    return await _get_text(manager, url, headers, timeout)
+
+
+async def _get_text(manager, url, headers, timeout):
+    try:
+        return await manager.get_text(url, headers=headers, timeout=timeout)
+    except Exception as e:
+        print(f"Request failed: {str(e)}")
+        raise
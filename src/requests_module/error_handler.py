@@ -1,6 +1,62 @@
 from typing import Optional
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import requests
 
+from src.Utils.metrics import REGISTRY
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+THROTTLING_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_throttling_status(status_code: int) -> bool:
+    return status_code in THROTTLING_STATUS_CODES
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def error_kind(error: BaseException) -> str:
+    """Short label of a failed request for the metrics: the HTTP status, or the kind of network error."""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return str(response.status_code)
+    if isinstance(error, (requests.Timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(error, requests.ConnectionError):
+        return "connection"
+    if isinstance(error, requests.TooManyRedirects):
+        return "redirects"
+    return type(error).__name__
+
+
+def record_response(status_code: int, seconds: float, size: Optional[int] = None, retries: int = 0) -> None:
+    """Count one response by status code, with its latency, body size and retries, in the crawl metrics."""
+    REGISTRY.inc("requests_total", status=status_code)
+    REGISTRY.observe("request_seconds", seconds)
+    if size:
+        REGISTRY.inc("response_bytes_total", size)
+    if retries:
+        REGISTRY.inc("request_retries_total", retries)
+
+
+def record_request_error(error: BaseException) -> None:
+    REGISTRY.inc("request_errors_total", kind=error_kind(error))
+
+
 def handle_http_error(error: requests.RequestException) -> str:
     
     if not isinstance(error, requests.RequestException):
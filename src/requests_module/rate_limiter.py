@@ -0,0 +1,183 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from src.requests_module.error_handler import is_throttling_status, parse_retry_after
+
+
+class TokenBucket:
+    """
+        Classic token bucket: `rate` requests per second on average, with
+        bursts of up to `capacity`. pause_until() empties the bucket until a
+        given time, which is how Retry-After and backoff are honored.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available; return the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause_until(self, until):
+        """Hand out no tokens before the monotonic time `until`."""
+        with self._lock:
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+
+
+class AdaptiveConcurrency:
+    """
+        AIMD concurrency limit: every healthy response raises the limit by
+        roughly one per `limit` responses (additive increase), every 429/5xx
+        multiplies it by `decrease_factor` (multiplicative decrease). At most
+        one decrease per `cooldown` seconds, so a burst of errors from the
+        same overload only backs off once.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=32, decrease_factor=0.5, cooldown=1.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self):
+        with self._condition:
+            if self._limit < self.max_limit:
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+                self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+
+
+class _HostState:
+    def __init__(self, bucket, concurrency):
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.consecutive_throttles = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+
+class RateLimiter:
+    """
+        Per-host request throttling for SessionManager.
+
+        Each host gets its own token bucket (steady request rate) and its own
+        AIMD concurrency limit (how many requests may be in flight). Throttled
+        responses (429, 5xx) pause the host for the server's Retry-After, or
+        for an exponential backoff when none is given, and shrink the
+        concurrency limit; healthy responses grow it back.
+    """
+
+    def __init__(self, rate=10.0, burst=None, initial_concurrency=4, max_concurrency=32,
+                 backoff_base=1.0, max_backoff=60.0):
+        self.rate = rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = _HostState(
+                    TokenBucket(self.rate, self.burst),
+                    AdaptiveConcurrency(self.initial_concurrency, max_limit=self.max_concurrency)
+                )
+                self._hosts[host] = state
+            return state
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one concurrency slot and one token for `url`'s host while a request runs."""
+        state = self._host(url)
+        state.concurrency.acquire()
+        try:
+            state.wait_time += state.bucket.acquire()
+            yield state
+        finally:
+            state.concurrency.release()
+
+    def record(self, url, status_code, headers=None):
+        """Feed a response status back into the host's rate and concurrency."""
+        state = self._host(url)
+        if not is_throttling_status(status_code):
+            state.consecutive_throttles = 0
+            state.concurrency.on_success()
+            return
+
+        state.throttled += 1
+        state.consecutive_throttles += 1
+        state.concurrency.on_throttle()
+        delay = parse_retry_after((headers or {}).get("Retry-After"))
+        if delay is None:
+            delay = self.backoff_base * (2 ** (state.consecutive_throttles - 1))
+        state.bucket.pause_until(time.monotonic() + min(delay, self.max_backoff))
+
+    def stats(self):
+        with self._lock:
+            return {
+                host: {
+                    "concurrency_limit": state.concurrency.limit,
+                    "throttled": state.throttled,
+                    "wait_time": round(state.wait_time, 3),
+                }
+                for host, state in self._hosts.items()
+            }
@@ -1,9 +1,9 @@
-import requests
 import ssl
 from requests.adapters import HTTPAdapter
-from urllib3 import Retry
 from urllib3.poolmanager import PoolManager
 from urllib3.util.ssl_ import create_urllib3_context
+from src.requests_module.session_manager import get_session_manager
+
 DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -27,33 +27,14 @@ class SSLAdapter(HTTPAdapter):
         return PoolManager(*args, **kwargs)
 
 
-def get_request(url, headers=None, timeout=10):
-    session = requests.Session()
-
-    # Configure retry strategy
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[500, 502, 503, 504]
-    )
-
-    # Mount HTTP and HTTPS adapters
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
+def get_request(url, headers=None, timeout=10, session_manager=None):
+    # Reuse the pooled session of the active manager instead of opening
+    # (and tearing down) a new connection for every request
+    manager = session_manager or get_session_manager()
 
     try:
-        response = session.get(
-            url,
-            headers=headers or {},
-            timeout=timeout,
-            verify=True  # Keep SSL verification
-        )
-        response.raise_for_status()
-        return response
+        return manager.get(url, headers=headers, timeout=timeout)
 
     except Exception as e:
         print(f"Request failed: {str(e)}")
         raise
-    finally:
-        session.close()
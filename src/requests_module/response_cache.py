@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Response headers kept with each cached body
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+class ResponseCache:
+    """
+        Persistent on-disk cache of GET responses.
+
+        Bodies are stored once per content hash under <directory>/bodies, and
+        <directory>/index.json maps each URL to its body hash plus the
+        validators (ETag / Last-Modified) needed to revalidate it. Entries
+        younger than ttl are served without touching the network; older ones
+        are revalidated with If-None-Match / If-Modified-Since, so a 304 costs
+        a round trip but no body. When the stored bodies exceed max_bytes the
+        least recently used entries are evicted.
+    """
+
+    def __init__(self, directory=".http_cache", ttl=3600, max_bytes=256 * 1024 * 1024, save_every=50):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.save_every = save_every
+
+        self._lock = threading.Lock()
+        self._bodies_dir = os.path.join(directory, "bodies")
+        self._index_path = os.path.join(directory, "index.json")
+        self._entries = self._load_index()
+        self._unsaved = 0
+
+        # Body hash -> number of URLs pointing at it, and the bytes those bodies take
+        self._body_refs = {}
+        self._stored_bytes = 0
+        for entry in self._entries.values():
+            self._add_ref(entry)
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    def _load_index(self):
+        os.makedirs(self._bodies_dir, exist_ok=True)
+        if not os.path.exists(self._index_path):
+            return {}
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable response cache index {self._index_path}: {e}")
+            return {}
+
+    def _body_path(self, digest):
+        return os.path.join(self._bodies_dir, digest[:2], digest)
+
+    def _read_body(self, entry):
+        try:
+            with open(self._body_path(entry["sha256"]), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def lookup(self, url):
+        """Return the cache entry for url, or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(url)
+            return dict(entry) if entry else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Validators to send when revalidating a stale entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_fresh(self, url):
+        """Serve url from disk if it is cached and still within the TTL."""
+        entry = self.lookup(url)
+        if not entry or not self.is_fresh(entry):
+            return None, entry
+        response = self._build_response(url, entry)
+        if response is None:
+            return None, None
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += entry["size"]
+            self._touch(url)
+        return response, entry
+
+    def revalidate(self, url, entry, not_modified_response):
+        """Handle a 304: extend the entry's freshness and return the cached body."""
+        response = self._build_response(url, entry)
+        if response is None:
+            return None
+        with self._lock:
+            current = self._entries.get(url)
+            if current is not None:
+                current["fetched_at"] = time.time()
+                etag = not_modified_response.headers.get("ETag")
+                if etag:
+                    current["etag"] = etag
+                self._touch(url)
+                self._mark_dirty()
+            self.revalidated += 1
+            self.bytes_saved += entry["size"]
+        return response
+
+    def store(self, url, response):
+        """Store a 200 response body and its validators."""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+
+        now = time.time()
+        entry = {
+            "sha256": digest,
+            "size": len(body),
+            "status": response.status_code,
+            "encoding": response.encoding,
+            "headers": {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+            "etag": response.headers.get("ETag"),
+            # Without a server Last-Modified, our own fetch time is the best If-Modified-Since we have
+            "last_modified": response.headers.get("Last-Modified") or formatdate(now, usegmt=True),
+            "fetched_at": now,
+            "last_access": now,
+        }
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.get(url)
+            if previous is not None:
+                self._drop_ref(previous)
+            self._entries[url] = entry
+            self._add_ref(entry)
+            self._evict_if_needed()
+            self._mark_dirty()
+
+    def _build_response(self, url, entry):
+        body = self._read_body(entry)
+        if body is None:
+            # Body was removed from disk behind our back; treat as a miss
+            with self._lock:
+                entry = self._entries.pop(url, None)
+                if entry is not None:
+                    self._drop_ref(entry, remove_body=False)
+            return None
+        response = requests.Response()
+        response.status_code = entry.get("status", 200)
+        response.reason = "OK"
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.encoding = entry.get("encoding")
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def _touch(self, url):
+        entry = self._entries.get(url)
+        if entry is not None:
+            entry["last_access"] = time.time()
+
+    def _mark_dirty(self):
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self._save_locked()
+
+    def _add_ref(self, entry):
+        # A body shared by several URLs is only stored (and counted) once
+        digest = entry["sha256"]
+        if digest not in self._body_refs:
+            self._body_refs[digest] = 0
+            self._stored_bytes += entry["size"]
+        self._body_refs[digest] += 1
+
+    def _drop_ref(self, entry, remove_body=True):
+        digest = entry["sha256"]
+        refs = self._body_refs.get(digest, 0) - 1
+        if refs > 0:
+            self._body_refs[digest] = refs
+            return
+        self._body_refs.pop(digest, None)
+        self._stored_bytes -= entry["size"]
+        if remove_body:
+            try:
+                os.remove(self._body_path(digest))
+            except OSError:
+                pass
+
+    def _evict_if_needed(self):
+        if self._stored_bytes <= self.max_bytes:
+            return
+        by_age = sorted(self._entries.items(), key=lambda item: item[1]["last_access"])
+        for url, entry in by_age:
+            if self._stored_bytes <= self.max_bytes:
+                break
+            del self._entries[url]
+            self._drop_ref(entry)
+            self.evictions += 1
+
+    def _save_locked(self):
+        tmp_path = f"{self._index_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self._index_path)
+            self._unsaved = 0
+        except Exception as e:
+            print(f"Error saving response cache index to {self._index_path}: {e}")
+
+    def save(self):
+        """Persist the index so the next run can reuse the cached bodies."""
+        with self._lock:
+            self._save_locked()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes_stored": self._stored_bytes,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,284 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+from src.requests_module.error_handler import record_request_error, record_response
+from src.Utils.metrics import REGISTRY
+
+
+class SessionManager:
+    """
+        Long-lived requests.Session with a pooled keep-alive HTTPAdapter.
+
+        One manager is meant to be shared by every request of a crawl so that
+        listing and detail pages reuse already-open TCP/TLS connections
+        instead of paying for a new handshake on each call. Entering the
+        manager as a context manager makes it the active manager picked up
+        by get_request(); leaving it closes the pool.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 max_retries=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504),
+                 max_in_flight=None, cache=None, rate_limiter=None):
+        # pool_connections: number of per-host pools kept alive
+        # pool_maxsize: connections kept alive per host
+        # max_in_flight: global cap on concurrent requests from all threads (None = no cap)
+        # cache: optional ResponseCache consulted before going to the network
+        # rate_limiter: optional RateLimiter pacing requests per host
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = list(status_forcelist)
+        self.max_in_flight = max_in_flight
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+
+        self._lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._session = None
+        self._adapter = None
+        self.requests_sent = 0
+        self.requests_failed = 0
+        self.requests_retried = 0
+
+    def _build_session(self):
+        # With a rate limiter the status retries happen in _send, so that every
+        # 429/5xx is seen by the limiter instead of being retried blindly
+        retry_strategy = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=[] if self.rate_limiter else self.status_forcelist
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=retry_strategy
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session, adapter
+
+    @property
+    def session(self):
+        """The underlying requests.Session, created on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session, self._adapter = self._build_session()
+        return self._session
+
+    def get(self, url, headers=None, timeout=10, **kwargs):
+        if self.cache is not None:
+            return self._cached_get(url, headers, timeout, **kwargs)
+        response = self._send(url, headers, timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def stream(self, url, headers=None, timeout=10):
+        """
+            GET with a streamed body for downloads read in chunks. The response
+            cache is bypassed (it would buffer the whole body) and the status is
+            left for the caller to check, since 206/416 answer Range requests.
+        """
+        return self._send(url, headers, timeout, stream=True)
+
+    def _cached_get(self, url, headers, timeout, **kwargs):
+        cached, entry = self.cache.get_fresh(url)
+        if cached is not None:
+            return cached
+
+        request_headers = dict(headers or {})
+        if entry:
+            request_headers.update(self.cache.conditional_headers(entry))
+        response = self._send(url, request_headers, timeout, **kwargs)
+
+        if response.status_code == 304 and entry:
+            cached = self.cache.revalidate(url, entry, response)
+            if cached is not None:
+                return cached
+            # Cached body vanished from disk: fetch it again unconditionally
+            response = self._send(url, headers, timeout, **kwargs)
+
+        response.raise_for_status()
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def _send(self, url, headers=None, timeout=10, **kwargs):
+        if self.rate_limiter is None:
+            return self._send_once(url, headers, timeout, **kwargs)
+
+        retryable = set(self.status_forcelist) | {429}
+        attempt = 0
+        while True:
+            with self.rate_limiter.slot(url):
+                response = self._send_once(url, headers, timeout, **kwargs)
+            # Records Retry-After / backoff, which the next slot() waits out
+            self.rate_limiter.record(url, response.status_code, response.headers)
+            if response.status_code not in retryable or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            with self._lock:
+                self.requests_retried += 1
+            REGISTRY.inc("request_retries_total")
+            response.close()
+
+    def _send_once(self, url, headers=None, timeout=10, **kwargs):
+        session = self.session
+        with self._lock:
+            self.requests_sent += 1
+        if self._in_flight is not None:
+            self._in_flight.acquire()
+        started = time.perf_counter()
+        try:
+            response = session.get(
+                url,
+                headers=headers or {},
+                timeout=timeout,
+                verify=True,  # Keep SSL verification
+                **kwargs
+            )
+        except Exception as e:
+            with self._lock:
+                self.requests_failed += 1
+            record_request_error(e)
+            raise
+        finally:
+            if self._in_flight is not None:
+                self._in_flight.release()
+        record_response(response.status_code, time.perf_counter() - started, _body_size(response, kwargs),
+                        _adapter_retries(response))
+        return response
+
+    def stats(self):
+        """
+            Connection reuse counters summed over every per-host pool.
+
+            connections_reused is the number of requests that went out on an
+            already-open keep-alive connection.
+        """
+        opened = 0
+        pooled_requests = 0
+        hosts = 0
+        adapter = self._adapter
+        if adapter is not None:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                hosts += 1
+                opened += pool.num_connections
+                pooled_requests += pool.num_requests
+        stats = {
+            "requests": self.requests_sent,
+            "failed": self.requests_failed,
+            "retried": self.requests_retried,
+            "hosts": hosts,
+            "connections_opened": opened,
+            "connections_reused": max(pooled_requests - opened, 0),
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.rate_limiter is not None:
+            stats["rate_limiter"] = self.rate_limiter.stats()
+        return stats
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.save()
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._adapter = None
+
+    def __enter__(self):
+        _push_manager(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _pop_manager(self)
+        self.close()
+        return False
+
+
+def _body_size(response, kwargs):
+    """Bytes of the response body as sent: Content-Length, else the size of the body already read."""
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit():
+        return int(length)
+    return None if kwargs.get('stream') else len(response.content)
+
+
+def _adapter_retries(response):
+    # Retries urllib3 made inside the adapter (status_forcelist without a rate limiter, connection errors)
+    retries = getattr(response.raw, 'retries', None)
+    return len(retries.history) if retries is not None else 0
+
+
+# Managers activated with `with` / session_scope(); the last one wins.
+# Kept process-wide (not thread-local) so worker threads spawned inside a
+# scope reuse the same pool.
+_active_managers = []
+_default_manager = None
+_registry_lock = threading.Lock()
+
+
+def _push_manager(manager):
+    with _registry_lock:
+        _active_managers.append(manager)
+
+
+def _pop_manager(manager):
+    with _registry_lock:
+        for i in range(len(_active_managers) - 1, -1, -1):
+            if _active_managers[i] is manager:
+                del _active_managers[i]
+                break
+
+
+def active_session_manager():
+    """Return the manager activated by the innermost enclosing scope, or None."""
+    with _registry_lock:
+        return _active_managers[-1] if _active_managers else None
+
+
+def get_session_manager():
+    """Return the active session manager, falling back to a shared default."""
+    global _default_manager
+    with _registry_lock:
+        if _active_managers:
+            return _active_managers[-1]
+        if _default_manager is None:
+            _default_manager = SessionManager()
+        return _default_manager
+
+
+@contextmanager
+def session_scope(session_manager=None):
+    """
+        Activate a session manager for the duration of a crawl.
+
+        A manager passed in, or one already active in an enclosing scope, is
+        reused and left open for its owner to close; otherwise a new one is
+        created and closed on exit.
+    """
+    session_manager = session_manager or active_session_manager()
+    owns_manager = session_manager is None
+    manager = session_manager or SessionManager()
+    _push_manager(manager)
+    try:
+        yield manager
+    finally:
+        _pop_manager(manager)
+        if owns_manager:
+            manager.close()
@@ -0,0 +1,75 @@
+"""
+Fixtures shared by the tests: the offline catalogue of benchmarks.fixtures, served by a
+local HTTP server on a thread, so crawls run end to end without touching the network.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.fixtures import corpus
+from src.book_scraper.Processing import Processing
+
+BOOK_COUNT = 100
+
+
+class FixtureSite:
+    """The fixture catalogue at base_url; paths in failing answer 404, and every request path is logged."""
+
+    def __init__(self, book_count: int = BOOK_COUNT):
+        listings, details, self.books = corpus(book_count)
+        self.listing_count = len(listings)
+        self.pages = {"/": listings[0]}
+        self.pages.update({f"/catalogue/page-{number}.html": page for number, page in enumerate(listings, start=1)})
+        self.pages.update({f"/catalogue/{book['slug']}/index.html": page for book, page in zip(self.books, details)})
+        self.failing = set()
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}/"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests.append(self.path)
+                body = None if self.path in site.failing else site.pages.get(self.path)
+                self.send_response(200 if body is not None else 404)
+                body = (body or "").encode("utf-8")
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def listing_requests(self):
+        return [path for path in self.requests if path == "/" or path.startswith("/catalogue/page-")]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """A running FixtureSite, with the category map pointing at it so no crawl fetches categories."""
+    site = FixtureSite()
+    site.start()
+    monkeypatch.setattr(Processing, "categories_map", {"Books": {"name": "Books", "url": site.base_url}})
+    try:
+        yield site
+    finally:
+        site.stop()
@@ -0,0 +1,54 @@
+import json
+import os
+
+import pytest
+
+from src.book_scraper.Processing import Processing
+
+FAILING_PAGE = "/catalogue/page-3.html"
+CRAWL_MODES = [pytest.param({}, id="threads"), pytest.param({"pipeline": True, "parse_workers": 0}, id="pipeline")]
+
+
+def crawl(site, directory, **kwargs):
+    return Processing.scrape_and_save(site.base_url, None, site.listing_count, str(directory), ["json"], **kwargs)
+
+
+def saved_books(directory):
+    with open(os.path.join(directory, "books.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("mode", CRAWL_MODES)
+def test_resumed_crawl_only_fetches_pages_missing_from_the_journal(site, tmp_path, mode):
+    site.failing.add(FAILING_PAGE)
+    result = crawl(site, tmp_path / "resumed", **mode)
+    journal_path = result["incomplete"]["journal"]
+    assert result["incomplete"]["pages"] == [site.base_url + FAILING_PAGE[1:]]
+    assert os.path.exists(journal_path)
+
+    site.failing.clear()
+    site.requests.clear()
+    result = crawl(site, tmp_path / "resumed", resume=True, **mode)
+    assert "incomplete" not in result
+    assert not os.path.exists(journal_path)
+
+    # Only the page that failed, and the detail pages of its books, are requested again
+    assert site.listing_requests() == [FAILING_PAGE]
+    page_books = site.books[40:60]
+    assert sorted(path for path in site.requests if path != FAILING_PAGE) == \
+        sorted(f"/catalogue/{book['slug']}/index.html" for book in page_books)
+
+    crawl(site, tmp_path / "clean", checkpoint=False, **mode)
+    assert saved_books(tmp_path / "resumed") == saved_books(tmp_path / "clean")
+
+
+def test_journal_of_another_crawl_is_not_replayed(site, tmp_path):
+    site.failing.add(FAILING_PAGE)
+    crawl(site, tmp_path)
+
+    site.failing.clear()
+    site.requests.clear()
+    # Another page limit makes it another crawl: everything is fetched again
+    Processing.scrape_and_save(site.base_url, None, 2, str(tmp_path), ["json"], resume=True)
+    assert site.listing_requests() == ["/", "/catalogue/page-2.html"]
+    assert len(saved_books(tmp_path)) == 40
@@ -0,0 +1,87 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from src.book_scraper import pipeline
+from src.book_scraper.pipeline import CrawlPipeline
+from src.requests_module.session_manager import session_scope
+
+PIPELINE_THREADS = ("fetch_loop", "dispatch_loop", "ThreadPoolExecutor", "QueueManagerThread")
+
+
+def pipeline_threads():
+    return [thread.name for thread in threading.enumerate()
+            if thread.is_alive() and any(name in thread.name for name in PIPELINE_THREADS)]
+
+
+def assert_shut_down():
+    assert multiprocessing.active_children() == []
+    assert pipeline_threads() == []
+
+
+def run(site, parse_workers, failed=None):
+    crawl = CrawlPipeline(site.base_url, fetch_workers=4, parse_workers=parse_workers, queue_size=4)
+    return crawl.run(site.base_url, site.listing_count, failed=failed)
+
+
+@pytest.mark.parametrize("parse_workers", [0, 1])
+def test_complete_crawl_shuts_down(site, parse_workers):
+    with session_scope():
+        pages = list(run(site, parse_workers))
+    assert [len(products) for products in pages] == [20] * site.listing_count
+    assert_shut_down()
+
+
+@pytest.mark.parametrize("parse_workers", [0, 1])
+def test_consumer_error_shuts_down(site, parse_workers):
+    with session_scope():
+        with pytest.raises(RuntimeError):
+            for _ in run(site, parse_workers):
+                raise RuntimeError("sink failed")
+    assert_shut_down()
+
+
+@pytest.mark.parametrize("parse_workers", [0, 1])
+def test_abandoned_crawl_shuts_down(site, parse_workers):
+    with session_scope():
+        pages = run(site, parse_workers)
+        next(pages)
+        pages.close()
+    assert_shut_down()
+
+
+def test_failed_listing_page_stops_the_output(site):
+    site.failing.add("/catalogue/page-3.html")
+    failed = []
+    with session_scope():
+        pages = list(run(site, 0, failed))
+    assert len(pages) == 2
+    assert failed == [site.base_url + "catalogue/page-3.html"]
+    assert_shut_down()
+
+
+def test_failed_detail_pages_keep_their_books(site):
+    site.failing.update(f"/catalogue/{book['slug']}/index.html" for book in site.books[:5])
+    with session_scope():
+        products = [product for page in run(site, 0) for product in page]
+    assert len(products) == len(site.books)
+    assert [product["description"] for product in products[:5]] == ["Description error"] * 5
+    assert_shut_down()
+
+
+def test_parse_error_shuts_down(site, monkeypatch):
+    parse_page = pipeline.parse_page
+
+    def failing_parse(kind, url, *args):
+        if url.endswith("page-2.html"):
+            raise ValueError("unparsable page")
+        return parse_page(kind, url, *args)
+
+    monkeypatch.setattr(pipeline, "parse_page", failing_parse)
+    failed = []
+    with session_scope():
+        pages = list(run(site, 0, failed))
+    assert len(pages) == 1
+    assert failed == [site.base_url + "catalogue/page-2.html"]
+    assert_shut_down()
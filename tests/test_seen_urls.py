@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+from benchmarks.fixtures import BASE_URL, make_books
+from src.book_scraper.seen_urls import BloomFilter, SeenUrls, normalize_url
+
+
+def detail_urls(count):
+    return [f"{BASE_URL}catalogue/{book['slug']}/index.html" for book in make_books(count)]
+
+
+def test_bloom_filter_has_no_false_negatives_past_capacity():
+    bloom = BloomFilter(capacity=100, error_rate=0.01)
+    urls = detail_urls(2000)
+    for url in urls:
+        bloom.add(url)
+    assert all(url in bloom for url in urls)
+
+
+def test_every_recorded_url_is_seen(tmp_path):
+    urls = detail_urls(2000)
+    # A filter far too small for the crawl only lets more lookups through to SQLite
+    with SeenUrls(str(tmp_path / "seen.db"), capacity=100) as seen:
+        for url in urls:
+            seen.record(url, f"description of {url}")
+        assert [seen.lookup(url) for url in urls] == [f"description of {url}" for url in urls]
+        assert seen.skipped == len(urls)
+
+
+def test_recorded_urls_are_seen_by_a_later_run(tmp_path):
+    path = str(tmp_path / "seen.db")
+    urls = detail_urls(500)
+    with SeenUrls(path) as seen:
+        for url in urls:
+            seen.record(url, url)
+
+    # The filter of the next run is rebuilt from the store
+    with SeenUrls(path) as seen:
+        assert all(seen.lookup(url) == url for url in urls)
+        assert seen.lookup(BASE_URL + "catalogue/never-fetched_1/index.html") is None
+
+
+def test_stale_entries_are_not_seen(tmp_path):
+    path = str(tmp_path / "seen.db")
+    url = detail_urls(1)[0]
+    with SeenUrls(path) as seen:
+        seen.record(url, "old")
+    time.sleep(0.01)
+    with SeenUrls(path, freshness=0) as seen:
+        assert seen.lookup(url) is None
+
+
+def test_equivalent_links_are_one_page():
+    url = detail_urls(1)[0]
+    # The "../../../slug/index.html" form of detail links, resolved against a catalogue page
+    relative = url.replace(BASE_URL + "catalogue/", "HTTP://BOOKS.toscrape.com/catalogue/../../") + "#top"
+    assert normalize_url(relative) == normalize_url(url)
+    with SeenUrls() as seen:
+        seen.record(url, "text")
+        assert seen.lookup(relative) == "text"
+
+
+def test_get_or_fetch_fetches_each_page_once():
+    urls = detail_urls(50)
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        with lock:
+            calls.append(url)
+        time.sleep(0.001)
+        return url
+
+    with SeenUrls() as seen:
+        threads = [threading.Thread(target=lambda: [seen.get_or_fetch(url, fetch) for url in urls]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(calls) == sorted(urls)
+        assert seen.fetched == len(urls)
+        assert seen.skipped == 3 * len(urls)
+
+
+def test_temporary_store_is_removed_on_close():
+    seen = SeenUrls()
+    path = seen._temporary_path
+    seen.record(detail_urls(1)[0], "text")
+    assert os.path.exists(path)
+    seen.close()
+    assert not os.path.exists(path)